@@ -0,0 +1,91 @@
+// Copyright (c) 2024 Boston Dynamics AI Institute LLC. All rights reserved.
+
+#pragma once
+
+#include <spot_msgs/msg/latency_histogram.hpp>
+#include <spot_msgs/msg/latency_histogram_array.hpp>
+
+#include <cstdint>
+#include <map>
+#include <mutex>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace spot_ros2::images {
+/**
+ * @brief Histogram of latencies with fixed buckets, which also keeps track of their count, mean and maximum.
+ */
+class LatencyHistogram {
+ public:
+  /**
+   * @brief Constructor for LatencyHistogram.
+   *
+   * @param upper_bounds Increasing upper bounds of the buckets in seconds. Latencies above the last bound are counted
+   * in an extra bucket.
+   */
+  explicit LatencyHistogram(std::vector<double> upper_bounds);
+
+  /**
+   * @brief Add a latency to the histogram.
+   *
+   * @param latency Latency in seconds.
+   */
+  void record(const double latency);
+
+  /**
+   * @brief Convert the histogram to a ROS message.
+   *
+   * @param source Image topic namespace of the camera, e.g. camera/frontleft.
+   * @param stage Stage of the image pipeline the latencies were measured for.
+   * @return LatencyHistogram message holding the contents of the histogram.
+   */
+  spot_msgs::msg::LatencyHistogram toMsg(const std::string& source, const std::string& stage) const;
+
+ private:
+  std::vector<double> upper_bounds_;
+  std::vector<uint64_t> counts_;
+  uint64_t count_ = 0;
+  double total_ = 0.0;
+  double max_ = 0.0;
+};
+
+/**
+ * @brief Thread safe collection of latency histograms, keyed by image source and stage of the image pipeline.
+ */
+class ImageLatencyRecorder {
+ public:
+  /**
+   * @brief Add a latency to the histogram of an image source and stage, creating the histogram if needed.
+   *
+   * @param source Image topic namespace of the camera, e.g. camera/frontleft.
+   * @param stage Stage of the image pipeline, e.g. request or publish.
+   * @param latency Latency in seconds.
+   */
+  void record(const std::string& source, const std::string& stage, const double latency);
+
+  /**
+   * @brief Convert all histograms to a ROS message, sorted by source and stage. The header is not filled.
+   */
+  spot_msgs::msg::LatencyHistogramArray toMsg() const;
+
+  /**
+   * @brief Clear all histograms.
+   */
+  void reset();
+
+  /**
+   * @brief Convert all histograms to a ROS message like toMsg, and optionally clear them, under a single lock so that
+   * no latency recorded in between is lost.
+   *
+   * @param reset Whether to clear the histograms once converted.
+   */
+  spot_msgs::msg::LatencyHistogramArray takeMsg(const bool reset);
+
+ private:
+  spot_msgs::msg::LatencyHistogramArray toMsgLocked() const;
+
+  mutable std::mutex mutex_;
+  std::map<std::pair<std::string, std::string>, LatencyHistogram> histograms_;
+};
+}  // namespace spot_ros2::images
@@ -11,6 +11,8 @@
 #include <spot_driver/interfaces/rclcpp_parameter_interface.hpp>
 #include <spot_driver/interfaces/rclcpp_tf_broadcaster_interface.hpp>
 #include <spot_driver/interfaces/rclcpp_wall_timer_interface.hpp>
+#include <spot_msgs/msg/latency_histogram_array.hpp>
+#include <spot_msgs/srv/get_image_latencies.hpp>
 #include <string>
 #include <tl_expected/expected.hpp>
 #include <unordered_map>
@@ -48,6 +50,19 @@ class ImagesMiddlewareHandle : public SpotImagePublisher::MiddlewareHandle {
    */
   tl::expected<void, std::string> publishImages(const std::map<ImageSource, ImageWithCameraInfo>& images) override;
 
+  /**
+   * @brief Creates the image latencies publisher and the service returning the image latencies.
+   * @param get_latencies Function returning the current latency histograms, clearing them if its argument is true.
+   */
+  void createLatencyInterfaces(
+      const std::function<spot_msgs::msg::LatencyHistogramArray(bool reset)>& get_latencies) override;
+
+  /**
+   * @brief Publishes the latency histograms of the image pipeline.
+   * @param latencies Latency histograms, the header is stamped by this function.
+   */
+  void publishLatencies(const spot_msgs::msg::LatencyHistogramArray& latencies) override;
+
  private:
   /** @brief Shared instance of an rclcpp node to create publishers */
   std::shared_ptr<rclcpp::Node> node_;
@@ -57,5 +72,11 @@ class ImagesMiddlewareHandle : public SpotImagePublisher::MiddlewareHandle {
 
   /** @brief Map between camera info topic names and camera info publishers. */
   std::unordered_map<std::string, std::shared_ptr<rclcpp::Publisher<sensor_msgs::msg::CameraInfo>>> info_publishers_;
+
+  /** @brief Publisher of the image latencies, only created if latencies are recorded. */
+  std::shared_ptr<rclcpp::Publisher<spot_msgs::msg::LatencyHistogramArray>> latency_publisher_;
+
+  /** @brief Service returning the image latencies, only created if latencies are recorded. */
+  std::shared_ptr<rclcpp::Service<spot_msgs::srv::GetImageLatencies>> latency_service_;
 };
 }  // namespace spot_ros2::images
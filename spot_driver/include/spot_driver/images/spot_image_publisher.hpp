@@ -2,6 +2,8 @@
 
 #pragma once
 
+#include <chrono>
+#include <functional>
 #include <map>
 #include <memory>
 #include <rclcpp/node.hpp>
@@ -9,12 +11,14 @@
 #include <sensor_msgs/msg/image.hpp>
 #include <set>
 #include <spot_driver/api/spot_image_sources.hpp>
+#include <spot_driver/images/image_latency_recorder.hpp>
 #include <spot_driver/interfaces/image_client_interface.hpp>
 #include <spot_driver/interfaces/logger_interface_base.hpp>
 #include <spot_driver/interfaces/parameter_interface_base.hpp>
 #include <spot_driver/interfaces/tf_broadcaster_interface_base.hpp>
 #include <spot_driver/interfaces/timer_interface_base.hpp>
 #include <spot_driver/types.hpp>
+#include <spot_msgs/msg/latency_histogram_array.hpp>
 #include <string>
 
 namespace spot_ros2::images {
@@ -49,6 +53,9 @@ class SpotImagePublisher {
 
     virtual void createPublishers(const std::set<ImageSource>& image_sources) = 0;
     virtual tl::expected<void, std::string> publishImages(const std::map<ImageSource, ImageWithCameraInfo>& images) = 0;
+    virtual void createLatencyInterfaces(
+        const std::function<spot_msgs::msg::LatencyHistogramArray(bool reset)>& get_latencies) = 0;
+    virtual void publishLatencies(const spot_msgs::msg::LatencyHistogramArray& latencies) = 0;
   };
 
   /**
@@ -84,6 +91,18 @@ class SpotImagePublisher {
    */
   void timerCallback();
 
+  /**
+   * @brief Record the latencies of the images received in the current timer callback.
+   *
+   * @param images Images received from Spot.
+   * @param receipt_time Time at which the images were received and converted.
+   * @param request_duration Time it took to request and convert the images, in seconds.
+   * @param publish_duration Time it took to publish the images, in seconds.
+   */
+  void recordLatencies(const std::map<ImageSource, ImageWithCameraInfo>& images,
+                       const std::chrono::system_clock::time_point& receipt_time, const double request_duration,
+                       const double publish_duration);
+
   /**
    * @brief Image request message which is set when SpotImagePublisher::initialize() is called.
    * @details This is generated only once and then cached because the configuration of which cameras to request images
@@ -101,5 +120,13 @@ class SpotImagePublisher {
   std::unique_ptr<TimerInterfaceBase> timer_;
 
   bool has_arm_;
+
+  /**
+   * @brief Latency histograms of the image pipeline, only set if the publish_image_latencies parameter is true.
+   */
+  std::unique_ptr<ImageLatencyRecorder> latency_recorder_;
+
+  /** @brief Number of timer callbacks since the latencies were last published. */
+  int ticks_since_latencies_published_ = 0;
 };
 }  // namespace spot_ros2::images
@@ -34,6 +34,7 @@ class ParameterInterfaceBase {
   virtual bool getPublishRawRGBCameras() const = 0;
   virtual bool getPublishDepthImages() const = 0;
   virtual bool getPublishDepthRegisteredImages() const = 0;
+  virtual bool getPublishImageLatencies() const = 0;
   virtual std::string getPreferredOdomFrame() const = 0;
   virtual std::string getSpotName() const = 0;
 
@@ -48,6 +49,7 @@ class ParameterInterfaceBase {
   static constexpr bool kDefaultPublishRawRGBCameras{false};
   static constexpr bool kDefaultPublishDepthImages{true};
   static constexpr bool kDefaultPublishDepthRegisteredImages{true};
+  static constexpr bool kDefaultPublishImageLatencies{false};
   static constexpr auto kDefaultPreferredOdomFrame = "odom";
 };
 }  // namespace spot_ros2
@@ -0,0 +1,91 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Scheduling of the batches of long trajectories from the measured latency of robot commands.
+"""
+import threading
+from typing import Optional
+
+
+class BatchDispatchScheduler:
+    """
+    Decides when to send each batch of a long trajectory, so that it reaches the robot a safety margin before the
+    previous batch runs out, but not before the robot reaches its first point.
+
+    The round trip time of robot commands is smoothed like TCP does (RFC 6298), and the lead time of a batch is half
+    of the smoothed round trip time plus four deviations, the uncertainty of the robot clock estimate and the safety
+    margin. Robot command clients convert the reference time of trajectories from the local clock to the robot clock,
+    so batches are scheduled in local time.
+    """
+
+    # Gains of the smoothed round trip time and of its mean deviation
+    SMOOTHING_GAIN = 0.125
+    DEVIATION_GAIN = 0.25
+
+    def __init__(self, safety_margin: float) -> None:
+        """
+        Args:
+            safety_margin: Time in seconds by which a batch should reach the robot before the previous one runs out.
+        """
+        self.safety_margin = safety_margin
+        self._lock = threading.Lock()
+        self._smoothed_round_trip: Optional[float] = None
+        self._round_trip_deviation = 0.0
+        self._min_round_trip: Optional[float] = None
+        self._clock_uncertainty = 0.0
+
+    def record_round_trip(self, round_trip: float) -> None:
+        """Adds the round trip time in seconds of a robot command to the latency estimate"""
+        with self._lock:
+            if self._smoothed_round_trip is None:
+                self._smoothed_round_trip = round_trip
+                self._round_trip_deviation = round_trip / 2.0
+                self._min_round_trip = round_trip
+                return
+            error = round_trip - self._smoothed_round_trip
+            self._round_trip_deviation += self.DEVIATION_GAIN * (abs(error) - self._round_trip_deviation)
+            self._smoothed_round_trip += self.SMOOTHING_GAIN * error
+            self._min_round_trip = min(self._min_round_trip or round_trip, round_trip)
+
+    def record_clock_sync(self, round_trip: Optional[float]) -> None:
+        """
+        Args:
+            round_trip: Round trip time in seconds of the best robot clock skew estimate, which bounds its error by
+                half of it, or None if the robot clock is not synchronized.
+        """
+        with self._lock:
+            self._clock_uncertainty = round_trip / 2.0 if round_trip is not None else 0.0
+
+    @property
+    def lead_time(self) -> float:
+        """Time in seconds before the robot needs a batch at which it should be sent"""
+        with self._lock:
+            latency = 0.0
+            if self._smoothed_round_trip is not None:
+                latency = (self._smoothed_round_trip + 4.0 * self._round_trip_deviation) / 2.0
+            return latency + self._clock_uncertainty + self.safety_margin
+
+    def send_time(self, start_time: float, need_time: float) -> float:
+        """
+        Args:
+            start_time: Local time in seconds of the first point of the batch. A batch reaching the robot earlier
+                would cut the remaining points of the previous batch short.
+            need_time: Local time in seconds of the last point of the previous batch.
+
+        Returns:
+            The local time in seconds at which the batch should be sent.
+        """
+        with self._lock:
+            min_latency = (self._min_round_trip or 0.0) / 2.0
+        return max(start_time - min_latency, need_time - self.lead_time)
+
+    def send_time_before(self, deadline: float) -> float:
+        """
+        Args:
+            deadline: Local time in seconds before which the batch must reach the robot, e.g. the reference time of
+                rebased batches, which the robot rejects once it is in the past.
+
+        Returns:
+            The local time in seconds at which the batch should be sent.
+        """
+        return deadline - self.lead_time
@@ -0,0 +1,112 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Sending of the latest of a stream of commands with asynchronous requests.
+"""
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from spot_driver.deadline_scheduler import DeadlineScheduler, ScheduledCall
+
+T = TypeVar("T")
+
+
+class CoalescingCommandSender(Generic[T]):
+    """
+    Sends a stream of commands, e.g. velocity commands received at joystick rates, so that commands never queue up:
+    at most one command is in flight, commands are sent at most once per period, and only the latest command received
+    meanwhile is sent next, the older ones being dropped.
+    """
+
+    def __init__(
+        self,
+        send_command: Callable[[T], Any],
+        period: float,
+        scheduler: DeadlineScheduler,
+        latency_callback: Optional[Callable[[float], None]] = None,
+        error_callback: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """
+        Args:
+            send_command: Function sending an asynchronous request for a command, which returns a future with
+                add_done_callback and result methods, e.g. robot_command_async or a submission to an executor.
+            period: Minimum time in seconds between two commands, 0 to send commands as soon as the previous one is
+                acknowledged.
+            scheduler: Scheduler sending the commands delayed by the period.
+            latency_callback: Callback receiving the time in seconds from sending a command to its acknowledgement.
+            error_callback: Callback receiving the errors of the requests.
+        """
+        self._send_command = send_command
+        self._period = period
+        self._scheduler = scheduler
+        self._latency_callback = latency_callback
+        self._error_callback = error_callback
+        self._lock = threading.RLock()
+        self._pending: Optional[T] = None
+        self._in_flight = False
+        self._last_send_time = float("-inf")
+        self._scheduled: Optional[ScheduledCall] = None
+        self.coalesced_count = 0
+        """Number of commands dropped because a newer command was received before they were sent"""
+
+    def submit(self, command: T) -> None:
+        """Sends the command as soon as possible, unless a newer command is submitted before"""
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced_count += 1
+            self._pending = command
+            self._send_pending()
+
+    def clear(self) -> None:
+        """
+        Drops the command waiting to be sent, if any, e.g. before stopping the robot so that no older command is sent
+        after the stop. A command already in flight cannot be recalled.
+        """
+        with self._lock:
+            self._pending = None
+            if self._scheduled is not None:
+                self._scheduled.cancel()
+                self._scheduled = None
+
+    def _send_pending(self) -> None:
+        if self._pending is None or self._in_flight:
+            return
+        now = time.monotonic()
+        due_time = self._last_send_time + self._period
+        if now < due_time:
+            if self._scheduled is None:
+                self._scheduled = self._scheduler.call_at(due_time, self._send_scheduled)
+            return
+        command, self._pending = self._pending, None
+        self._in_flight = True
+        self._last_send_time = now
+        try:
+            future = self._send_command(command)
+        except Exception as e:
+            self._in_flight = False
+            self._report_error(e)
+            return
+        future.add_done_callback(lambda done: self._on_done(done, now))
+
+    def _send_scheduled(self) -> None:
+        with self._lock:
+            self._scheduled = None
+            self._send_pending()
+
+    def _on_done(self, future: Any, send_time: float) -> None:
+        latency = time.monotonic() - send_time
+        try:
+            future.result()
+        except Exception as e:
+            self._report_error(e)
+        else:
+            if self._latency_callback is not None:
+                self._latency_callback(latency)
+        with self._lock:
+            self._in_flight = False
+            self._send_pending()
+
+    def _report_error(self, error: Exception) -> None:
+        if self._error_callback is not None:
+            self._error_callback(error)
@@ -0,0 +1,106 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Scheduling of callbacks at deadlines on a single shared thread.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledCall:
+    """Handle of a callback scheduled by a DeadlineScheduler"""
+
+    def __init__(self, deadline: float, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback: Optional[Callable[[], None]] = callback
+
+    def cancel(self) -> None:
+        """Prevents the callback from running, if it did not run yet"""
+        self.callback = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.callback is None
+
+
+class DeadlineScheduler:
+    """
+    Runs callbacks at their deadline on one thread, so that many periodic tasks, e.g. the feedback requests of all
+    the goals being executed, share a thread instead of sleeping on one thread each. Callbacks should return quickly,
+    e.g. by sending asynchronous requests.
+    """
+
+    def __init__(self, name: str = "deadline_scheduler", clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Args:
+            name: Name of the scheduling thread.
+            clock: Clock in seconds of the deadlines.
+        """
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[float, int, ScheduledCall]] = []
+        self._counter = itertools.count()
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def now(self) -> float:
+        """Current time on the clock of the deadlines"""
+        return self._clock()
+
+    def call_at(self, deadline: float, callback: Callable[[], None]) -> ScheduledCall:
+        """
+        Args:
+            deadline: Time at which to run the callback, on the clock of the scheduler.
+            callback: Callback to run.
+
+        Returns:
+            A handle to cancel the call.
+        """
+        call = ScheduledCall(deadline, callback)
+        with self._condition:
+            heapq.heappush(self._queue, (deadline, next(self._counter), call))
+            if self._queue[0][2] is call:
+                self._condition.notify()
+        return call
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ScheduledCall:
+        """Runs the callback after a delay in seconds"""
+        return self.call_at(self._clock() + delay, callback)
+
+    def shutdown(self) -> None:
+        """Stops the scheduling thread, dropping the calls that did not run yet"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._shutdown:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    remaining = self._queue[0][0] - self._clock()
+                    if remaining <= 0.0:
+                        break
+                    self._condition.wait(remaining)
+                if self._shutdown:
+                    self._queue.clear()
+                    return
+                _, _, call = heapq.heappop(self._queue)
+            callback = call.callback
+            if callback is None:
+                continue
+            call.cancel()
+            try:
+                callback()
+            except Exception:
+                logger.exception("Scheduled callback failed")
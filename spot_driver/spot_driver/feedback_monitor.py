@@ -0,0 +1,169 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tracking of command feedback with asynchronous feedback requests.
+"""
+import threading
+import time
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from spot_driver.deadline_scheduler import DeadlineScheduler, ScheduledCall
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class FeedbackMonitor(Generic[K, T]):
+    """
+    Keeps the feedback of a command up to date with asynchronous feedback requests.
+
+    At most one feedback request is in flight at any time, and requests are issued at most once per period. Threads
+    waiting for feedback are woken up through a condition variable when a response arrives, and the version of the
+    feedback is only increased when it actually changed, so that waiters only need to process new feedback.
+
+    Feedback requests are issued from wait, so the thread waiting for feedback drives the requests and no extra thread
+    is needed. When a scheduler is given, requests are issued by the scheduler instead, so that the monitors of many
+    commands share its thread and waiting threads only wake up for new feedback. Such monitors must be stopped once the
+    command is done.
+    """
+
+    def __init__(
+        self,
+        request_feedback: Callable[[K], Any],
+        value_from_response: Callable[[Any], T],
+        period: float,
+        scheduler: Optional[DeadlineScheduler] = None,
+        on_change: Optional[Callable[[T], None]] = None,
+    ) -> None:
+        """
+        Args:
+            request_feedback: Function sending an asynchronous feedback request for a command id, which returns a
+                future with add_done_callback and result methods, e.g. robot_command_feedback_async.
+            value_from_response: Function extracting the part of a response that is compared to detect changes. It
+                should leave out fields that change with every response, such as headers.
+            period: Minimum time in seconds between two feedback requests.
+            scheduler: Scheduler issuing the feedback requests, or None to issue them from wait.
+            on_change: Callback receiving the feedback whenever it changes, e.g. to publish it while the thread
+                executing the command is blocked. It is called from the thread completing the feedback request.
+        """
+        self._request_feedback = request_feedback
+        self._value_from_response = value_from_response
+        self._period = period
+        self._scheduler = scheduler
+        self._on_change = on_change
+        self._scheduled: Optional[ScheduledCall] = None
+        self._condition = threading.Condition()
+        self._key: Optional[K] = None
+        self._in_flight = False
+        self._last_request_time = float("-inf")
+        self._value: Optional[T] = None
+        self._version = 0
+        self._error: Optional[Exception] = None
+
+    def track(self, key: K) -> None:
+        """Starts requesting the feedback of another command. Responses for the previous command are ignored."""
+        with self._condition:
+            self._key = key
+            # Request the feedback of the new command right away
+            self._last_request_time = float("-inf")
+            if not self._in_flight:
+                self._schedule_request(time.monotonic())
+
+    def stop(self) -> None:
+        """Stops requesting feedback. Responses to requests in flight are ignored."""
+        with self._condition:
+            self._key = None
+            if self._scheduled is not None:
+                self._scheduled.cancel()
+                self._scheduled = None
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, Optional[T]]:
+        """
+        Waits until feedback newer than the given version arrives or the timeout expires, issuing feedback requests
+        when they are due.
+
+        Args:
+            version: Version of the feedback the caller already has, 0 if it has none.
+            timeout: Maximum time to wait in seconds.
+
+        Returns:
+            The version of the latest feedback and the feedback, which is the same as the given version if the
+            feedback did not change.
+
+        Raises:
+            Exception: The exception raised by the last feedback request, if it failed.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._error is not None:
+                    error, self._error = self._error, None
+                    raise error
+                if self._version != version:
+                    return self._version, self._value
+                now = time.monotonic()
+                due = now >= self._last_request_time + self._period
+                if self._scheduler is None and self._key is not None and not self._in_flight and due:
+                    self._send_request(now)
+                remaining = deadline - now
+                if remaining <= 0.0:
+                    return self._version, self._value
+                if self._scheduler is None and not self._in_flight:
+                    # Wake up when the next request is due
+                    remaining = min(remaining, max(0.0, self._last_request_time + self._period - now))
+                self._condition.wait(remaining)
+
+    def _schedule_request(self, deadline: float) -> None:
+        if self._scheduler is None:
+            return
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+        # The scheduler and the monitor both use the monotonic clock
+        self._scheduled = self._scheduler.call_at(deadline, self._send_scheduled_request)
+
+    def _send_scheduled_request(self) -> None:
+        with self._condition:
+            self._scheduled = None
+            if self._key is None or self._in_flight:
+                return
+            now = time.monotonic()
+            self._send_request(now)
+            if self._error is not None:
+                # Retry after a period, waiters are told about the error
+                self._schedule_request(now + self._period)
+                self._condition.notify_all()
+
+    def _send_request(self, now: float) -> None:
+        key = self._key
+        self._in_flight = True
+        self._last_request_time = now
+        try:
+            future = self._request_feedback(key)
+        except Exception as e:
+            self._in_flight = False
+            self._error = e
+            return
+        future.add_done_callback(lambda done: self._on_response(key, done))
+
+    def _on_response(self, key: K, future: Any) -> None:
+        try:
+            value: Optional[T] = self._value_from_response(future.result())
+            error = None
+        except Exception as e:
+            value = None
+            error = e
+        changed = False
+        with self._condition:
+            self._in_flight = False
+            if key == self._key:
+                if error is not None:
+                    self._error = error
+                elif value != self._value:
+                    self._value = value
+                    self._version += 1
+                    changed = True
+            if self._key is not None:
+                self._schedule_request(self._last_request_time + self._period)
+            self._condition.notify_all()
+        if changed and self._on_change is not None and value is not None:
+            self._on_change(value)
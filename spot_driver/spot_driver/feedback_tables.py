@@ -0,0 +1,359 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Lookup tables classifying the feedback of robot and manipulation commands into goal responses.
+
+The tables are built once at import from the constants of the feedback messages, so that classifying a feedback
+message only takes a few dictionary lookups. Supporting a new feedback choice or status of the SDK is a matter of
+adding an entry to a table.
+"""
+from enum import Enum
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from bosdyn_msgs.msg import (
+    ArmCommandFeedback,
+    FullBodyCommandFeedback,
+    GripperCommandFeedback,
+    ManipulationApiFeedbackResponse,
+    MobilityCommandFeedback,
+    RobotCommandFeedbackStatusStatus,
+)
+
+
+class GoalResponse(Enum):
+    FAILED = -1
+    IN_PROGRESS = False
+    SUCCESS = True
+
+
+# Name of the logger method, e.g. warn, and message to log when a feedback is classified
+LogMessage = Tuple[str, str]
+Classification = Tuple[GoalResponse, Optional[LogMessage]]
+
+IN_PROGRESS: Classification = (GoalResponse.IN_PROGRESS, None)
+SUCCESS: Classification = (GoalResponse.SUCCESS, None)
+FAILED: Classification = (GoalResponse.FAILED, None)
+
+
+class FeedbackTable:
+    """
+    Classification of the feedback of one kind of command, keyed by feedback choice and by the status of the
+    feedback of this choice.
+    """
+
+    def __init__(self, choice_field: str, unknown_choice: Classification) -> None:
+        """
+        Args:
+            choice_field: Name of the field of the feedback holding its choice, e.g. feedback_choice.
+            unknown_choice: Classification of the feedback of choices that are not in the table.
+        """
+        self._choice_field = choice_field
+        self._unknown_choice = unknown_choice
+        # Feedback choice -> name of the field holding its status, or None, and classification of other statuses
+        self._choices: Dict[int, Tuple[Optional[str], Classification]] = {}
+        self._statuses: Dict[Tuple[int, int], Classification] = {}
+
+    def add(
+        self,
+        choice: int,
+        default: Classification,
+        status_field: Optional[str] = None,
+        statuses: Optional[Mapping[int, Classification]] = None,
+    ) -> "FeedbackTable":
+        """
+        Args:
+            choice: Feedback choice.
+            default: Classification of the feedback of this choice, when its status is not in the statuses.
+            status_field: Name of the field of the feedback holding the feedback of this choice, which has a status.
+            statuses: Classification of the feedback of this choice by status.
+
+        Returns:
+            The table, to chain additions.
+        """
+        self._choices[choice] = (status_field, default)
+        for status, classification in (statuses or {}).items():
+            self._statuses[(choice, status)] = classification
+        return self
+
+    def classify(self, feedback: Any) -> Classification:
+        """
+        Args:
+            feedback: Feedback message holding the choice field.
+
+        Returns:
+            The classification of the feedback.
+        """
+        choice = getattr(feedback, self._choice_field)
+        entry = self._choices.get(choice)
+        if entry is None:
+            return self._unknown_choice
+        status_field, default = entry
+        if status_field is None:
+            return default
+        return self._statuses.get((choice, getattr(feedback, status_field).status.value), default)
+
+
+# Classification of the status common to all robot command feedback. Other statuses, e.g. STATUS_PROCESSING, require
+# looking at the feedback of the command.
+COMMAND_STATUS_TABLE: Dict[int, Classification] = {
+    RobotCommandFeedbackStatusStatus.STATUS_UNKNOWN: IN_PROGRESS,
+    RobotCommandFeedbackStatusStatus.STATUS_COMMAND_OVERRIDDEN: (
+        GoalResponse.FAILED,
+        ("warn", "Command has been overwritten"),
+    ),
+    RobotCommandFeedbackStatusStatus.STATUS_COMMAND_TIMED_OUT: (
+        GoalResponse.FAILED,
+        ("warn", "Command has timed out"),
+    ),
+    RobotCommandFeedbackStatusStatus.STATUS_ROBOT_FROZEN: (
+        GoalResponse.FAILED,
+        ("warn", "Robot is in unsafe state. Will only respond to safe commands"),
+    ),
+    RobotCommandFeedbackStatusStatus.STATUS_INCOMPATIBLE_HARDWARE: (
+        GoalResponse.FAILED,
+        ("warn", "Command is incompatible with current hardware"),
+    ),
+}
+
+
+def _full_body_feedback_table() -> FeedbackTable:
+    fb = FullBodyCommandFeedback().feedback
+    return (
+        FeedbackTable("feedback_choice", IN_PROGRESS)
+        .add(fb.FEEDBACK_STOP_FEEDBACK_SET, SUCCESS)
+        .add(fb.FEEDBACK_FREEZE_FEEDBACK_SET, SUCCESS)
+        .add(
+            fb.FEEDBACK_SELFRIGHT_FEEDBACK_SET,
+            IN_PROGRESS,
+            "selfright_feedback",
+            {fb.selfright_feedback.status.STATUS_COMPLETED: SUCCESS},
+        )
+        .add(
+            fb.FEEDBACK_SAFE_POWER_OFF_FEEDBACK_SET,
+            IN_PROGRESS,
+            "safe_power_off_feedback",
+            {fb.safe_power_off_feedback.status.STATUS_POWERED_OFF: SUCCESS},
+        )
+        .add(
+            fb.FEEDBACK_BATTERY_CHANGE_POSE_FEEDBACK_SET,
+            IN_PROGRESS,
+            "battery_change_pose_feedback",
+            {
+                fb.battery_change_pose_feedback.status.STATUS_COMPLETED: SUCCESS,
+                fb.battery_change_pose_feedback.status.STATUS_FAILED: FAILED,
+            },
+        )
+        .add(
+            fb.FEEDBACK_PAYLOAD_ESTIMATION_FEEDBACK_SET,
+            IN_PROGRESS,
+            "payload_estimation_feedback",
+            {
+                fb.payload_estimation_feedback.status.STATUS_COMPLETED: SUCCESS,
+                fb.payload_estimation_feedback.status.STATUS_SMALL_MASS: SUCCESS,
+                fb.payload_estimation_feedback.status.STATUS_ERROR: FAILED,
+            },
+        )
+        .add(
+            fb.FEEDBACK_CONSTRAINED_MANIPULATION_FEEDBACK_SET,
+            FAILED,
+            "constrained_manipulation_feedback",
+            {fb.constrained_manipulation_feedback.status.STATUS_RUNNING: IN_PROGRESS},
+        )
+    )
+
+
+def _arm_feedback_table() -> FeedbackTable:
+    fb = ArmCommandFeedback().feedback
+    return (
+        FeedbackTable("feedback_choice", (GoalResponse.IN_PROGRESS, ("error", "ERROR: unknown arm command type")))
+        .add(
+            fb.FEEDBACK_ARM_CARTESIAN_FEEDBACK_SET,
+            IN_PROGRESS,
+            "arm_cartesian_feedback",
+            {
+                fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_CANCELLED: FAILED,
+                fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_STALLED: FAILED,
+                fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_COMPLETE: SUCCESS,
+            },
+        )
+        .add(
+            fb.FEEDBACK_ARM_JOINT_MOVE_FEEDBACK_SET,
+            IN_PROGRESS,
+            "arm_joint_move_feedback",
+            {
+                fb.arm_joint_move_feedback.status.STATUS_STALLED: FAILED,
+                fb.arm_joint_move_feedback.status.STATUS_COMPLETE: SUCCESS,
+            },
+        )
+        .add(
+            fb.FEEDBACK_NAMED_ARM_POSITION_FEEDBACK_SET,
+            IN_PROGRESS,
+            "named_arm_position_feedback",
+            {
+                fb.named_arm_position_feedback.status.STATUS_STALLED_HOLDING_ITEM: FAILED,
+                fb.named_arm_position_feedback.status.STATUS_COMPLETE: SUCCESS,
+            },
+        )
+        .add(
+            fb.FEEDBACK_ARM_VELOCITY_FEEDBACK_SET,
+            (GoalResponse.SUCCESS, ("warn", "WARNING: ArmVelocityCommand provides no feedback")),
+        )
+        .add(
+            fb.FEEDBACK_ARM_GAZE_FEEDBACK_SET,
+            IN_PROGRESS,
+            "arm_gaze_feedback",
+            {
+                fb.arm_gaze_feedback.status.STATUS_TOOL_TRAJECTORY_STALLED: FAILED,
+                fb.arm_gaze_feedback.status.STATUS_TRAJECTORY_COMPLETE: SUCCESS,
+            },
+        )
+        .add(
+            fb.FEEDBACK_ARM_STOP_FEEDBACK_SET,
+            (GoalResponse.SUCCESS, ("warn", "WARNING: Stop command provides no feedback")),
+        )
+        .add(
+            fb.FEEDBACK_ARM_DRAG_FEEDBACK_SET,
+            FAILED,
+            "arm_drag_feedback",
+            {fb.arm_drag_feedback.status.STATUS_DRAGGING: IN_PROGRESS},
+        )
+        .add(
+            fb.FEEDBACK_ARM_IMPEDANCE_FEEDBACK_SET,
+            IN_PROGRESS,
+            "arm_impedance_feedback",
+            {
+                fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_CANCELLED: FAILED,
+                fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_STALLED: FAILED,
+                fb.arm_impedance_feedback.status.STATUS_UNKNOWN: FAILED,
+                fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_COMPLETE: SUCCESS,
+            },
+        )
+    )
+
+
+def _mobility_feedback_table() -> FeedbackTable:
+    fb = MobilityCommandFeedback().feedback
+    return (
+        FeedbackTable("feedback_choice", (GoalResponse.IN_PROGRESS, ("error", "ERROR: unknown mobility command type")))
+        .add(
+            fb.FEEDBACK_SE2_TRAJECTORY_FEEDBACK_SET,
+            IN_PROGRESS,
+            "se2_trajectory_feedback",
+            {fb.se2_trajectory_feedback.status.STATUS_AT_GOAL: SUCCESS},
+        )
+        .add(
+            fb.FEEDBACK_SE2_VELOCITY_FEEDBACK_SET,
+            (GoalResponse.SUCCESS, ("warn", "WARNING: Planar velocity commands provide no feedback")),
+        )
+        .add(
+            fb.FEEDBACK_SIT_FEEDBACK_SET,
+            IN_PROGRESS,
+            "sit_feedback",
+            {fb.sit_feedback.status.STATUS_IS_SITTING: SUCCESS},
+        )
+        .add(
+            fb.FEEDBACK_STAND_FEEDBACK_SET,
+            IN_PROGRESS,
+            "stand_feedback",
+            {fb.stand_feedback.status.STATUS_IS_STANDING: SUCCESS},
+        )
+        .add(
+            fb.FEEDBACK_STANCE_FEEDBACK_SET,
+            IN_PROGRESS,
+            "stance_feedback",
+            {
+                fb.stance_feedback.status.STATUS_TOO_FAR_AWAY: FAILED,
+                fb.stance_feedback.status.STATUS_STANCED: SUCCESS,
+            },
+        )
+        .add(
+            fb.FEEDBACK_STOP_FEEDBACK_SET,
+            (GoalResponse.SUCCESS, ("warn", "WARNING: Stop command provides no feedback")),
+        )
+        .add(
+            fb.FEEDBACK_FOLLOW_ARM_FEEDBACK_SET,
+            (GoalResponse.SUCCESS, ("warn", "WARNING: FollowArmCommand provides no feedback")),
+        )
+        # The mobility command feedback is set, but its feedback choice is not. This may happen when a command
+        # finishes.
+        .add(
+            fb.FEEDBACK_NOT_SET,
+            (GoalResponse.SUCCESS, ("info", "mobility command feedback indicates goal has reached")),
+        )
+    )
+
+
+def _gripper_feedback_table() -> FeedbackTable:
+    command = GripperCommandFeedback().command
+    return FeedbackTable(
+        "command_choice", (GoalResponse.IN_PROGRESS, ("error", "ERROR: unknown gripper command type"))
+    ).add(
+        command.COMMAND_CLAW_GRIPPER_FEEDBACK_SET,
+        SUCCESS,
+        "claw_gripper_feedback",
+        {
+            command.claw_gripper_feedback.status.STATUS_IN_PROGRESS: IN_PROGRESS,
+            command.claw_gripper_feedback.status.STATUS_UNKNOWN: (
+                GoalResponse.IN_PROGRESS,
+                ("error", "ERROR: claw grippper status unknown"),
+            ),
+        },
+    )
+
+
+def _manipulation_state_table() -> Dict[int, GoalResponse]:
+    state = ManipulationApiFeedbackResponse().current_state
+    return {
+        state.MANIP_STATE_UNKNOWN: GoalResponse.FAILED,
+        state.MANIP_STATE_DONE: GoalResponse.SUCCESS,
+        state.MANIP_STATE_SEARCHING_FOR_GRASP: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_MOVING_TO_GRASP: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_GRASPING_OBJECT: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_PLACING_OBJECT: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_GRASP_SUCCEEDED: GoalResponse.SUCCESS,
+        state.MANIP_STATE_GRASP_FAILED: GoalResponse.FAILED,
+        state.MANIP_STATE_GRASP_PLANNING_SUCCEEDED: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_GRASP_PLANNING_NO_SOLUTION: GoalResponse.FAILED,
+        state.MANIP_STATE_GRASP_FAILED_TO_RAYCAST_INTO_MAP: GoalResponse.FAILED,
+        state.MANIP_STATE_GRASP_PLANNING_WAITING_DATA_AT_EDGE: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_WALKING_TO_OBJECT: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_ATTEMPTING_RAYCASTING: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_MOVING_TO_PLACE: GoalResponse.IN_PROGRESS,
+        state.MANIP_STATE_PLACE_FAILED_TO_RAYCAST_INTO_MAP: GoalResponse.FAILED,
+        state.MANIP_STATE_PLACE_SUCCEEDED: GoalResponse.SUCCESS,
+        state.MANIP_STATE_PLACE_FAILED: GoalResponse.FAILED,
+    }
+
+
+FULL_BODY_FEEDBACK_TABLE = _full_body_feedback_table()
+ARM_FEEDBACK_TABLE = _arm_feedback_table()
+MOBILITY_FEEDBACK_TABLE = _mobility_feedback_table()
+GRIPPER_FEEDBACK_TABLE = _gripper_feedback_table()
+MANIPULATION_STATE_TABLE = _manipulation_state_table()
+
+
+def classify_full_body_feedback(feedback: FullBodyCommandFeedback) -> Classification:
+    return COMMAND_STATUS_TABLE.get(feedback.status.value) or FULL_BODY_FEEDBACK_TABLE.classify(feedback.feedback)
+
+
+def classify_arm_feedback(feedback: ArmCommandFeedback) -> Classification:
+    return COMMAND_STATUS_TABLE.get(feedback.status.value) or ARM_FEEDBACK_TABLE.classify(feedback.feedback)
+
+
+def classify_mobility_feedback(feedback: MobilityCommandFeedback) -> Classification:
+    return COMMAND_STATUS_TABLE.get(feedback.status.value) or MOBILITY_FEEDBACK_TABLE.classify(feedback.feedback)
+
+
+def classify_gripper_feedback(feedback: GripperCommandFeedback) -> Classification:
+    return COMMAND_STATUS_TABLE.get(feedback.status.value) or GRIPPER_FEEDBACK_TABLE.classify(feedback.command)
+
+
+def classify_manipulation_feedback(feedback: ManipulationApiFeedbackResponse) -> GoalResponse:
+    """
+    Raises:
+        ValueError: If the manipulation state is unknown.
+    """
+    response = MANIPULATION_STATE_TABLE.get(feedback.current_state.value)
+    if response is None:
+        raise ValueError("Unknown manipulation state type")
+    return response
@@ -0,0 +1,122 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Arbitration of action goals by the robot resources they command.
+"""
+import threading
+from enum import Flag, auto
+from typing import Dict, Hashable, List, Optional
+
+from bosdyn.api import robot_command_pb2
+from bosdyn.client.robot_command import RobotCommandBuilder
+
+
+class Resource(Flag):
+    """Robot resources commanded by a goal"""
+
+    NONE = 0
+    MOBILITY = auto()
+    ARM = auto()
+    GRIPPER = auto()
+    ALL = MOBILITY | ARM | GRIPPER
+
+
+def robot_command_resources(command: robot_command_pb2.RobotCommand) -> Resource:
+    """
+    Args:
+        command: Robot command.
+
+    Returns:
+        The resources commanded by the robot command. Full body commands, and commands without any command, are
+        considered to command all resources.
+    """
+    if command.WhichOneof("command") != "synchronized_command":
+        return Resource.ALL
+    synchronized_command = command.synchronized_command
+    resources = Resource.NONE
+    if synchronized_command.HasField("mobility_command"):
+        resources |= Resource.MOBILITY
+    if synchronized_command.HasField("arm_command"):
+        resources |= Resource.ARM
+    if synchronized_command.HasField("gripper_command"):
+        resources |= Resource.GRIPPER
+    return resources if resources else Resource.ALL
+
+
+def resource_stop_command(
+    resources: Resource, gripper_open_fraction: Optional[float] = None
+) -> Optional[robot_command_pb2.RobotCommand]:
+    """
+    Args:
+        resources: Resources to stop.
+        gripper_open_fraction: Current opening of the gripper, from 0 (closed) to 1 (open), to hold it in place.
+            The gripper is not stopped when it is unknown, as the claw has no stop command.
+
+    Returns:
+        A robot command stopping the resources, leaving the other resources executing their commands, or None if no
+        resource can be stopped. Stopping all resources is a full body stop.
+    """
+    if resources == Resource.ALL:
+        return RobotCommandBuilder.stop_command()
+    commands: List[robot_command_pb2.RobotCommand] = []
+    if Resource.MOBILITY in resources:
+        # A mobility stop, unlike a stand, never makes a sitting robot stand up
+        mobility_stop = robot_command_pb2.RobotCommand()
+        mobility_stop.synchronized_command.mobility_command.stop_request.SetInParent()
+        commands.append(mobility_stop)
+    if Resource.ARM in resources:
+        arm_stop = robot_command_pb2.RobotCommand()
+        arm_stop.synchronized_command.arm_command.arm_stop_command.SetInParent()
+        commands.append(arm_stop)
+    if Resource.GRIPPER in resources and gripper_open_fraction is not None:
+        commands.append(RobotCommandBuilder.claw_gripper_open_fraction_command(gripper_open_fraction))
+    if not commands:
+        return None
+    return RobotCommandBuilder.build_synchro_command(*commands)
+
+
+class GoalArbiter:
+    """
+    Keeps track of the resources held by the active goals, so that a new goal only preempts the goals holding some
+    of its resources, and goals commanding disjoint resources, e.g. a gripper command while the robot walks, run
+    concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._goals: Dict[Hashable, Resource] = {}
+
+    def acquire(self, goal: Hashable, resources: Resource) -> List[Hashable]:
+        """
+        Args:
+            goal: Goal, e.g. its goal handle.
+            resources: Resources commanded by the goal.
+
+        Returns:
+            The goals holding some of the resources, which no longer hold any and should be preempted.
+        """
+        with self._lock:
+            preempted = [other for other, held in self._goals.items() if held & resources]
+            for other in preempted:
+                del self._goals[other]
+            self._goals[goal] = resources
+        return preempted
+
+    def release(self, goal: Hashable) -> None:
+        """Releases the resources held by a goal, if it was not preempted"""
+        with self._lock:
+            self._goals.pop(goal, None)
+
+    def resources_to_stop(self, goal: Hashable) -> Resource:
+        """
+        Args:
+            goal: Goal being cancelled.
+
+        Returns:
+            The resources to stop after the goal is cancelled: all of them when no other goal executes, so that the
+            robot is fully stopped, otherwise the resources held by the goal, which are none if it was preempted.
+        """
+        with self._lock:
+            if all(other is goal for other in self._goals):
+                return Resource.ALL
+            return self._goals.get(goal, Resource.NONE)
@@ -0,0 +1,119 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Scheduling of camera image requests, and bounded thread pool used to decode and publish camera images off the image
+timer thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Generic, Hashable, List, Set, TypeVar
+
+from rclpy.impl.rcutils_logger import RcutilsLogger
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class LatestFramePipeline(Generic[K, T]):
+    """
+    Hands frames over to a bounded pool of worker threads, keeping at most one pending frame per key.
+
+    Frames that share a key (for example a camera and an image type) are handled one at a time and in order. If a new
+    frame for a key arrives while the previous one is still waiting for a worker, the older frame is dropped, so a
+    pipeline that backs up keeps publishing the most recent data instead of growing a queue.
+    """
+
+    def __init__(self, handler: Callable[[K, T], None], max_workers: int, logger: RcutilsLogger) -> None:
+        """
+        Args:
+            handler: Function called from a worker thread with the key and the frame to process.
+            max_workers: Number of worker threads in the pool.
+            logger: Logger used to report exceptions raised by the handler.
+        """
+        self._handler = handler
+        self._logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image_pipeline")
+        self._lock = threading.Lock()
+        self._pending: Dict[K, T] = {}
+        self._active: Set[K] = set()
+        self._dropped_frames = 0
+
+    # Frames that share a key are handled one at a time
+    FRAMES_IN_FLIGHT_PER_KEY = 1
+
+    @property
+    def dropped_frames(self) -> int:
+        """Number of frames replaced by a newer one before a worker could pick them up."""
+        return self._dropped_frames
+
+    def submit(self, key: K, frame: T) -> None:
+        """Queue a frame for processing, replacing any frame with the same key that has not been picked up yet."""
+        with self._lock:
+            if key in self._pending:
+                self._dropped_frames += 1
+            self._pending[key] = frame
+            if key in self._active:
+                # A worker is already draining this key and will pick up the new frame when it is done.
+                return
+            self._active.add(key)
+        self._executor.submit(self._drain, key)
+
+    def shutdown(self) -> None:
+        """Drop all pending frames and stop the worker threads."""
+        with self._lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _drain(self, key: K) -> None:
+        while True:
+            with self._lock:
+                if key not in self._pending:
+                    self._active.discard(key)
+                    return
+                frame = self._pending.pop(key)
+            try:
+                self._handler(key, frame)
+            except Exception as e:
+                self._logger.error(f"Failed to process frame for {key}: {e}")
+
+
+class CameraRateScheduler:
+    """
+    Decides which cameras are due on each tick of an image timer, so that cameras can be published at different rates.
+
+    The timer runs at the rate of the fastest camera, see period. All cameras that are due on the same tick are meant
+    to be requested from the robot together.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        """
+        Args:
+            rates: Rate in Hz of every camera, all rates must be positive.
+        """
+        if not rates or min(rates.values()) <= 0.0:
+            raise ValueError(f"Camera rates must be positive, got {rates}")
+        self._periods = {camera: 1.0 / rate for camera, rate in rates.items()}
+        self._next_due: Dict[str, float] = {}
+        self.period = min(self._periods.values())
+
+    def due(self, now: float) -> List[str]:
+        """
+        Args:
+            now: Current time in seconds, from a monotonic clock.
+
+        Returns:
+            The cameras to request on this tick, in the order they were given.
+        """
+        due = []
+        for camera, period in self._periods.items():
+            next_due = self._next_due.get(camera)
+            # Half a tick of tolerance absorbs the jitter of the timer
+            if next_due is not None and now < next_due - self.period / 2:
+                continue
+            due.append(camera)
+            if next_due is None or now - next_due > period:
+                # First request, or the camera fell more than a period behind: restart the schedule from now
+                self._next_due[camera] = now + period
+            else:
+                self._next_due[camera] = next_due + period
+        return due
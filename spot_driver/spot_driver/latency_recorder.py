@@ -0,0 +1,95 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Latency histograms of the stages of the image pipeline, per camera, and of the stops, per kind of stop.
+"""
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from spot_msgs.msg import LatencyHistogram as LatencyHistogramMsg  # type: ignore
+from spot_msgs.msg import LatencyHistogramArray  # type: ignore
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKET_UPPER_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class LatencyHistogram:
+    """Histogram of latencies with fixed buckets, keeping track of their count, mean and maximum."""
+
+    def __init__(self, upper_bounds: Sequence[float] = DEFAULT_BUCKET_UPPER_BOUNDS) -> None:
+        """
+        Args:
+            upper_bounds: Increasing upper bounds of the buckets in seconds. Latencies above the last bound are counted
+                in an extra bucket.
+        """
+        self.upper_bounds = list(upper_bounds)
+        self.counts = [0] * (len(self.upper_bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency: float) -> None:
+        """Adds a latency in seconds to the histogram"""
+        self.counts[bisect.bisect_left(self.upper_bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """Thread safe collection of latency histograms, keyed by source, e.g. a camera, and stage, e.g. decode."""
+
+    def __init__(self, upper_bounds: Sequence[float] = DEFAULT_BUCKET_UPPER_BOUNDS) -> None:
+        self._upper_bounds = upper_bounds
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, source: str, stage: str, latency: float) -> None:
+        """
+        Args:
+            source: Image topic namespace of the camera, e.g. camera/frontleft, or kind of stop, e.g. estop/hard
+            stage: Stage of the image pipeline, e.g. decode, or of the stop, e.g. dispatch
+            latency: Latency in seconds
+        """
+        with self._lock:
+            histogram = self._histograms.get((source, stage))
+            if histogram is None:
+                histogram = self._histograms[(source, stage)] = LatencyHistogram(self._upper_bounds)
+            histogram.record(latency)
+
+    def reset(self) -> None:
+        """Clears all the histograms"""
+        with self._lock:
+            self._histograms.clear()
+
+    def to_msg(self, reset: bool = False) -> LatencyHistogramArray:
+        """
+        Args:
+            reset: Whether to clear the histograms once converted, under the same lock so that no latency recorded in
+                between is lost
+
+        Returns:
+            The histograms, sorted by source and stage. The header is left for the caller to fill.
+        """
+        histograms: List[LatencyHistogramMsg] = []
+        with self._lock:
+            for (source, stage), histogram in sorted(self._histograms.items()):
+                histograms.append(
+                    LatencyHistogramMsg(
+                        source=source,
+                        stage=stage,
+                        upper_bounds=histogram.upper_bounds,
+                        counts=histogram.counts,
+                        count=histogram.count,
+                        mean=histogram.mean,
+                        max=histogram.max,
+                    )
+                )
+            if reset:
+                self._histograms.clear()
+        return LatencyHistogramArray(histograms=histograms)
@@ -0,0 +1,54 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Local copy of the mobility params of the driver.
+"""
+import threading
+from typing import Callable, Optional
+
+from bosdyn.api.spot.robot_command_pb2 import MobilityParams
+
+
+class MobilityParamsCache:
+    """
+    Holds the mobility params last set by the driver, so that the status publisher does not fetch and copy them
+    field by field. Every change stores a new snapshot, snapshots are never modified once stored and can be read
+    without copying.
+    """
+
+    def __init__(self, params: Optional[MobilityParams] = None) -> None:
+        """
+        Args:
+            params: Initial mobility params, e.g. the ones of the wrapper. Defaults to empty params.
+        """
+        self._lock = threading.Lock()
+        self._params = MobilityParams()
+        if params is not None:
+            self._params.CopyFrom(params)
+
+    def get(self) -> MobilityParams:
+        """Current snapshot of the mobility params, which must not be modified"""
+        return self._params
+
+    def update(
+        self, modify: Callable[[MobilityParams], None], apply: Optional[Callable[[MobilityParams], None]] = None
+    ) -> bool:
+        """
+        Args:
+            modify: Callback modifying a copy of the current mobility params.
+            apply: Callback applying the modified params, e.g. SpotWrapper.set_mobility_params. When it raises, the
+                cache is left unchanged.
+
+        Returns:
+            True if the mobility params changed, in which case get returns the new snapshot.
+        """
+        with self._lock:
+            params = MobilityParams()
+            params.CopyFrom(self._params)
+            modify(params)
+            if apply is not None:
+                apply(params)
+            if params == self._params:
+                return False
+            self._params = params
+            return True
@@ -3,59 +3,96 @@
 """
 Utility class with methods to manipulate robot commands.
 """
-from typing import Any, List
-
-from bosdyn.api import robot_command_pb2
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+from bosdyn.api import arm_command_pb2, robot_command_pb2, trajectory_pb2
+from bosdyn.client.math_helpers import SE2Pose
 from bosdyn.util import duration_to_seconds
 
+NANOSECONDS_PER_SECOND = 1_000_000_000
 
-def should_batch(command: robot_command_pb2.RobotCommand, batch_size: int) -> bool:
-    """
-    This method returns true if the given command contains trajectories that
-    can be batched, false otherwise. To be batched, the command must contain
-    only one trajectory longer than the batch size or multiple trajectories
-    that are also time aligned.
+# The robot rejects these trajectories when their reference time is in the
+# past, so the reference time of their batches is moved to their first point.
+REBASED_TRAJECTORY_TYPES = (arm_command_pb2.ArmJointTrajectory, trajectory_pb2.ScalarTrajectory)
 
-    Args:
-    command: A robot command with some trajectories.
-    batch_size: A batch size
 
-    Returns:
-        If the command has no trajectory is longer than the given batch size,
-        then returns false.
-        If the command has one trajectory longer than the given batch size, or
-        multiple trajectories which are also time aligned, then return true.
+@dataclass
+class CommandBatch:
+    """
+    A command holding a batch of trajectory points, with the times since the
+    reference time of the original command of its first and last points.
+    If the batch is rebased, the reference time of some of its trajectories
+    is its first point, and it must reach the robot before that time.
     """
 
-    # Find all trajectories that require batching.
+    command: robot_command_pb2.RobotCommand
+    start_time: float
+    end_time: float
+    rebased: bool = False
 
-    long_trajectories = []
 
+def get_trajectories(command: robot_command_pb2.RobotCommand) -> List[Any]:
+    """
+    Return the trajectories of the given command that can be batched, always
+    in the same order: mobility, arm and gripper.
+
+    Args:
+        command: A robot command with some trajectories.
+
+    Returns:
+        The trajectory protobuf messages, each containing a repeated field "points".
+    """
+    trajectories: List[Any] = []
     if command.HasField("synchronized_command"):
         if command.synchronized_command.HasField("mobility_command"):
             mobility_request = command.synchronized_command.mobility_command
-            points = mobility_request.se2_trajectory_request.trajectory.points
-            if len(points) > batch_size:
-                long_trajectories.append(points)
+            trajectories.append(mobility_request.se2_trajectory_request.trajectory)
         if command.synchronized_command.HasField("arm_command"):
             arm_request = command.synchronized_command.arm_command
             if arm_request.HasField("arm_cartesian_command"):
-                points = arm_request.arm_cartesian_command.pose_trajectory_in_task.points
-                if len(points) > batch_size:
-                    long_trajectories.append(points)
+                trajectories.append(arm_request.arm_cartesian_command.pose_trajectory_in_task)
             elif arm_request.HasField("arm_joint_move_command"):
-                points = arm_request.arm_joint_move_command.trajectory.points
-                if len(points) > batch_size:
-                    long_trajectories.append(points)
+                trajectories.append(arm_request.arm_joint_move_command.trajectory)
             elif arm_request.HasField("arm_impedance_command"):
-                points = arm_request.arm_impedance_command.task_tform_desired_tool.points
-                if len(points) > batch_size:
-                    long_trajectories.append(points)
+                trajectories.append(arm_request.arm_impedance_command.task_tform_desired_tool)
         if command.synchronized_command.HasField("gripper_command"):
             gripper_request = command.synchronized_command.gripper_command
-            points = gripper_request.claw_gripper_command.trajectory.points
-            if len(points) > batch_size:
-                long_trajectories.append(points)
+            trajectories.append(gripper_request.claw_gripper_command.trajectory)
+    return trajectories
+
+
+def get_times_since_reference(trajectory: Any) -> np.ndarray:
+    """
+    Extract the time_since_reference of all the points of a trajectory.
+
+    Args:
+        trajectory: A protobuf message containing a repeated field "points".
+
+    Returns:
+        An array of integer nanoseconds, one per point.
+    """
+    return np.fromiter(
+        (
+            point.time_since_reference.seconds * NANOSECONDS_PER_SECOND + point.time_since_reference.nanos
+            for point in trajectory.points
+        ),
+        dtype=np.int64,
+        count=len(trajectory.points),
+    )
+
+
+def _should_batch(times: List[np.ndarray], batch_size: int, tolerance: float) -> bool:
+    """
+    Same as should_batch, for the times since reference of the trajectories of a command.
+    """
+
+    # Find all trajectories that require batching.
+
+    long_trajectories = [trajectory_times for trajectory_times in times if len(trajectory_times) > batch_size]
 
     long_trajectories_count = len(long_trajectories)
 
@@ -68,110 +105,194 @@ def should_batch(command: robot_command_pb2.RobotCommand, batch_size: int) -> bo
         return True
 
     # There is more than one trajectory longer than the batch size.
+    return _are_time_aligned(long_trajectories, tolerance)
+
+
+def _are_time_aligned(times: List[np.ndarray], tolerance: float) -> bool:
+    """
+    Return true if all the given trajectory times have the same size and differ by at most the tolerance in seconds.
+    """
 
-    # Check that all long trajectories have the same size.
-    long_trajectory_size = len(long_trajectories[0])
-    same_size = all(len(trajectory) == long_trajectory_size for trajectory in long_trajectories)
+    # Check that all trajectories have the same size.
+    trajectory_size = len(times[0])
+    same_size = all(len(trajectory) == trajectory_size for trajectory in times)
     if not same_size:
         return False
 
-    # Check that all long trajectories to are all time aligned.
-    for i in range(long_trajectory_size):
-        time_since_reference = duration_to_seconds(long_trajectories[0][i].time_since_reference)
-        for j in range(1, len(long_trajectories)):
-            if not duration_to_seconds(long_trajectories[j][i].time_since_reference) == time_since_reference:
-                return False
+    # Check that all trajectories to are all time aligned.
+    tolerance_nsec = int(tolerance * NANOSECONDS_PER_SECOND)
+    return all(np.all(np.abs(trajectory - times[0]) <= tolerance_nsec) for trajectory in times[1:])
+
+
+def should_batch(command: robot_command_pb2.RobotCommand, batch_size: int, tolerance: float = 0.0) -> bool:
+    """
+    This method returns true if the given command contains trajectories that
+    can be batched, false otherwise. To be batched, the command must contain
+    only one trajectory longer than the batch size or multiple trajectories
+    that are also time aligned.
+
+    Args:
+    command: A robot command with some trajectories.
+    batch_size: A batch size
+    tolerance: Maximum difference in seconds between the times since
+        reference of two points for them to be considered aligned.
 
-    return True
+    Returns:
+        If the command has no trajectory is longer than the given batch size,
+        then returns false.
+        If the command has one trajectory longer than the given batch size, or
+        multiple trajectories which are also time aligned, then return true.
+    """
+    times = [get_times_since_reference(trajectory) for trajectory in get_trajectories(command)]
+    return _should_batch(times, batch_size, tolerance)
 
 
-def slice_trajectory(trajectory: Any, index: int, batch_size: int) -> bool:
+def get_reference_time(command: robot_command_pb2.RobotCommand) -> Optional[float]:
     """
-    This command expects a trajectory protobuf message containing a repeated
-    field "points" that we want to slice.
+    Return the reference time of the trajectories of the given command.
 
     Args:
-        trajectory: A protobuf message containing a repeated field "points" that we want to slice.
-        index: The position to slice the field from.
-        batch_size: The length of the slice.
+        command: A robot command with some trajectories.
 
     Returns:
-        True if the last batch has been extracted.
+        The reference time in seconds of the first trajectory that has one,
+        or None if no trajectory has a reference time.
+    """
+    for trajectory in get_trajectories(command):
+        if trajectory.HasField("reference_time"):
+            return trajectory.reference_time.seconds + trajectory.reference_time.nanos / NANOSECONDS_PER_SECOND
+    return None
 
+
+def _batch_times(times: List[np.ndarray], index: int, batch_size: int) -> Tuple[float, float]:
+    """
+    Return the first and last time since reference in seconds of the batches of the given trajectory times, which
+    start at the given index, or infinity if all trajectories are shorter than the index.
     """
-    is_last_batch = True
-    batch = trajectory.points[index : index + batch_size]
-    if len(trajectory.points) - len(batch) - index > 0:
-        is_last_batch = False
-    trajectory.ClearField("points")
-    trajectory.points.extend(batch)
-    return is_last_batch
+    start_times = [trajectory_times[index] for trajectory_times in times if len(trajectory_times) > index]
+    if not start_times:
+        return float("inf"), float("inf")
+    end_times = [
+        trajectory_times[min(len(trajectory_times), index + batch_size) - 1]
+        for trajectory_times in times
+        if len(trajectory_times) > index
+    ]
+    return int(min(start_times)) / NANOSECONDS_PER_SECOND, int(max(end_times)) / NANOSECONDS_PER_SECOND
+
+
+def _rebase_trajectory(trajectory: Any, times: np.ndarray) -> None:
+    """
+    Move the reference time of the given trajectory to its first point,
+    keeping the time of all points unchanged.
 
+    Args:
+        trajectory: A protobuf message containing a repeated field "points" and a reference time.
+        times: The original times since reference in nanoseconds of the points.
+    """
+    offset = int(times[0])
+    trajectory.reference_time.FromNanoseconds(trajectory.reference_time.ToNanoseconds() + offset)
+    for point, time_since_reference in zip(trajectory.points, (times - offset).tolist()):
+        point.time_since_reference.FromNanoseconds(time_since_reference)
 
-def batch_command(
-    command: robot_command_pb2.RobotCommand, batch_size: int, overlapping: int = 0
-) -> List[robot_command_pb2.RobotCommand]:
+
+def iter_batch_command(
+    command: robot_command_pb2.RobotCommand, batch_size: int, overlapping: int = 0, tolerance: float = 0.0
+) -> Iterator[CommandBatch]:
     """
     Analyze the trajectories inside the given command and if they require
-    batching, then return an equivalent sequence of commands.
+    batching, then lazily generate an equivalent sequence of commands.
+
+    Each batch is built from a template, which is a copy of the command
+    without trajectory points, plus the slice of points of the batch. Only
+    one batch is in memory at a time, and every point is copied at most
+    (1 + overlapping / stride) times. The times since reference of the
+    points are extracted once, to check the alignment of the trajectories
+    and to find when each batch starts and ends.
+
+    The reference time of arm joint and gripper trajectories is moved to the
+    first point of each batch, because the robot rejects them when their
+    reference time is in the past, which is the case for all batches but the
+    first one otherwise.
 
     Args:
         command: A robot command with some trajectories.
         batch_size: A batch size
         overlapping: Number of points that must overlap between batched
             trajectories.
-
-    Returns:
-        If no trajectory is longer than the given batch size, then returns
-        an array containing the same robot command.
-        If it contains one trajectory longer than the given batch size, or
-        multiple trajectories which are also time aligned, then return an
-        array of robot commands, each of them representing a batch.
+        tolerance: Maximum difference in seconds between the times since
+            reference of two points for them to be considered aligned.
+
+    Yields:
+        The same robot command if no trajectory is longer than the given
+        batch size, or if the trajectories cannot be batched. Otherwise, one
+        robot command per batch. Each command comes with its minimum
+        time_since_reference, as returned by min_time_since_reference, and
+        the maximum time_since_reference of its points.
     """
 
-    if not should_batch(command, batch_size):
-        return [command]
+    trajectories = get_trajectories(command)
+    times = [get_times_since_reference(trajectory) for trajectory in trajectories]
 
     # This is the increment to find the position of the next batch.
     stride = batch_size - overlapping
-    if stride < 1:
-        return [command]
+    if stride < 1 or not _should_batch(times, batch_size, tolerance):
+        yield CommandBatch(command, *_batch_times(times, 0, max((len(t) for t in times), default=0)))
+        return
 
-    index = 0
-    commands: List[robot_command_pb2.RobotCommand] = []
+    template = robot_command_pb2.RobotCommand()
+    template.CopyFrom(command)
+    for trajectory in get_trajectories(template):
+        trajectory.ClearField("points")
 
+    index = 0
     is_last_batch = False
     while not is_last_batch:
-        is_last_batch = True
-
         new_command = robot_command_pb2.RobotCommand()
-        new_command.CopyFrom(command)
-
-        if new_command.HasField("synchronized_command"):
-            if new_command.synchronized_command.HasField("mobility_command"):
-                mobility_request = new_command.synchronized_command.mobility_command
-                trajectory = mobility_request.se2_trajectory_request.trajectory
-                is_last_batch = slice_trajectory(trajectory, index, batch_size) and is_last_batch
-            if new_command.synchronized_command.HasField("arm_command"):
-                arm_request = new_command.synchronized_command.arm_command
-                if arm_request.HasField("arm_cartesian_command"):
-                    trajectory = arm_request.arm_cartesian_command.pose_trajectory_in_task
-                    is_last_batch = slice_trajectory(trajectory, index, batch_size) and is_last_batch
-                elif arm_request.HasField("arm_joint_move_command"):
-                    trajectory = arm_request.arm_joint_move_command.trajectory
-                    is_last_batch = slice_trajectory(trajectory, index, batch_size) and is_last_batch
-                elif arm_request.HasField("arm_impedance_command"):
-                    trajectory = arm_request.arm_impedance_command.task_tform_desired_tool
-                    is_last_batch = slice_trajectory(trajectory, index, batch_size) and is_last_batch
-            if new_command.synchronized_command.HasField("gripper_command"):
-                gripper_request = new_command.synchronized_command.gripper_command
-                trajectory = gripper_request.claw_gripper_command.trajectory
-                is_last_batch = slice_trajectory(trajectory, index, batch_size) and is_last_batch
-
-        commands.append(new_command)
+        new_command.CopyFrom(template)
+
+        is_last_batch = True
+        rebased = False
+        for trajectory, trajectory_times, new_trajectory in zip(trajectories, times, get_trajectories(new_command)):
+            batch = trajectory.points[index : index + batch_size]
+            new_trajectory.points.extend(batch)
+            if (
+                batch
+                and isinstance(new_trajectory, REBASED_TRAJECTORY_TYPES)
+                and new_trajectory.HasField("reference_time")
+            ):
+                _rebase_trajectory(new_trajectory, trajectory_times[index : index + batch_size])
+                rebased = True
+            if len(trajectory.points) - len(batch) - index > 0:
+                is_last_batch = False
+
+        yield CommandBatch(new_command, *_batch_times(times, index, batch_size), rebased=rebased)
         index += stride
 
-    return commands
+
+def batch_command(
+    command: robot_command_pb2.RobotCommand, batch_size: int, overlapping: int = 0, tolerance: float = 0.0
+) -> List[robot_command_pb2.RobotCommand]:
+    """
+    Analyze the trajectories inside the given command and if they require
+    batching, then return an equivalent sequence of commands.
+    See iter_batch_command to generate the batches lazily.
+
+    Args:
+        command: A robot command with some trajectories.
+        batch_size: A batch size
+        overlapping: Number of points that must overlap between batched
+            trajectories.
+        tolerance: Maximum difference in seconds between the times since
+            reference of two points for them to be considered aligned.
+
+    Returns:
+        If no trajectory is longer than the given batch size, then returns
+        an array containing the same robot command.
+        If it contains one trajectory longer than the given batch size, or
+        multiple trajectories which are also time aligned, then return an
+        array of robot commands, each of them representing a batch.
+    """
+    return [batch.command for batch in iter_batch_command(command, batch_size, overlapping, tolerance)]
 
 
 def min_time_since_reference(command: robot_command_pb2.RobotCommand) -> float:
@@ -179,6 +300,8 @@ def min_time_since_reference(command: robot_command_pb2.RobotCommand) -> float:
     This method inspects all trajectories in the command and returns the minimum
     time_since_reference.
     It returns float("inf") if no trajectory is available.
+    Trajectories of batches may have different reference times, so times are
+    relative to the earliest reference time of the trajectories.
 
     Args:
         command: The command to inspect.
@@ -186,37 +309,21 @@ def min_time_since_reference(command: robot_command_pb2.RobotCommand) -> float:
     Returns:
         The minimum time_since_reference of all trajectories in the command.
     """
+    trajectories = [trajectory for trajectory in get_trajectories(command) if trajectory.points]
+    reference_times = [
+        trajectory.reference_time.ToNanoseconds()
+        for trajectory in trajectories
+        if trajectory.HasField("reference_time")
+    ]
+    earliest_reference_time = min(reference_times, default=0)
+
     min_time_since_reference = float("inf")
-    if command.HasField("synchronized_command"):
-        if command.synchronized_command.HasField("mobility_command"):
-            mobility_request = command.synchronized_command.mobility_command
-            if trajectory := mobility_request.se2_trajectory_request.trajectory:
-                time = duration_to_seconds(trajectory.points[0].time_since_reference)
-                if time < min_time_since_reference:
-                    min_time_since_reference = time
-        if command.synchronized_command.HasField("arm_command"):
-            arm_request = command.synchronized_command.arm_command
-            if arm_request.HasField("arm_cartesian_command"):
-                if trajectory := arm_request.arm_cartesian_command.pose_trajectory_in_task:
-                    time = duration_to_seconds(trajectory.points[0].time_since_reference)
-                    if time < min_time_since_reference:
-                        min_time_since_reference = time
-            elif arm_request.HasField("arm_joint_move_command"):
-                if trajectory := arm_request.arm_joint_move_command.trajectory:
-                    time = duration_to_seconds(trajectory.points[0].time_since_reference)
-                    if time < min_time_since_reference:
-                        min_time_since_reference = time
-            elif arm_request.HasField("arm_impedance_command"):
-                if trajectory := arm_request.arm_impedance_command.task_tform_desired_tool:
-                    time = duration_to_seconds(trajectory.points[0].time_since_reference)
-                    if time < min_time_since_reference:
-                        min_time_since_reference = time
-        if command.synchronized_command.HasField("gripper_command"):
-            gripper_request = command.synchronized_command.gripper_command
-            if trajectory := gripper_request.claw_gripper_command.trajectory:
-                time = duration_to_seconds(trajectory.points[0].time_since_reference)
-                if time < min_time_since_reference:
-                    min_time_since_reference = time
+    for trajectory in trajectories:
+        time = duration_to_seconds(trajectory.points[0].time_since_reference)
+        if trajectory.HasField("reference_time"):
+            time += (trajectory.reference_time.ToNanoseconds() - earliest_reference_time) / NANOSECONDS_PER_SECOND
+        if time < min_time_since_reference:
+            min_time_since_reference = time
     return min_time_since_reference
 
 
@@ -265,3 +372,153 @@ def get_batch_size(sequence_length: int, batch_size: int, overlapping: int, batc
         return max(0, sequence_length - stride * batch_number)
     else:
         return batch_size
+
+
+def se2_goal_error(odom_tform_body: SE2Pose, odom_tform_goal: SE2Pose) -> Tuple[float, float]:
+    """
+    Args:
+        odom_tform_body: Pose of the body in the odom frame.
+        odom_tform_goal: Pose of the goal of a trajectory in the odom frame.
+
+    Returns:
+        The distance in meters from the body to the goal, and the angle in
+        radians from the heading of the body to the heading of the goal, in
+        [-pi, pi].
+    """
+    body_tform_goal = odom_tform_body.inverse() * odom_tform_goal
+    heading_error = math.atan2(math.sin(body_tform_goal.angle), math.cos(body_tform_goal.angle))
+    return math.hypot(body_tform_goal.x, body_tform_goal.y), heading_error
+
+
+class TrajectoryStream:
+    """
+    Batches trajectories whose points are received in chunks while they are executed.
+
+    The trajectories of the first command of the stream are the streamed trajectories, and chunks append points to
+    them. Points are buffered until a batch is taken, and only the points that must overlap with the next batch are
+    kept afterwards, so memory is proportional to the points received but not sent yet. Batches are built like the
+    ones of iter_batch_command. Chunks may be appended from another thread than the one taking batches.
+    """
+
+    def __init__(
+        self, command: robot_command_pb2.RobotCommand, batch_size: int, overlapping: int = 0, tolerance: float = 0.0
+    ) -> None:
+        """
+        Args:
+            command: A robot command with the first points of the streamed trajectories, and their reference time.
+            batch_size: A batch size
+            overlapping: Number of points that must overlap between batched trajectories.
+            tolerance: Maximum difference in seconds between the times since reference of two points for them to be
+                considered aligned.
+
+        Raises:
+            ValueError: If the command has no trajectory points, or if the batch size is not larger than the number
+                of overlapping points.
+        """
+        if batch_size - overlapping < 1:
+            raise ValueError("The batch size must be larger than the number of overlapping points")
+        trajectories = get_trajectories(command)
+        # Trajectories without points in the first command are not streamed
+        self._streamed = [i for i, trajectory in enumerate(trajectories) if trajectory.points]
+        if not self._streamed:
+            raise ValueError("The command has no trajectory points to stream")
+        self.batch_size = batch_size
+        self.overlapping = overlapping
+        self.tolerance = tolerance
+        self._template = robot_command_pb2.RobotCommand()
+        self._template.CopyFrom(command)
+        for trajectory in get_trajectories(self._template):
+            trajectory.ClearField("points")
+        self._lock = threading.Lock()
+        self._points: List[List[Any]] = [[] for _ in self._streamed]
+        self._times: List[List[int]] = [[] for _ in self._streamed]
+        # Number of buffered points that were already sent, to overlap with the next batch
+        self._sent = 0
+        self.finished = False
+        self.append(command)
+
+    @property
+    def pending_points(self) -> int:
+        """Number of points received but not sent yet"""
+        with self._lock:
+            return len(self._times[0]) - self._sent
+
+    def append(self, command: robot_command_pb2.RobotCommand, last: bool = False) -> None:
+        """
+        Append the points of the streamed trajectories of the given command.
+
+        Args:
+            command: A robot command with the next points of the streamed trajectories.
+            last: True if no more points will be appended.
+
+        Raises:
+            ValueError: If the stream is finished, or if the points are not time aligned, or come before the points
+                received so far.
+        """
+        trajectories = get_trajectories(command)
+        if len(trajectories) <= self._streamed[-1]:
+            raise ValueError("The chunk does not contain the streamed trajectories")
+        streamed_trajectories = [trajectories[i] for i in self._streamed]
+        times = [get_times_since_reference(trajectory) for trajectory in streamed_trajectories]
+        if not _are_time_aligned(times, self.tolerance):
+            raise ValueError("The trajectories of the chunk are not time aligned")
+        with self._lock:
+            if self.finished:
+                raise ValueError("The stream is finished")
+            if len(times[0]) > 0 and self._times[0] and times[0][0] <= self._times[0][-1]:
+                raise ValueError("The points of the chunk do not come after the points received so far")
+            for buffered_points, buffered_times, trajectory, trajectory_times in zip(
+                self._points, self._times, streamed_trajectories, times
+            ):
+                buffered_points.extend(trajectory.points)
+                buffered_times.extend(trajectory_times.tolist())
+            self.finished = last
+
+    def take_batch(self, flush: bool = False) -> Optional[CommandBatch]:
+        """
+        Take the next batch, if enough points were received.
+
+        Args:
+            flush: If true, take a batch as long as some points were not sent, even if there are fewer than the batch
+                size, e.g. because the robot is about to run out of points.
+
+        Returns:
+            The next batch, with the times of its first and last points since the reference time of the stream, or None
+            if no batch is ready.
+        """
+        with self._lock:
+            buffered = len(self._times[0])
+            if buffered == self._sent:
+                return None
+            if buffered < self.batch_size and not (flush or self.finished):
+                return None
+            size = min(self.batch_size, buffered)
+
+            command = robot_command_pb2.RobotCommand()
+            command.CopyFrom(self._template)
+            new_trajectories = get_trajectories(command)
+            rebased = False
+            start_times: List[int] = []
+            end_times: List[int] = []
+            for i, points, times in zip(self._streamed, self._points, self._times):
+                new_trajectory = new_trajectories[i]
+                new_trajectory.points.extend(points[:size])
+                if isinstance(new_trajectory, REBASED_TRAJECTORY_TYPES) and new_trajectory.HasField("reference_time"):
+                    _rebase_trajectory(new_trajectory, np.array(times[:size], dtype=np.int64))
+                    rebased = True
+                start_times.append(times[0])
+                end_times.append(times[size - 1])
+
+            # Keep the points that overlap with the next batch.
+            consumed = max(0, size - self.overlapping)
+            for points, times in zip(self._points, self._times):
+                del points[:consumed]
+                del times[:consumed]
+            self._sent = size - consumed
+
+        return CommandBatch(
+            command,
+            min(start_times) / NANOSECONDS_PER_SECOND,
+            max(end_times) / NANOSECONDS_PER_SECOND,
+            rebased=rebased,
+        )
@@ -1,6 +1,9 @@
+import array
 import os
+import threading
 import time
-from typing import Any, Callable, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import builtin_interfaces.msg
 import cv2
@@ -125,14 +128,63 @@ def _create_compressed_image_msg(
     image_msg.header.stamp = Time(sec=local_time.seconds, nanosec=local_time.nanos)
     image_msg.header.frame_id = frame_prefix + data.shot.frame_name_image_sensor
     image_msg.format = "jpeg"
-    image_msg.data = data.shot.image.data
+    image_msg.data = raw_image_data_to_array(data.shot.image.data)
     return image_msg
 
 
+# imread flags decoding JPEG images at a fraction of their resolution, keyed by scale and by whether the image is grey
+PREVIEW_DECODE_FLAGS = {
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+    (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def raw_image_data_to_array(image_data: Union[bytes, memoryview]) -> array.array:
+    """Copies raw image data into an array that can be assigned to the data field of an Image message.
+
+    Assigning bytes to the uint8[] field of a message makes rclpy check every element before copying them into an
+    array, which takes longer than the rest of the conversion for large images. An array("B") is stored as is, so this
+    costs a single memcpy of the image data.
+    Args:
+        image_data: Raw image data, as found in data.shot.image.data of an image proto
+
+    Returns:
+        Array of unsigned bytes holding a copy of the image data
+    """
+    image_array = array.array("B")
+    image_array.frombytes(image_data)
+    return image_array
+
+
+def _fill_image_data(image_msg: Image, image_data: Union[bytes, np.ndarray]) -> None:
+    """Copies image data into an Image message, in place if the message already holds an array of the same size"""
+    buffer = memoryview(image_data).cast("B")
+    if len(image_msg.data) == len(buffer):
+        memoryview(image_msg.data)[:] = buffer
+    else:
+        image_msg.data = raw_image_data_to_array(buffer)
+
+
+# Encoding, bytes per pixel and endianness of the Image messages of raw image data, keyed by pixel format
+RAW_PIXEL_FORMATS = {
+    image_pb2.Image.PIXEL_FORMAT_GREYSCALE_U8: ("mono8", 1, True),
+    image_pb2.Image.PIXEL_FORMAT_RGB_U8: ("rgb8", 3, True),
+    image_pb2.Image.PIXEL_FORMAT_RGBA_U8: ("rgba8", 4, True),
+    # Little-endian uint16 z-distance from camera (mm).
+    image_pb2.Image.PIXEL_FORMAT_DEPTH_U16: ("16UC1", 2, False),
+}
+
+
 def _create_image_msg(
-    data: image_pb2.ImageResponse, robot_to_local_time: Callable[[Timestamp], Timestamp], frame_prefix: str
+    data: image_pb2.ImageResponse,
+    robot_to_local_time: Callable[[Timestamp], Timestamp],
+    frame_prefix: str,
+    image_msg: Optional[Image] = None,
 ) -> Image:
-    image_msg = None
     local_time = robot_to_local_time(data.shot.acquisition_time)
     stamp = Time(sec=local_time.seconds, nanosec=local_time.nanos)
     frame_id = frame_prefix + data.shot.frame_name_image_sensor
@@ -140,121 +192,247 @@ def _create_image_msg(
     # JPEG format
     if data.shot.image.format == image_pb2.Image.FORMAT_JPEG:
         cv2_image = cv2.imdecode(np.frombuffer(data.shot.image.data, dtype=np.uint8), -1)
-        image_msg = cv_bridge.cv2_to_imgmsg(cv2_image, encoding="passthrough")
-        if image_msg.encoding == "8UC3":
-            image_msg.encoding = "bgr8"  # required for cv_bridge handling of the message
-        elif image_msg.encoding == "8UC1":
-            image_msg.encoding = "mono8"  # required for cv_bridge handling of the message
+        channels = 1 if cv2_image.ndim == 2 else cv2_image.shape[2]
+        if image_msg is not None and cv2_image.dtype == np.uint8 and channels in (1, 3):
+            # Refill the given message instead of allocating a new one with cv_bridge
+            image_msg.height, image_msg.width = cv2_image.shape[:2]
+            image_msg.encoding = "mono8" if channels == 1 else "bgr8"
+            image_msg.is_bigendian = False
+            image_msg.step = channels * image_msg.width
+            _fill_image_data(image_msg, cv2_image)
         else:
-            pass  # passthrough decides
+            image_msg = cv_bridge.cv2_to_imgmsg(cv2_image, encoding="passthrough")
+            if image_msg.encoding == "8UC3":
+                image_msg.encoding = "bgr8"  # required for cv_bridge handling of the message
+            elif image_msg.encoding == "8UC1":
+                image_msg.encoding = "mono8"  # required for cv_bridge handling of the message
+            else:
+                pass  # passthrough decides
         image_msg.header.stamp = stamp
         image_msg.header.frame_id = frame_id
 
     # Uncompressed.  Requires pixel_format.
     elif data.shot.image.format == image_pb2.Image.FORMAT_RAW:
-        image_msg = Image()
+        if image_msg is None:
+            image_msg = Image()
         image_msg.header.stamp = stamp
         image_msg.header.frame_id = frame_id
         image_msg.height = data.shot.image.rows
         image_msg.width = data.shot.image.cols
 
-        # One byte per pixel.
-        if data.shot.image.pixel_format == image_pb2.Image.PIXEL_FORMAT_GREYSCALE_U8:
-            image_msg.encoding = "mono8"
-            image_msg.is_bigendian = True
-            image_msg.step = data.shot.image.cols
-            image_msg.data = data.shot.image.data
-
-        # Three bytes per pixel.
-        if data.shot.image.pixel_format == image_pb2.Image.PIXEL_FORMAT_RGB_U8:
-            image_msg.encoding = "rgb8"
-            image_msg.is_bigendian = True
-            image_msg.step = 3 * data.shot.image.cols
-            image_msg.data = data.shot.image.data
-
-        # Four bytes per pixel.
-        if data.shot.image.pixel_format == image_pb2.Image.PIXEL_FORMAT_RGBA_U8:
-            image_msg.encoding = "rgba8"
-            image_msg.is_bigendian = True
-            image_msg.step = 4 * data.shot.image.cols
-            image_msg.data = data.shot.image.data
-
-        # Little-endian uint16 z-distance from camera (mm).
-        if data.shot.image.pixel_format == image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
-            image_msg.encoding = "16UC1"
+        raw_format = RAW_PIXEL_FORMATS.get(data.shot.image.pixel_format)
+        if raw_format is not None:
+            encoding, bytes_per_pixel, is_bigendian = raw_format
+            image_msg.encoding = encoding
+            image_msg.is_bigendian = is_bigendian
+            image_msg.step = bytes_per_pixel * data.shot.image.cols
+            _fill_image_data(image_msg, data.shot.image.data)
+        else:
+            # Clear whatever a reused message held from a previous frame
+            image_msg.encoding = ""
             image_msg.is_bigendian = False
-            image_msg.step = 2 * data.shot.image.cols
-            image_msg.data = data.shot.image.data
+            image_msg.step = 0
+            image_msg.data = array.array("B")
+
+    else:
+        raise ValueError(
+            f"Cannot publish image from {data.source.name}, its format {data.shot.image.format} is unknown"
+        )
     return image_msg
 
 
+class ImageMessagePool:
+    """Ring of preallocated Image messages that are refilled in place instead of allocating new ones for every frame.
+
+    A message is borrowed for the time it takes to fill and publish it and only handed out again once it has been
+    returned, so a message is never modified while it is being published. If all messages are borrowed, a new message
+    is allocated for that frame.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size: Number of messages in the ring, usually the number of publishes of the image source that can be in
+                flight at the same time
+        """
+        self._messages = [Image() for _ in range(size)]
+        self._borrowed = [False] * size
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def borrow(self) -> Iterator[Image]:
+        """Context manager that lends the next free message of the ring until the end of the block"""
+        slot = None
+        with self._lock:
+            for i in range(len(self._messages)):
+                candidate = (self._next + i) % len(self._messages)
+                if not self._borrowed[candidate]:
+                    slot = candidate
+                    self._borrowed[slot] = True
+                    self._next = (slot + 1) % len(self._messages)
+                    break
+        if slot is None:
+            yield Image()
+            return
+        try:
+            yield self._messages[slot]
+        finally:
+            with self._lock:
+                self._borrowed[slot] = False
+
+
+class CameraInfoCache:
+    """Pre-built CameraInfo messages, keyed by image source.
+
+    The intrinsics of an image source do not change while the driver is running, so its CameraInfo message is built
+    once and only the header is updated for every frame. The message is rebuilt if the resolution or the pinhole
+    intrinsics of a response differ from the ones it was built from.
+
+    The same message instance is returned for every frame of a given image source: it must be published (or copied)
+    before the next frame from that source is converted.
+    """
+
+    def __init__(self) -> None:
+        self._camera_infos: Dict[str, Tuple[Tuple[int, int, float, float, float, float], CameraInfo]] = {}
+
+    def get(self, data: image_pb2.ImageResponse, stamp: Time, frame_id: str) -> CameraInfo:
+        """Returns the CameraInfo message for the source of the given image, stamped with the given header
+        Args:
+            data: Image response
+            stamp: Stamp of the header
+            frame_id: Frame id of the header
+        Returns:
+            CameraInfo message for the source of the image
+        """
+        intrinsics = data.source.pinhole.intrinsics
+        signature = (
+            data.shot.image.rows,
+            data.shot.image.cols,
+            intrinsics.focal_length.x,
+            intrinsics.focal_length.y,
+            intrinsics.principal_point.x,
+            intrinsics.principal_point.y,
+        )
+        cached = self._camera_infos.get(data.source.name)
+        if cached is None or cached[0] != signature:
+            camera_info_msg = create_default_camera_info()
+            camera_info_msg.height = data.shot.image.rows
+            camera_info_msg.width = data.shot.image.cols
+
+            camera_info_msg.k[0] = intrinsics.focal_length.x
+            camera_info_msg.k[2] = intrinsics.principal_point.x
+            camera_info_msg.k[4] = intrinsics.focal_length.y
+            camera_info_msg.k[5] = intrinsics.principal_point.y
+
+            camera_info_msg.p[0] = intrinsics.focal_length.x
+            camera_info_msg.p[2] = intrinsics.principal_point.x
+            camera_info_msg.p[5] = intrinsics.focal_length.y
+            camera_info_msg.p[6] = intrinsics.principal_point.y
+
+            cached = (signature, camera_info_msg)
+            self._camera_infos[data.source.name] = cached
+
+        camera_info_msg = cached[1]
+        camera_info_msg.header.stamp = stamp
+        camera_info_msg.header.frame_id = frame_id
+        return camera_info_msg
+
+
+camera_info_cache = CameraInfoCache()
+
+
 def bosdyn_data_to_image_and_camera_info_msgs(
-    data: image_pb2.ImageResponse, robot_to_local_time: Callable[[Timestamp], Timestamp], frame_prefix: str
+    data: image_pb2.ImageResponse,
+    robot_to_local_time: Callable[[Timestamp], Timestamp],
+    frame_prefix: str,
+    image_msg: Optional[Image] = None,
 ) -> Tuple[Union[Image, CompressedImage], CameraInfo]:
     """Takes the image and camera data and populates the necessary ROS messages
     Args:
         data: Image proto
         robot_to_local_time: Function to convert the robot time to the local time
         frame_prefix: namespace for the published images
+        image_msg: Optional message to refill in place, see ImageMessagePool
 
     Returns:
         (tuple):
             * Image: message of the image captured
-            * CameraInfo: message to define the state and config of the camera that took the image
+            * CameraInfo: message to define the state and config of the camera that took the image. This message is
+              shared between frames of the same image source, see CameraInfoCache.
     """
-    image_msg = _create_image_msg(data, robot_to_local_time, frame_prefix)
+    image_msg = _create_image_msg(data, robot_to_local_time, frame_prefix, image_msg)
+    camera_info_msg = bosdyn_data_to_camera_info_msg(data, robot_to_local_time, frame_prefix)
+    return image_msg, camera_info_msg
 
-    # camera_info_msg = create_default_camera_info(camera_info_msg)
-    camera_info_msg = CameraInfo()
-    camera_info_msg.distortion_model = "plumb_bob"
 
-    camera_info_msg.d.append(0)
-    camera_info_msg.d.append(0)
-    camera_info_msg.d.append(0)
-    camera_info_msg.d.append(0)
-    camera_info_msg.d.append(0)
+def bosdyn_data_to_preview_image_msg(
+    data: image_pb2.ImageResponse,
+    robot_to_local_time: Callable[[Timestamp], Timestamp],
+    frame_prefix: str,
+    scale: int,
+) -> Image:
+    """Decodes JPEG image data at a reduced resolution into an Image message. libjpeg scales the image while decoding
+    it, which is much cheaper than decoding it at full resolution.
+    Args:
+        data: Image proto, which must be in FORMAT_JPEG
+        robot_to_local_time: Function to convert the robot time to the local time
+        frame_prefix: namespace for the published images
+        scale: Factor by which the width and height of the image are divided, one of 2, 4 or 8
 
-    camera_info_msg.k[1] = 0
-    camera_info_msg.k[3] = 0
-    camera_info_msg.k[6] = 0
-    camera_info_msg.k[7] = 0
-    camera_info_msg.k[8] = 1
+    Returns:
+        Image message of the image captured, at reduced resolution
+    """
+    if data.shot.image.format != image_pb2.Image.FORMAT_JPEG:
+        raise ValueError(f"Cannot decode a preview of the image from {data.source.name}, it is not a JPEG")
+    is_grey = data.shot.image.pixel_format == image_pb2.Image.PIXEL_FORMAT_GREYSCALE_U8
+    flags = PREVIEW_DECODE_FLAGS.get((scale, is_grey))
+    if flags is None:
+        raise ValueError(f"Invalid preview scale {scale}, it must be one of 2, 4 or 8")
+
+    cv2_image = cv2.imdecode(np.frombuffer(data.shot.image.data, dtype=np.uint8), flags)
+    image_msg = cv_bridge.cv2_to_imgmsg(cv2_image, encoding="mono8" if is_grey else "bgr8")
+    local_time = robot_to_local_time(data.shot.acquisition_time)
+    image_msg.header.stamp = Time(sec=local_time.seconds, nanosec=local_time.nanos)
+    image_msg.header.frame_id = frame_prefix + data.shot.frame_name_image_sensor
+    return image_msg
 
-    camera_info_msg.r[0] = 1
-    camera_info_msg.r[1] = 0
-    camera_info_msg.r[2] = 0
-    camera_info_msg.r[3] = 0
-    camera_info_msg.r[4] = 1
-    camera_info_msg.r[5] = 0
-    camera_info_msg.r[6] = 0
-    camera_info_msg.r[7] = 0
-    camera_info_msg.r[8] = 1
 
-    camera_info_msg.p[1] = 0
-    camera_info_msg.p[3] = 0
-    camera_info_msg.p[4] = 0
-    camera_info_msg.p[7] = 0
-    camera_info_msg.p[8] = 0
-    camera_info_msg.p[9] = 0
-    camera_info_msg.p[10] = 1
-    camera_info_msg.p[11] = 0
+def bosdyn_data_to_camera_info_msg(
+    data: image_pb2.ImageResponse, robot_to_local_time: Callable[[Timestamp], Timestamp], frame_prefix: str
+) -> CameraInfo:
+    """Takes the image data and populates the CameraInfo message of the camera that captured it
+    Args:
+        data: Image proto
+        robot_to_local_time: Function to convert the robot time to the local time
+        frame_prefix: namespace for the published images
+
+    Returns:
+        CameraInfo message, shared between frames of the same image source, see CameraInfoCache.
+    """
     local_time = robot_to_local_time(data.shot.acquisition_time)
-    camera_info_msg.header.stamp = Time(sec=local_time.seconds, nanosec=local_time.nanos)
-    camera_info_msg.header.frame_id = frame_prefix + data.shot.frame_name_image_sensor
-    camera_info_msg.height = data.shot.image.rows
-    camera_info_msg.width = data.shot.image.cols
+    return camera_info_cache.get(
+        data,
+        Time(sec=local_time.seconds, nanosec=local_time.nanos),
+        frame_prefix + data.shot.frame_name_image_sensor,
+    )
 
-    camera_info_msg.k[0] = data.source.pinhole.intrinsics.focal_length.x
-    camera_info_msg.k[2] = data.source.pinhole.intrinsics.principal_point.x
-    camera_info_msg.k[4] = data.source.pinhole.intrinsics.focal_length.y
-    camera_info_msg.k[5] = data.source.pinhole.intrinsics.principal_point.y
 
-    camera_info_msg.p[0] = data.source.pinhole.intrinsics.focal_length.x
-    camera_info_msg.p[2] = data.source.pinhole.intrinsics.principal_point.x
-    camera_info_msg.p[5] = data.source.pinhole.intrinsics.focal_length.y
-    camera_info_msg.p[6] = data.source.pinhole.intrinsics.principal_point.y
+def bosdyn_data_to_compressed_image_msg(
+    data: image_pb2.ImageResponse, robot_to_local_time: Callable[[Timestamp], Timestamp], frame_prefix: str
+) -> CompressedImage:
+    """Wraps JPEG image data in a CompressedImage message without decoding it
+    Args:
+        data: Image proto, which must be in FORMAT_JPEG
+        robot_to_local_time: Function to convert the robot time to the local time
+        frame_prefix: namespace for the published images
 
-    return image_msg, camera_info_msg
+    Returns:
+        CompressedImage message of the image captured
+    """
+    if data.shot.image.format != image_pb2.Image.FORMAT_JPEG:
+        raise ValueError(f"Cannot publish image from {data.source.name} as compressed, it is not a JPEG")
+    return _create_compressed_image_msg(data, robot_to_local_time, frame_prefix)
 
 
 def get_frame_names_associated_with_object(world_object: world_object_pb2.WorldObject) -> List[str]:
@@ -8,10 +8,12 @@ import threading
 import time
 import traceback
 import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 from enum import Enum
 from functools import partial
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import bdai_ros2_wrappers.process as ros_process
 import builtin_interfaces.msg
@@ -20,18 +22,13 @@ import rclpy.duration
 import rclpy.time
 import tf2_ros
 from bdai_ros2_wrappers.node import Node
-from bdai_ros2_wrappers.single_goal_action_server import (
-    SingleGoalActionServer,
-)
-from bdai_ros2_wrappers.single_goal_multiple_action_servers import (
-    SingleGoalMultipleActionServers,
-)
 from bosdyn.api import (
     geometry_pb2,
     gripper_camera_param_pb2,
     image_pb2,
     manipulation_api_pb2,
     robot_command_pb2,
+    robot_state_pb2,
     trajectory_pb2,
     world_object_pb2,
 )
@@ -40,6 +37,11 @@ from bosdyn.api.spot import robot_command_pb2 as spot_command_pb2
 from bosdyn.api.spot.choreography_sequence_pb2 import Animation, ChoreographySequence, ChoreographyStatusResponse
 from bosdyn.client import math_helpers
 from bosdyn.client.exceptions import InternalServerError
+from bosdyn.client.frame_helpers import get_odom_tform_body
+from bosdyn.client.manipulation_api_client import ManipulationApiClient
+from bosdyn.client.math_helpers import SE2Pose
+from bosdyn.client.robot_command import NoTimeSyncError
+from bosdyn.util import duration_to_seconds
 from bosdyn_api_msgs.math_helpers import bosdyn_localization_to_pose_msg
 from bosdyn_msgs.conversions import convert
 from bosdyn_msgs.msg import (
@@ -52,7 +54,6 @@ from bosdyn_msgs.msg import (
     MobilityCommandFeedback,
     PtzDescription,
     RobotCommandFeedback,
-    RobotCommandFeedbackStatusStatus,
 )
 from geometry_msgs.msg import (
     Pose,
@@ -62,29 +63,45 @@ from geometry_msgs.msg import (
 )
 from google.protobuf.timestamp_pb2 import Timestamp
 from rclpy import Parameter
-from rclpy.action import ActionServer
+from rclpy.action import ActionServer, CancelResponse
 from rclpy.action.server import ServerGoalHandle
-from rclpy.callback_groups import CallbackGroup, MutuallyExclusiveCallbackGroup
-from rclpy.clock import Clock
+from rclpy.callback_groups import CallbackGroup, MutuallyExclusiveCallbackGroup, ReentrantCallbackGroup
 from rclpy.impl import rcutils_logger
 from rclpy.publisher import Publisher
+from rclpy.qos import DurabilityPolicy, QoSProfile, ReliabilityPolicy
 from rclpy.timer import Rate
-from sensor_msgs.msg import CameraInfo, Image
+from sensor_msgs.msg import CameraInfo, CompressedImage, Image
 from std_srvs.srv import SetBool, Trigger
 
+import spot_driver.feedback_tables as feedback_tables
 import spot_driver.robot_command_util as robot_command_util
+from spot_driver.batch_dispatch import BatchDispatchScheduler
+from spot_driver.command_coalescer import CoalescingCommandSender
+from spot_driver.deadline_scheduler import DeadlineScheduler
+from spot_driver.feedback_monitor import FeedbackMonitor
+from spot_driver.feedback_tables import GoalResponse
+from spot_driver.goal_arbiter import GoalArbiter, Resource, resource_stop_command, robot_command_resources
+from spot_driver.image_pipeline import CameraRateScheduler, LatestFramePipeline
+from spot_driver.latency_recorder import LatencyRecorder
+from spot_driver.mobility_params_cache import MobilityParamsCache
 
 # DEBUG/RELEASE: RELATIVE PATH NOT WORKING IN DEBUG
 # Release
 from spot_driver.ros_helpers import (
+    ImageMessagePool,
+    bosdyn_data_to_camera_info_msg,
+    bosdyn_data_to_compressed_image_msg,
     bosdyn_data_to_image_and_camera_info_msgs,
+    bosdyn_data_to_preview_image_msg,
     get_from_env_and_fall_back_to_param,
     populate_transform_stamped,
 )
+from spot_driver.stop_dispatcher import StopDispatcher, StopKind
 from spot_msgs.action import (  # type: ignore
     ExecuteDance,
     Manipulation,
     NavigateTo,
+    StreamTrajectory,
     Trajectory,
 )
 from spot_msgs.action import (  # type: ignore
@@ -92,10 +109,13 @@ from spot_msgs.action import (  # type: ignore
 )
 from spot_msgs.msg import (  # type: ignore
     Feedback,
+    LatencyHistogramArray,
     LeaseArray,
     LeaseResource,
     Metrics,
     MobilityParams,
+    StopRequest,
+    TrajectoryChunk,
 )
 from spot_msgs.srv import (  # type: ignore
     ChoreographyRecordedStateToAnimation,
@@ -107,6 +127,7 @@ from spot_msgs.srv import (  # type: ignore
     Dock,
     GetChoreographyStatus,
     GetGripperCameraParameters,
+    GetImageLatencies,
     GetLEDBrightness,
     GetLogpointStatus,
     GetPtzPosition,
@@ -163,35 +184,28 @@ class Response:
     success: bool
 
 
-class GoalResponse(Enum):
-    FAILED = -1
-    IN_PROGRESS = False
-    SUCCESS = True
-
-
 class WaitForGoal(object):
     def __init__(
         self,
-        clock: Clock,
-        _time: Union[float, rclpy.time.Time],
+        scheduler: DeadlineScheduler,
+        _time: float,
         callback: Optional[Callable] = None,
     ) -> None:
         self._at_goal: bool = False
         self._callback: Optional[Callable] = callback
-        self._clock: Clock = clock
-        self._time: rclpy.time.Duration = rclpy.time.Duration(seconds=_time)
-        self._thread: threading.Thread = threading.Thread(target=self._run)
-        self._thread.start()
+        self._call = scheduler.call_later(_time, self._reach_goal)
 
     @property
     def at_goal(self) -> bool:
         return self._at_goal
 
-    def _run(self) -> None:
-        start_time = self._clock.now()
-        while self._clock.now() - start_time < self._time:
-            time.sleep(0.05)
+    def cancel(self) -> None:
+        self._call.cancel()
+
+    def _reach_goal(self) -> None:
         self._at_goal = True
+        if self._callback is not None:
+            self._callback()
 
 
 class SpotImageType(str, Enum):
@@ -208,11 +222,26 @@ def set_node_parameter_from_parameter_list(
         node.set_parameters([parameter for parameter in parameter_list if parameter.name == parameter_name])
 
 
+def _manipulation_feedback_without_header(
+    response: manipulation_api_pb2.ManipulationApiFeedbackResponse,
+) -> manipulation_api_pb2.ManipulationApiFeedbackResponse:
+    """Manipulation feedback without its header, which changes with every response"""
+    feedback = manipulation_api_pb2.ManipulationApiFeedbackResponse()
+    feedback.CopyFrom(response)
+    feedback.ClearField("header")
+    return feedback
+
+
 class SpotROS(Node):
     """Parent class for using the wrapper.  Defines all callbacks and keeps the wrapper alive"""
 
     TRAJECTORY_BATCH_SIZE_PARAM = "trajectory_batch_size"
     TRAJECTORY_BATCH_OVERLAPPING_POINTS_PARAM = "trajectory_batch_overlapping_points"
+    TRAJECTORY_TIME_ALIGNMENT_TOLERANCE_PARAM = "trajectory_time_alignment_tolerance"
+    TRAJECTORY_BATCH_SAFETY_MARGIN_PARAM = "trajectory_batch_safety_margin"
+    # Minimum time in seconds between two status requests publishing the feedback of the dance and navigate actions
+    DANCE_FEEDBACK_PERIOD = 0.01
+    NAVIGATE_TO_FEEDBACK_PERIOD = 0.1
 
     def __init__(self, parameter_list: Optional[typing.List[Parameter]] = None, **kwargs: typing.Any) -> None:
         """
@@ -220,7 +249,6 @@ class SpotROS(Node):
         Holds lease from wrapper and updates all async tasks at the ROS rate
         """
         super().__init__("spot_ros2", **kwargs)
-        self.run_navigate_to: Optional[bool] = None
         self._printed_once: bool = False
 
         self.get_logger().info(COLOR_GREEN + "Hi from spot_driver." + COLOR_END)
@@ -230,11 +258,25 @@ class SpotROS(Node):
         self.callbacks["metrics"] = self.metrics_callback
         self.callbacks["lease"] = self.lease_callback
 
-        self.group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        # Services are partitioned into callback groups by resource class, so that slow bulk operations, e.g.
+        # retrieving a logpoint or uploading a graph, do not delay the services of other classes. Safety services are
+        # reentrant so that an estop is never queued behind a stop.
+        self.safety_callback_group: CallbackGroup = ReentrantCallbackGroup()
+        self.motion_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        self.perception_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        self.spot_cam_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        self.graph_nav_service_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        self.choreography_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
         self.rgb_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
         self.depth_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
         self.depth_registered_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
         self.graph_nav_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        self.trajectory_stream_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        # cmd_vel only submits twists to an asynchronous sender, and is never queued behind blocking motion services
+        self.cmd_vel_callback_group: CallbackGroup = MutuallyExclusiveCallbackGroup()
+        # Goals of arbitrated actions on disjoint resources execute concurrently
+        self.arbitrated_goal_callback_group: CallbackGroup = ReentrantCallbackGroup()
+        self.goal_arbiter = GoalArbiter()
         rate = self.create_rate(100)
         self.node_rate: Rate = rate
 
@@ -254,6 +296,35 @@ class SpotROS(Node):
         self.declare_parameter("publish_depth", True)
         self.declare_parameter("publish_depth_registered", False)
         self.declare_parameter("rgb_cameras", True)
+        # Publish the JPEG data of RGB cameras as is on camera/<camera>/image/compressed. The raw images are then only
+        # decoded and published while they have subscribers.
+        self.declare_parameter("publish_compressed_images", False)
+        # When set to 2, 4 or 8, RGB cameras also publish camera/<camera>/image_preview, decoded at a resolution divided
+        # by this factor. 1 disables the previews.
+        self.declare_parameter("image_preview_scale", 1)
+        # Refill a ring of preallocated Image messages for every camera instead of allocating new messages for every
+        # frame, which keeps the memory use of the image publishers constant.
+        self.declare_parameter("image_message_pool", False)
+
+        # When set to a positive number, images are decoded and published by a pool of this many worker threads, so the
+        # next request to the robot overlaps with the decoding of the previous one. 0 decodes on the image timer.
+        self.declare_parameter("image_decode_workers", 0)
+        # Record latency histograms of the image pipeline per camera, published on image_latencies and returned by the
+        # get_image_latencies service.
+        self.declare_parameter("publish_image_latencies", False)
+        # Dispatch stops requested on the stop_request topic, in addition to the stop and estop services. Requests are
+        # stamped, and the latencies from their stamp are recorded like the ones of the services.
+        self.declare_parameter("subscribe_stop_requests", False)
+        # Publish latency histograms of the stops, from their request to their dispatch and completion, on
+        # status/stop_latencies.
+        self.declare_parameter("publish_stop_latencies", False)
+        # Maximum rate in Hz of the velocity commands sent to the robot. Twists received on cmd_vel meanwhile are
+        # coalesced to the latest one, and only one command is in flight at a time. 0 sends the latest twist as soon as
+        # the previous command is acknowledged.
+        self.declare_parameter("cmd_vel_max_rate", 0.0)
+        # Publish latency histograms of the velocity commands, from their sending to their acknowledgement, on
+        # status/cmd_vel_latencies.
+        self.declare_parameter("publish_cmd_vel_latencies", False)
 
         # Declare rates for the spot_ros2 publishers, which are combined to a dictionary
         self.declare_parameter("metrics_rate", 0.04)
@@ -284,6 +355,45 @@ class SpotROS(Node):
             self.TRAJECTORY_BATCH_OVERLAPPING_POINTS_PARAM
         ).value
 
+        # Multiple long trajectories in a command can only be batched together
+        # if they are time aligned. This is the maximum difference in seconds
+        # between the times since reference of their points, which absorbs
+        # rounding errors from the conversion of the command.
+        self.declare_parameter(self.TRAJECTORY_TIME_ALIGNMENT_TOLERANCE_PARAM, 1e-6)
+        self.trajectory_time_alignment_tolerance: float = self.get_parameter(
+            self.TRAJECTORY_TIME_ALIGNMENT_TOLERANCE_PARAM
+        ).value
+
+        # A batch is sent so that it reaches the robot this many seconds
+        # before the previous one runs out, accounting for the measured round
+        # trip time of robot commands and the uncertainty of the robot clock.
+        # Batches are never sent so early that they reach the robot before
+        # their first point, so the overlap bounds how much latency is absorbed.
+        self.declare_parameter(self.TRAJECTORY_BATCH_SAFETY_MARGIN_PARAM, 0.1)
+        self.batch_dispatch = BatchDispatchScheduler(
+            self.get_parameter(self.TRAJECTORY_BATCH_SAFETY_MARGIN_PARAM).value
+        )
+
+        # Active trajectory streams, and the errors of the invalid chunks they received, by stream id
+        self.trajectory_streams: Dict[str, robot_command_util.TrajectoryStream] = {}
+        self.trajectory_stream_errors: Dict[str, str] = {}
+        self.trajectory_streams_lock = threading.Lock()
+
+        # Minimum time between two robot command feedback requests while a robot command action is running. This is
+        # also the longest time the action waits before checking whether it was cancelled.
+        self.declare_parameter("robot_command_feedback_period", 0.05)
+        self.robot_command_feedback_period: float = self.get_parameter("robot_command_feedback_period").value
+        # Time between two checks of the progress of a trajectory action, which publish its remaining error
+        self.declare_parameter("trajectory_poll_period", 0.1)
+        self.trajectory_poll_period: float = self.get_parameter("trajectory_poll_period").value
+        # Minimum time between two manipulation feedback requests while a manipulation action is running
+        self.declare_parameter("manipulation_feedback_period", 0.05)
+        self.manipulation_feedback_period: float = self.get_parameter("manipulation_feedback_period").value
+        # Feedback requests, timeouts and other deadlines of all the running actions are handled by a single thread
+        self.deadline_scheduler = DeadlineScheduler()
+        # Blocking status requests, e.g. of the choreography status, are sent from a single worker thread
+        self.status_request_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="status_requests")
+
         # If `mock_enable:=True`, then there are additional parameters. We must set this one separately.
         set_node_parameter_from_parameter_list(self, parameter_list, "mock_enable")
         if self.get_parameter("mock_enable").value:
@@ -306,14 +416,46 @@ class SpotROS(Node):
         self.publish_depth: Parameter = self.get_parameter("publish_depth")
         self.publish_depth_registered: Parameter = self.get_parameter("publish_depth_registered")
         self.rgb_cameras: Parameter = self.get_parameter("rgb_cameras")
+        self.publish_compressed_images: bool = self.get_parameter("publish_compressed_images").value
+        self.image_message_pool: bool = self.get_parameter("image_message_pool").value
+        self.image_preview_scale: int = self.get_parameter("image_preview_scale").value
+        if self.image_preview_scale not in (1, 2, 4, 8):
+            error_msg = f'rosparam "image_preview_scale" should be one of 1, 2, 4 or 8, got {self.image_preview_scale}'
+            self.get_logger().error(error_msg)
+            raise ValueError(error_msg)
+        self.image_decode_workers: int = self.get_parameter("image_decode_workers").value
+        self.image_latencies: Optional[LatencyRecorder] = None
+        if self.get_parameter("publish_image_latencies").value:
+            self.image_latencies = LatencyRecorder()
+        self.image_pipeline: Optional[LatestFramePipeline[Tuple[str, SpotImageType], image_pb2.ImageResponse]] = None
+        if self.image_decode_workers > 0:
+            self.image_pipeline = LatestFramePipeline(
+                self.publish_camera_image, self.image_decode_workers, self.get_logger()
+            )
+        # Number of images of a camera that can be converted and published at the same time, which sizes its image
+        # message pool. Without a pipeline, images are published by the timer of their type, whose callback group is
+        # mutually exclusive.
+        self.image_publishes_in_flight: int = (
+            LatestFramePipeline.FRAMES_IN_FLIGHT_PER_KEY if self.image_pipeline is not None else 1
+        )
 
         self.publish_graph_nav_pose: Parameter = self.get_parameter("publish_graph_nav_pose")
         self.graph_nav_seed_frame: str = self.get_parameter("graph_nav_seed_frame").value
         self.initialize_spot_cam: bool = self.get_parameter("initialize_spot_cam").value
 
-        self._wait_for_goal: Optional[WaitForGoal] = None
         self.goal_handle: Optional[ServerGoalHandle] = None
 
+        # Stops and estops run on a dedicated thread, so that they never wait behind other requests to the robot
+        self.stop_latencies = LatencyRecorder()
+        self.stop_dispatcher = StopDispatcher(
+            {
+                StopKind.STOP: self._stop_robot,
+                StopKind.ESTOP_GENTLE: partial(self._assert_estop, False),
+                StopKind.ESTOP_HARD: partial(self._assert_estop, True),
+            },
+            self.stop_latencies.record,
+        )
+
         self.rates = {
             "metrics": self.get_parameter("metrics_rate").value,
             "lease": self.get_parameter("lease_rate").value,
@@ -346,6 +488,20 @@ class SpotROS(Node):
             )
 
         self.cmd_duration: float = self.get_parameter("cmd_duration").value
+        cmd_vel_max_rate: float = self.get_parameter("cmd_vel_max_rate").value
+        # Velocity commands are sent from a worker thread, so that cmd_vel callbacks never wait for the robot
+        self.cmd_vel_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cmd_vel")
+        self.cmd_vel_latencies = LatencyRecorder()
+        # Incremented by every stop and estop. Twists are sent with the generation they were received in, and the worker
+        # drops the ones received before the last stop instead of sending them after it.
+        self.stop_generation = 0
+        self.cmd_vel_sender: CoalescingCommandSender[Tuple[Twist, int]] = CoalescingCommandSender(
+            self._send_velocity_command,
+            1.0 / cmd_vel_max_rate if cmd_vel_max_rate > 0.0 else 0.0,
+            self.deadline_scheduler,
+            lambda latency: self.cmd_vel_latencies.record("cmd_vel", "ack", latency),
+            lambda e: self.get_logger().error(f"Velocity command failed: {e}", throttle_duration_sec=1.0),
+        )
 
         self.username: str = get_from_env_and_fall_back_to_param("BOSDYN_CLIENT_USERNAME", self, "username", "user")
         self.password: str = get_from_env_and_fall_back_to_param("BOSDYN_CLIENT_PASSWORD", self, "password", "password")
@@ -361,9 +517,16 @@ class SpotROS(Node):
         )
         # Static transform broadcaster is super simple and just a latched publisher. Every time we add a new static
         # transform we must republish all static transforms from this source, otherwise the tree will be incomplete.
-        # We keep a list of all the static transforms we already have, so they can be republished, and so we can check
-        # which ones we already have
-        self.camera_static_transforms: List[TransformStamped] = []
+        # We keep all the static transforms we already have, keyed by (parent frame, child frame), so they can be
+        # republished, and so we can check which ones we already have
+        self.camera_static_transforms: Dict[Tuple[str, str], TransformStamped] = {}
+        # Image sources whose transform snapshot has already been harvested. Camera transforms never change, so
+        # later images from these sources are skipped right away.
+        self.camera_static_transform_sources: Set[str] = set()
+        self.camera_static_transforms_lock = threading.Lock()
+        # Cameras and image types whose static transforms have been extracted. These are only requested from the robot
+        # while their topics have subscribers, the others are requested until their static transforms are known.
+        self.cameras_with_static_transforms: Set[Tuple[str, SpotImageType]] = set()
 
         # Spot has 2 types of odometries: 'odom' and 'vision'
         # The former one is kinematic odometry and the second one is a combined odometry of vision and kinematics
@@ -396,6 +559,30 @@ class SpotROS(Node):
 
         self.tf_name_graph_nav_body: str = self.frame_prefix + "body"
 
+        # We exclude the odometry frames from static transforms since they are not static. We can ignore the body
+        # frame because it is a child of odom or vision depending on the preferred_odom_frame, and will be published
+        # by the non-static transform publishing that is done by the state callback
+        excluded_frames = [
+            self.tf_name_vision_odom.value,
+            self.tf_name_kinematic_odom.value,
+            self.frame_prefix + "body",
+        ]
+        # Special case handling for hand camera frames that reference the link "arm0.link_wr1" in their
+        # transform snapshots. This name only appears in hand camera transform snapshots and appears to
+        # be a bug in this particular image callback path.
+        #
+        # 1. We exclude publishing a static transform from arm0.link_wr1 -> body here because it depends
+        #    on the arm's position and a static transform would fix it to its initial position.
+        #
+        # 2. In populate_camera_static_transforms we rename the parent link "arm0.link_wr1" to "link_wr1" as it
+        #    appears in robot state which is used for publishing dynamic tfs elsewhere. Without this, the hand camera
+        #    frame positions would never properly update as no other pipelines reference "arm0.link_wr1".
+        #
+        # We save an RPC call to self.spot_wrapper.has_arm() and any extra complexity here as the link
+        # will not exist if the spot does not have an arm and the special case code will have no effect.
+        self.camera_static_transform_excluded_frames: Set[str] = {f[f.rfind("/") + 1 :] for f in excluded_frames}
+        self.camera_static_transform_excluded_frames.add("arm0.link_wr1")
+
         # logger for spot wrapper
         name_with_dot = ""
         if self.name is not None:
@@ -460,17 +647,30 @@ class SpotROS(Node):
             all_cameras.append("hand")
         self.declare_parameter("cameras_used", all_cameras)
         self.cameras_used = self.get_parameter("cameras_used")
+        # Rate at which the images of each camera are published, e.g. image_rates.hand. Defaults to image_rate.
+        self.camera_image_rates: Dict[str, float] = {}
+        for camera_name in self.cameras_used.value:
+            self.declare_parameter(f"image_rates.{camera_name}", self.rates["image"])
+            self.camera_image_rates[camera_name] = self.get_parameter(f"image_rates.{camera_name}").value
 
         # Create the necessary publishers and timers
+        image_publishers = []
         # if enable set up publisher for rgb images
         if self.publish_rgb.value:
-            self.create_image_publisher(SpotImageType.RGB, self.rgb_callback_group)
+            image_publishers.append((SpotImageType.RGB, self.rgb_callback_group))
         # if enabled set up publisher for depth images
         if self.publish_depth.value:
-            self.create_image_publisher(SpotImageType.Depth, self.depth_callback_group)
+            image_publishers.append((SpotImageType.Depth, self.depth_callback_group))
         # if enable publish registered depth
         if self.publish_depth_registered.value:
-            self.create_image_publisher(SpotImageType.RegDepth, self.depth_registered_callback_group)
+            image_publishers.append((SpotImageType.RegDepth, self.depth_registered_callback_group))
+        # The timers of the image types are staggered to spread the image requests evenly over time
+        for i, (image_type, callback_group) in enumerate(image_publishers):
+            self.create_image_publisher(image_type, callback_group, i / len(image_publishers))
+        if self.image_latencies is not None:
+            self.image_latencies_pub = self.create_publisher(LatencyHistogramArray, "image_latencies", 1)
+            self.create_timer(1.0, self.publish_image_latencies_callback)
+            self.create_service(GetImageLatencies, "get_image_latencies", self.handle_get_image_latencies)
 
         if self.publish_graph_nav_pose.value:
             # graph nav pose will be published both on a topic
@@ -491,75 +691,110 @@ class SpotROS(Node):
         self.metrics_pub: Publisher = self.create_publisher(Metrics, "status/metrics", 1)
         self.lease_pub: Publisher = self.create_publisher(LeaseArray, "status/leases", 1)
         self.feedback_pub: Publisher = self.create_publisher(Feedback, "status/feedback", 1)
-        self.mobility_params_pub: Publisher = self.create_publisher(MobilityParams, "status/mobility_params", 1)
-
-        self.create_subscription(Twist, "cmd_vel", self.cmd_velocity_callback, 1, callback_group=self.group)
-        self.create_subscription(Pose, "body_pose", self.body_pose_callback, 1, callback_group=self.group)
+        # Mobility params are only set by the driver, so they are cached locally and published when they change, on a
+        # latched topic
+        self.mobility_params_cache = MobilityParamsCache(
+            self.spot_wrapper.get_mobility_params() if self.spot_wrapper is not None else None
+        )
+        self.mobility_params_pub: Publisher = self.create_publisher(
+            MobilityParams,
+            "status/mobility_params",
+            QoSProfile(depth=1, durability=DurabilityPolicy.TRANSIENT_LOCAL),
+        )
+        self.mobility_params_pub.publish(self._mobility_params_msg(self.mobility_params_cache.get()))
+
+        self.create_subscription(
+            Twist, "cmd_vel", self.cmd_velocity_callback, 1, callback_group=self.cmd_vel_callback_group
+        )
+        self.create_subscription(
+            Pose, "body_pose", self.body_pose_callback, 1, callback_group=self.motion_callback_group
+        )
+        self.create_subscription(
+            TrajectoryChunk,
+            "trajectory_stream",
+            self.trajectory_chunk_callback,
+            100,
+            callback_group=self.trajectory_stream_callback_group,
+        )
+        if self.get_parameter("subscribe_stop_requests").value:
+            self.create_subscription(
+                StopRequest,
+                "stop_request",
+                self.stop_request_callback,
+                QoSProfile(depth=1, reliability=ReliabilityPolicy.RELIABLE),
+                callback_group=self.safety_callback_group,
+            )
+        if self.get_parameter("publish_stop_latencies").value:
+            self.stop_latencies_pub = self.create_publisher(LatencyHistogramArray, "status/stop_latencies", 1)
+            self.create_timer(1.0, self.publish_stop_latencies_callback)
+        if self.get_parameter("publish_cmd_vel_latencies").value:
+            self.cmd_vel_latencies_pub = self.create_publisher(LatencyHistogramArray, "status/cmd_vel_latencies", 1)
+            self.create_timer(1.0, self.publish_cmd_vel_latencies_callback)
         self.create_service(
             Trigger,
             "claim",
             lambda request, response: self.service_wrapper("claim", self.handle_claim, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "release",
             lambda request, response: self.service_wrapper("release", self.handle_release, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "stop",
             lambda request, response: self.service_wrapper("stop", self.handle_stop, request, response),
-            callback_group=self.group,
+            callback_group=self.safety_callback_group,
         )
         self.create_service(
             Trigger,
             "self_right",
             lambda request, response: self.service_wrapper("self_right", self.handle_self_right, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "sit",
             lambda request, response: self.service_wrapper("sit", self.handle_sit, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "stand",
             lambda request, response: self.service_wrapper("stand", self.handle_stand, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "rollover",
             lambda request, response: self.service_wrapper("rollover", self.handle_rollover, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "power_on",
             lambda request, response: self.service_wrapper("power_on", self.handle_power_on, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "power_off",
             lambda request, response: self.service_wrapper("power_off", self.handle_safe_power_off, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             Trigger,
             "estop/hard",
             lambda request, response: self.service_wrapper("estop/hard", self.handle_estop_hard, request, response),
-            callback_group=self.group,
+            callback_group=self.safety_callback_group,
         )
         self.create_service(
             Trigger,
             "estop/gentle",
             lambda request, response: self.service_wrapper("estop/gentle", self.handle_estop_soft, request, response),
-            callback_group=self.group,
+            callback_group=self.safety_callback_group,
         )
         self.create_service(
             Trigger,
@@ -567,20 +802,20 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "estop/release", self.handle_estop_disengage, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.safety_callback_group,
         )
         self.create_service(
             Trigger,
             "undock",
             lambda request, response: self.service_wrapper("undock", self.handle_undock, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
         self.create_service(
             Trigger,
             "spot_check",
             lambda request, response: self.service_wrapper("spot_check", self.handle_spot_check, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
         if has_arm:
@@ -588,19 +823,19 @@ class SpotROS(Node):
                 Trigger,
                 "arm_stow",
                 lambda request, response: self.service_wrapper("arm_stow", self.handle_arm_stow, request, response),
-                callback_group=self.group,
+                callback_group=self.motion_callback_group,
             )
             self.create_service(
                 Trigger,
                 "arm_unstow",
                 lambda request, response: self.service_wrapper("arm_unstow", self.handle_arm_unstow, request, response),
-                callback_group=self.group,
+                callback_group=self.motion_callback_group,
             )
             self.create_service(
                 Trigger,
                 "arm_carry",
                 lambda request, response: self.service_wrapper("arm_carry", self.handle_arm_carry, request, response),
-                callback_group=self.group,
+                callback_group=self.motion_callback_group,
             )
 
             self.create_service(
@@ -609,7 +844,7 @@ class SpotROS(Node):
                 lambda request, response: self.service_wrapper(
                     "open_gripper", self.handle_open_gripper, request, response
                 ),
-                callback_group=self.group,
+                callback_group=self.motion_callback_group,
             )
             self.create_service(
                 Trigger,
@@ -617,14 +852,14 @@ class SpotROS(Node):
                 lambda request, response: self.service_wrapper(
                     "close_gripper", self.handle_close_gripper, request, response
                 ),
-                callback_group=self.group,
+                callback_group=self.motion_callback_group,
             )
 
         self.create_service(
             SetBool,
             "stair_mode",
             lambda request, response: self.service_wrapper("stair_mode", self.handle_stair_mode, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             SetLocomotion,
@@ -632,13 +867,13 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "locomotion_mode", self.handle_locomotion_mode, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             SetVelocity,
             "max_velocity",
             lambda request, response: self.service_wrapper("max_velocity", self.handle_max_vel, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
         self.create_service(
             ClearBehaviorFault,
@@ -649,14 +884,14 @@ class SpotROS(Node):
                 request,
                 response,
             ),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
         self.create_service(
             Trigger,
             "stop_dance",
             lambda request, response: self.service_wrapper("stop_dance", self.handle_stop_dance, request, response),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             UploadAnimation,
@@ -664,7 +899,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "upload_animation", self.handle_upload_animation, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             UploadSequence,
@@ -672,7 +907,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "upload_sequence", self.handle_upload_sequence, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
 
         self.create_service(
@@ -681,7 +916,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "list_all_dances", self.handle_list_all_dances, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             ListAllMoves,
@@ -689,7 +924,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "list_all_moves", self.handle_list_all_moves, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             ChoreographyRecordedStateToAnimation,
@@ -697,7 +932,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "recorded_state_to_animation", self.handle_recorded_state_to_animation, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             ChoreographyStartRecordingState,
@@ -705,7 +940,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "start_recording_state", self.handle_start_recording_state, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             ChoreographyStopRecordingState,
@@ -713,7 +948,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "stop_recording_state", self.handle_stop_recording_state, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             GetChoreographyStatus,
@@ -721,49 +956,49 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "get_choreography_status", self.handle_get_choreography_status, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.choreography_callback_group,
         )
         self.create_service(
             ListSounds,
             "list_sounds",
             lambda request, response: self.service_wrapper("list_sounds", self.handle_list_sounds, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             LoadSound,
             "load_sound",
             lambda request, response: self.service_wrapper("load_sound", self.handle_load_sound, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             PlaySound,
             "play_sound",
             lambda request, response: self.service_wrapper("play_sound", self.handle_play_sound, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             DeleteSound,
             "delete_sound",
             lambda request, response: self.service_wrapper("delete_sound", self.handle_delete_sound, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             GetVolume,
             "get_volume",
             lambda request, response: self.service_wrapper("get_volume", self.handle_get_volume, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             SetVolume,
             "set_volume",
             lambda request, response: self.service_wrapper("set_volume", self.handle_set_volume, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             ListPtz,
             "list_ptz",
             lambda request, response: self.service_wrapper("list_ptz", self.handle_list_ptz, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             GetPtzPosition,
@@ -771,7 +1006,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "get_ptz_position", self.handle_get_ptz_position, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             SetPtzPosition,
@@ -779,7 +1014,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "set_ptz_position", self.handle_set_ptz_position, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             InitializeLens,
@@ -787,13 +1022,13 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "initialize_lens", self.handle_initialize_lens, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             ListCameras,
             "list_cameras",
             lambda request, response: self.service_wrapper("list_cameras", self.handle_list_cameras, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             ListLogpoints,
@@ -801,7 +1036,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "list_logpoints", self.handle_list_logpoints, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             RetrieveLogpoint,
@@ -809,7 +1044,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "retrieve_logpoint", self.handle_retrieve_logpoint, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             GetLogpointStatus,
@@ -817,7 +1052,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "get_logpoint_status", self.handle_get_logpoint_status, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             DeleteLogpoint,
@@ -825,7 +1060,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "get_logpoint_status", self.handle_delete_logpoint, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             StoreLogpoint,
@@ -833,13 +1068,13 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "store_logpoint", self.handle_store_logpoint, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             TagLogpoint,
             "tag_logpoint",
             lambda request, response: self.service_wrapper("tag_logpoint", self.handle_tag_logpoint, request, response),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             GetLEDBrightness,
@@ -847,7 +1082,7 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "get_led_brightness", self.handle_get_led_brightness, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             SetLEDBrightness,
@@ -855,19 +1090,19 @@ class SpotROS(Node):
             lambda request, response: self.service_wrapper(
                 "set_led_brightness", self.handle_set_led_brightness, request, response
             ),
-            callback_group=self.group,
+            callback_group=self.spot_cam_callback_group,
         )
         self.create_service(
             ListGraph,
             "list_graph",
             lambda request, response: self.service_wrapper("list_graph", self.handle_list_graph, request, response),
-            callback_group=self.group,
+            callback_group=self.graph_nav_service_callback_group,
         )
         self.create_service(
             Dock,
             "dock",
             lambda request, response: self.service_wrapper("dock", self.handle_dock, request, response),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
         # This doesn't use the service wrapper because it's not a trigger, and we want different mock responses
@@ -877,28 +1112,28 @@ class SpotROS(Node):
             GraphNavUploadGraph,
             "graph_nav_upload_graph",
             self.handle_graph_nav_upload_graph,
-            callback_group=self.group,
+            callback_group=self.graph_nav_service_callback_group,
         )
 
         self.create_service(
             GraphNavClearGraph,
             "graph_nav_clear_graph",
             self.handle_graph_nav_clear_graph,
-            callback_group=self.group,
+            callback_group=self.graph_nav_service_callback_group,
         )
 
         self.create_service(
             GraphNavGetLocalizationPose,
             "graph_nav_get_localization_pose",
             self.handle_graph_nav_get_localization_pose,
-            callback_group=self.group,
+            callback_group=self.graph_nav_service_callback_group,
         )
 
         self.create_service(
             GraphNavSetLocalization,
             "graph_nav_set_localization",
             self.handle_graph_nav_set_localization,
-            callback_group=self.group,
+            callback_group=self.graph_nav_service_callback_group,
         )
         if has_arm:
             self.create_service(
@@ -910,7 +1145,7 @@ class SpotROS(Node):
                     request,
                     response,
                 ),
-                callback_group=self.group,
+                callback_group=self.perception_callback_group,
             )
 
             self.create_service(
@@ -922,7 +1157,7 @@ class SpotROS(Node):
                     request,
                     response,
                 ),
-                callback_group=self.group,
+                callback_group=self.perception_callback_group,
             )
 
         self.execute_dance_as = ActionServer(
@@ -957,34 +1192,29 @@ class SpotROS(Node):
                 request,
                 response,
             ),
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
+        # Goals of the "robot command", "stream trajectory" and "manipulation" actions only preempt each other when
+        # they command some of the same robot resources, so e.g. a gripper command can run while the robot walks
+        self.robot_command_server = self._create_arbitrated_action_server(
+            RobotCommandAction,
+            "robot_command",
+            self.handle_robot_command_action,
+            self._robot_command_goal_resources,
+        )
+        self.stream_trajectory_server = self._create_arbitrated_action_server(
+            StreamTrajectory,
+            "stream_trajectory",
+            self.handle_stream_trajectory_action,
+            self._robot_command_goal_resources,
+        )
         if has_arm:
-            # Allows both the "robot command" and the "manipulation" action goal to preempt each other
-            self.robot_command_and_manipulation_servers = SingleGoalMultipleActionServers(
-                self,
-                [
-                    (
-                        RobotCommandAction,
-                        "robot_command",
-                        self.handle_robot_command_action,
-                        None,
-                    ),
-                    (
-                        Manipulation,
-                        "manipulation",
-                        self.handle_manipulation_command,
-                        None,
-                    ),
-                ],
-            )
-        else:
-            self.robot_command_server = SingleGoalActionServer(
-                self,
-                RobotCommandAction,
-                "robot_command",
-                self.handle_robot_command_action,
+            self.manipulation_server = self._create_arbitrated_action_server(
+                Manipulation,
+                "manipulation",
+                self.handle_manipulation_command,
+                lambda request: Resource.ALL,
             )
 
         # Register Shutdown Handle
@@ -1020,7 +1250,7 @@ class SpotROS(Node):
             srv_type=Trigger,
             srv_name="take_lease",
             callback=self.take_lease_callback,
-            callback_group=self.group,
+            callback_group=self.motion_callback_group,
         )
 
     def take_lease_callback(self, request: Trigger.Request, response: Trigger.Response) -> Trigger.Response:
@@ -1127,7 +1357,14 @@ class SpotROS(Node):
         except Exception as e:
             self.get_logger().error(f"Exception: {e} \n {traceback.format_exc()}")
 
-    def create_image_publisher(self, image_type: SpotImageType, callback_group: CallbackGroup) -> None:
+    def create_image_publisher(self, image_type: SpotImageType, callback_group: CallbackGroup, phase: float) -> None:
+        """
+        Creates the publishers of an image type for every camera and the timer that publishes them
+        Args:
+            image_type: Type of the images
+            callback_group: Callback group of the timer
+            phase: Fraction of the timer period by which the first tick of the timer is delayed
+        """
         topic_name = image_type.value
         publisher_name = image_type.value
         # RGB is the only type with different naming scheme
@@ -1145,39 +1382,218 @@ class SpotROS(Node):
                 f"{camera_name}_{publisher_name}_info_pub",
                 self.create_publisher(CameraInfo, f"{topic_name}/{camera_name}/camera_info", 1),
             )
-        # create a timer for publishing
-        self.create_timer(
-            1 / self.rates["image"],
-            partial(self.publish_camera_images_callback, image_type),
-            callback_group=callback_group,
-        )
+            if self.image_message_pool:
+                setattr(self, f"{camera_name}_{publisher_name}_pool", ImageMessagePool(self.image_publishes_in_flight))
+            # Only RGB images are JPEG compressed, depth images are always requested raw
+            if image_type == SpotImageType.RGB and self.publish_compressed_images:
+                setattr(
+                    self,
+                    f"{camera_name}_{publisher_name}_compressed_pub",
+                    self.create_publisher(CompressedImage, f"{topic_name}/{camera_name}/image/compressed", 1),
+                )
+            if image_type == SpotImageType.RGB and self.image_preview_scale > 1:
+                setattr(
+                    self,
+                    f"{camera_name}_{publisher_name}_preview_pub",
+                    self.create_publisher(Image, f"{topic_name}/{camera_name}/image_preview", 1),
+                )
+        camera_rates = {
+            camera_name: self.camera_image_rates[camera_name]
+            for camera_name in self.cameras_used.value
+            if self.camera_image_rates[camera_name] > 0.0
+        }
+        if not camera_rates:
+            return
+
+        # create a timer for publishing, ticking at the rate of the fastest camera
+        scheduler = CameraRateScheduler(camera_rates)
+        callback = partial(self.publish_camera_images_callback, image_type, scheduler)
+        if phase <= 0.0:
+            self.create_timer(scheduler.period, callback, callback_group=callback_group)
+            return
+
+        # Timers have no phase, so a one-shot timer delays the creation of the periodic one
+        def start_timer() -> None:
+            self.destroy_timer(start_timer_handle)
+            self.create_timer(scheduler.period, callback, callback_group=callback_group)
 
-    def publish_camera_images_callback(self, image_type: SpotImageType) -> None:
+        start_timer_handle = self.create_timer(phase * scheduler.period, start_timer, callback_group=callback_group)
+
+    def publish_camera_images_callback(self, image_type: SpotImageType, scheduler: CameraRateScheduler) -> None:
         """
-        Publishes the camera images from a specific image type
+        Publishes the camera images from a specific image type, requesting only the cameras that are due and have
+        subscribers in a single request
         """
         if self.spot_wrapper is None:
             return
 
+        due_cameras = scheduler.due(time.monotonic())
+        subscribed_cameras = [
+            camera_name for camera_name in due_cameras if self.camera_has_subscribers(camera_name, image_type)
+        ]
+        # Keep requesting cameras nobody listens to until their static transforms are known
+        requested_cameras = subscribed_cameras + [
+            camera_name
+            for camera_name in due_cameras
+            if camera_name not in subscribed_cameras
+            and (camera_name, image_type) not in self.cameras_with_static_transforms
+        ]
+        if not requested_cameras:
+            return
+
+        request_time = time.perf_counter()
+        result = self.spot_wrapper.spot_images.get_images_by_cameras(
+            [CameraSource(camera_name, [image_type]) for camera_name in requested_cameras]
+        )
+        if self.image_latencies is not None:
+            request_duration = time.perf_counter() - request_time
+            receipt_time = time.time()
+            for image_entry in result:
+                source = self.image_topic_namespace(image_entry.camera_name, image_type)
+                acquisition_time = self.spot_wrapper.robotToLocalTime(image_entry.image_response.shot.acquisition_time)
+                self.image_latencies.record(source, "request", request_duration)
+                self.image_latencies.record(
+                    source, "acquisition_to_receipt", receipt_time - acquisition_time.ToNanoseconds() * 1e-9
+                )
+
+        for image_entry in result:
+            key = (image_entry.camera_name, image_type)
+            if image_entry.camera_name in subscribed_cameras:
+                if self.image_pipeline is not None:
+                    # Decoding and publishing happen on the pipeline workers, so this timer can fetch the next frame.
+                    self.image_pipeline.submit(key, image_entry.image_response)
+                else:
+                    self.publish_camera_image(key, image_entry.image_response)
+            self.populate_camera_static_transforms(image_entry.image_response)
+            self.cameras_with_static_transforms.add(key)
+
+    @staticmethod
+    def image_topic_namespace(camera_name: str, image_type: SpotImageType) -> str:
+        """
+        Returns:
+            The namespace of the image topics of a camera, e.g. camera/frontleft or depth/hand
+        """
+        # RGB is the only type with different naming scheme
+        if image_type == SpotImageType.RGB:
+            return f"camera/{camera_name}"
+        return f"{image_type.value}/{camera_name}"
+
+    def publish_image_latencies_callback(self) -> None:
+        if self.image_latencies is None:
+            return
+        latencies = self.image_latencies.to_msg()
+        latencies.header.stamp = self.get_clock().now().to_msg()
+        self.image_latencies_pub.publish(latencies)
+
+    def handle_get_image_latencies(
+        self, request: GetImageLatencies.Request, response: GetImageLatencies.Response
+    ) -> GetImageLatencies.Response:
+        if self.image_latencies is None:
+            response.success = False
+            response.message = "Image latencies are not recorded, set publish_image_latencies to enable them"
+            return response
+        response.latencies = self.image_latencies.to_msg(reset=request.reset)
+        response.latencies.header.stamp = self.get_clock().now().to_msg()
+        response.success = True
+        response.message = "Success"
+        return response
+
+    def camera_has_subscribers(self, camera_name: str, image_type: SpotImageType) -> bool:
+        """
+        Checks whether any of the image topics of a camera has subscribers
+        Args:
+            camera_name: Name of the camera
+            image_type: Type of the image
+
+        Returns:
+            True if the image, camera_info, compressed image or preview publisher of the camera has a subscriber
+        """
         publisher_name = image_type.value
         # RGB is the only type with different naming scheme
         if image_type == SpotImageType.RGB:
             publisher_name = "image"
 
-        result = self.spot_wrapper.spot_images.get_images_by_cameras(
-            [CameraSource(camera_name, [image_type]) for camera_name in self.cameras_used.value]
-        )
-        for image_entry in result:
+        publishers = [
+            getattr(self, f"{camera_name}_{publisher_name}_pub"),
+            getattr(self, f"{camera_name}_{publisher_name}_info_pub"),
+            getattr(self, f"{camera_name}_{publisher_name}_compressed_pub", None),
+            getattr(self, f"{camera_name}_{publisher_name}_preview_pub", None),
+        ]
+        return any(publisher.get_subscription_count() > 0 for publisher in publishers if publisher is not None)
+
+    def publish_camera_image(self, key: Tuple[str, SpotImageType], image_response: image_pb2.ImageResponse) -> None:
+        """
+        Converts a single image response into ROS messages and publishes them
+        Args:
+            key: Name of the camera and type of the image
+            image_response: Image response received from the robot for this camera
+        """
+        if self.spot_wrapper is None:
+            return
+
+        camera_name, image_type = key
+        publisher_name = image_type.value
+        # RGB is the only type with different naming scheme
+        if image_type == SpotImageType.RGB:
+            publisher_name = "image"
+
+        image_pub = getattr(self, f"{camera_name}_{publisher_name}_pub")
+        image_info_pub = getattr(self, f"{camera_name}_{publisher_name}_info_pub")
+        compressed_image_pub = getattr(self, f"{camera_name}_{publisher_name}_compressed_pub", None)
+        preview_image_pub = getattr(self, f"{camera_name}_{publisher_name}_preview_pub", None)
+
+        start_time = time.perf_counter()
+        if (
+            preview_image_pub is not None
+            and preview_image_pub.get_subscription_count() > 0
+            and image_response.shot.image.format == image_pb2.Image.FORMAT_JPEG
+        ):
+            preview_image_pub.publish(
+                bosdyn_data_to_preview_image_msg(
+                    image_response,
+                    self.spot_wrapper.robotToLocalTime,
+                    self.spot_wrapper.frame_prefix,
+                    self.image_preview_scale,
+                )
+            )
+
+        if compressed_image_pub is not None and image_response.shot.image.format == image_pb2.Image.FORMAT_JPEG:
+            compressed_image_pub.publish(
+                bosdyn_data_to_compressed_image_msg(
+                    image_response, self.spot_wrapper.robotToLocalTime, self.spot_wrapper.frame_prefix
+                )
+            )
+
+        # Skip decoding the image at full resolution when nobody listens to the raw images
+        if image_pub.get_subscription_count() == 0:
+            image_info_pub.publish(
+                bosdyn_data_to_camera_info_msg(
+                    image_response, self.spot_wrapper.robotToLocalTime, self.spot_wrapper.frame_prefix
+                )
+            )
+            if self.image_latencies is not None:
+                self.image_latencies.record(
+                    self.image_topic_namespace(camera_name, image_type),
+                    "publish",
+                    time.perf_counter() - start_time,
+                )
+            return
+
+        image_pool = getattr(self, f"{camera_name}_{publisher_name}_pool", None)
+        with image_pool.borrow() if image_pool is not None else nullcontext() as pooled_image_msg:
             image_msg, camera_info = bosdyn_data_to_image_and_camera_info_msgs(
-                image_entry.image_response,
+                image_response,
                 self.spot_wrapper.robotToLocalTime,
                 self.spot_wrapper.frame_prefix,
+                pooled_image_msg,
             )
-            image_pub = getattr(self, f"{image_entry.camera_name}_{publisher_name}_pub")
-            image_info_pub = getattr(self, f"{image_entry.camera_name}_{publisher_name}_info_pub")
+            decode_time = time.perf_counter()
             image_pub.publish(image_msg)
-            image_info_pub.publish(camera_info)
-            self.populate_camera_static_transforms(image_entry.image_response)
+        image_info_pub.publish(camera_info)
+        if self.image_latencies is not None:
+            source = self.image_topic_namespace(camera_name, image_type)
+            self.image_latencies.record(source, "decode", decode_time - start_time)
+            self.image_latencies.record(source, "publish", time.perf_counter() - decode_time)
 
     def service_wrapper(
         self,
@@ -1216,7 +1632,7 @@ class SpotROS(Node):
             response.success = False
             response.message = "Spot wrapper is undefined"
             return response
-        response.success, response.message = self.spot_wrapper.stop()
+        response.success, response.message = self.stop_dispatcher.dispatch(StopKind.STOP).result()
         return response
 
     def handle_self_right(self, request: Trigger.Request, response: Trigger.Response) -> Trigger.Response:
@@ -1279,7 +1695,7 @@ class SpotROS(Node):
             response.success = False
             response.message = "Spot wrapper is undefined"
             return response
-        response.success, response.message = self.spot_wrapper.assertEStop(True)
+        response.success, response.message = self.stop_dispatcher.dispatch(StopKind.ESTOP_HARD).result()
         return response
 
     def handle_estop_soft(self, request: Trigger.Request, response: Trigger.Response) -> Trigger.Response:
@@ -1289,9 +1705,50 @@ class SpotROS(Node):
             response.success = False
             response.message = "Spot wrapper is undefined"
             return response
-        response.success, response.message = self.spot_wrapper.assertEStop(False)
+        response.success, response.message = self.stop_dispatcher.dispatch(StopKind.ESTOP_GENTLE).result()
         return response
 
+    def _stop_robot(self) -> Tuple[bool, str]:
+        if self.spot_wrapper is None:
+            return False, "Spot wrapper is undefined"
+        # Drop pending velocity commands, which would otherwise start moving the robot again after the stop
+        self.stop_generation += 1
+        self.cmd_vel_sender.clear()
+        return self.spot_wrapper.stop()
+
+    def _assert_estop(self, severe: bool) -> Tuple[bool, str]:
+        if self.spot_wrapper is None:
+            return False, "Spot wrapper is undefined"
+        self.stop_generation += 1
+        self.cmd_vel_sender.clear()
+        return self.spot_wrapper.assertEStop(severe)
+
+    def stop_request_callback(self, request: StopRequest) -> None:
+        """Callback for the stop_request topic, which dispatches the stop without waiting for its result"""
+        kinds = {
+            StopRequest.STOP: StopKind.STOP,
+            StopRequest.ESTOP_GENTLE: StopKind.ESTOP_GENTLE,
+            StopRequest.ESTOP_HARD: StopKind.ESTOP_HARD,
+        }
+        kind = kinds.get(request.kind)
+        if kind is None:
+            self.get_logger().error(f"Unknown stop request kind {request.kind}")
+            return
+        request_time: Optional[float] = None
+        if request.header.stamp.sec or request.header.stamp.nanosec:
+            request_time = rclpy.time.Time.from_msg(request.header.stamp).nanoseconds / 1e9
+        self.stop_dispatcher.dispatch(kind, request_time)
+
+    def publish_stop_latencies_callback(self) -> None:
+        latencies = self.stop_latencies.to_msg()
+        latencies.header.stamp = self.get_clock().now().to_msg()
+        self.stop_latencies_pub.publish(latencies)
+
+    def publish_cmd_vel_latencies_callback(self) -> None:
+        latencies = self.cmd_vel_latencies.to_msg()
+        latencies.header.stamp = self.get_clock().now().to_msg()
+        self.cmd_vel_latencies_pub.publish(latencies)
+
     def handle_estop_disengage(self, request: Trigger.Request, response: Trigger.Response) -> Trigger.Response:
         """ROS service handler to disengage the eStop on the robot."""
         if self.spot_wrapper is None:
@@ -1874,9 +2331,7 @@ class SpotROS(Node):
             response.message = "Spot wrapper is undefined"
             return response
         try:
-            mobility_params = self.spot_wrapper.get_mobility_params()
-            mobility_params.stair_hint = request.data
-            self.spot_wrapper.set_mobility_params(mobility_params)
+            self._update_mobility_params(lambda mobility_params: setattr(mobility_params, "stair_hint", request.data))
             response.success = True
             response.message = "Success"
             return response
@@ -1894,9 +2349,9 @@ class SpotROS(Node):
             response.message = "Spot wrapper is undefined"
             return response
         try:
-            mobility_params = self.spot_wrapper.get_mobility_params()
-            mobility_params.locomotion_hint = request.locomotion_mode
-            self.spot_wrapper.set_mobility_params(mobility_params)
+            self._update_mobility_params(
+                lambda mobility_params: setattr(mobility_params, "locomotion_hint", request.locomotion_mode)
+            )
             response.success = True
             response.message = "Success"
             return response
@@ -1929,17 +2384,14 @@ class SpotROS(Node):
             response.message = "Spot wrapper is undefined"
             return response
         try:
-            mobility_params = self.spot_wrapper.get_mobility_params()
-            mobility_params.vel_limit.CopyFrom(
-                SE2VelocityLimit(
-                    max_vel=math_helpers.SE2Velocity(
-                        request.velocity_limit.linear.x,
-                        request.velocity_limit.linear.y,
-                        request.velocity_limit.angular.z,
-                    ).to_proto()
-                )
+            vel_limit = SE2VelocityLimit(
+                max_vel=math_helpers.SE2Velocity(
+                    request.velocity_limit.linear.x,
+                    request.velocity_limit.linear.y,
+                    request.velocity_limit.angular.z,
+                ).to_proto()
             )
-            self.spot_wrapper.set_mobility_params(mobility_params)
+            self._update_mobility_params(lambda mobility_params: mobility_params.vel_limit.CopyFrom(vel_limit))
             response.success = True
             response.message = "Success"
             return response
@@ -1948,198 +2400,31 @@ class SpotROS(Node):
             response.message = f"Error: {e}"
             return response
 
-    def _process_feedback_status(self, status: int) -> Optional[GoalResponse]:
-        if status == RobotCommandFeedbackStatusStatus.STATUS_UNKNOWN:
-            return GoalResponse.IN_PROGRESS
-
-        if status == RobotCommandFeedbackStatusStatus.STATUS_COMMAND_OVERRIDDEN:
-            self.get_logger().warn("Command has been overwritten")
-            return GoalResponse.FAILED
-
-        if status == RobotCommandFeedbackStatusStatus.STATUS_COMMAND_TIMED_OUT:
-            self.get_logger().warn("Command has timed out")
-            return GoalResponse.FAILED
-
-        if status == RobotCommandFeedbackStatusStatus.STATUS_ROBOT_FROZEN:
-            self.get_logger().warn("Robot is in unsafe state. Will only respond to safe commands")
-            return GoalResponse.FAILED
-
-        if status == RobotCommandFeedbackStatusStatus.STATUS_INCOMPATIBLE_HARDWARE:
-            self.get_logger().warn("Command is incompatible with current hardware")
-            return GoalResponse.FAILED
+    def _log_classification(self, classification: feedback_tables.Classification) -> GoalResponse:
+        response, log = classification
+        if log is not None:
+            level, message = log
+            getattr(self.get_logger(), level)(message)
+        return response
 
-        # if status == RobotCommandFeedbackStatusStatus.STATUS_PROCESSING,
-        # return None to continue processing the command feedback
-        return None
+    def _process_feedback_status(self, status: int) -> Optional[GoalResponse]:
+        # if status is STATUS_PROCESSING, return None to continue processing the command feedback
+        classification = feedback_tables.COMMAND_STATUS_TABLE.get(status)
+        if classification is None:
+            return None
+        return self._log_classification(classification)
 
     def _process_full_body_command_feedback(self, feedback: FullBodyCommandFeedback) -> GoalResponse:
-        maybe_goal_response = self._process_feedback_status(feedback.status.value)
-        if maybe_goal_response is not None:
-            return maybe_goal_response
-
-        fb = feedback.feedback
-        choice = fb.feedback_choice
-
-        if choice == fb.FEEDBACK_STOP_FEEDBACK_SET:
-            return GoalResponse.SUCCESS
-        elif choice == fb.FEEDBACK_FREEZE_FEEDBACK_SET:
-            return GoalResponse.SUCCESS
-        elif choice == fb.FEEDBACK_SELFRIGHT_FEEDBACK_SET:
-            if fb.selfright_feedback.status.value == fb.selfright_feedback.status.STATUS_COMPLETED:
-                return GoalResponse.SUCCESS
-            return GoalResponse.IN_PROGRESS
-
-        elif choice == fb.FEEDBACK_SAFE_POWER_OFF_FEEDBACK_SET:
-            if fb.safe_power_off_feedback.status.value == fb.safe_power_off_feedback.status.STATUS_POWERED_OFF:
-                return GoalResponse.SUCCESS
-            return GoalResponse.IN_PROGRESS
-
-        elif choice == fb.FEEDBACK_BATTERY_CHANGE_POSE_FEEDBACK_SET:
-            if fb.battery_change_pose_feedback.status.value == fb.battery_change_pose_feedback.status.STATUS_COMPLETED:
-                return GoalResponse.SUCCESS
-            if fb.battery_change_pose_feedback.status.value == fb.battery_change_pose_feedback.status.STATUS_FAILED:
-                return GoalResponse.FAILED
-            return GoalResponse.IN_PROGRESS
-
-        elif choice == fb.FEEDBACK_PAYLOAD_ESTIMATION_FEEDBACK_SET:
-            if fb.payload_estimation_feedback.status.value == fb.payload_estimation_feedback.status.STATUS_COMPLETED:
-                return GoalResponse.SUCCESS
-            if fb.payload_estimation_feedback.status.value == fb.payload_estimation_feedback.status.STATUS_SMALL_MASS:
-                return GoalResponse.SUCCESS
-            if fb.payload_estimation_feedback.status.value == fb.payload_estimation_feedback.status.STATUS_ERROR:
-                return GoalResponse.FAILED
-            return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_CONSTRAINED_MANIPULATION_FEEDBACK_SET:
-            if (
-                fb.constrained_manipulation_feedback.status.value
-                == fb.constrained_manipulation_feedback.status.STATUS_RUNNING
-            ):
-                return GoalResponse.IN_PROGRESS
-            return GoalResponse.FAILED
-        return GoalResponse.IN_PROGRESS
+        return self._log_classification(feedback_tables.classify_full_body_feedback(feedback))
 
     def _process_synchronized_arm_command_feedback(self, feedback: ArmCommandFeedback) -> GoalResponse:
-        maybe_goal_response = self._process_feedback_status(feedback.status.value)
-        if maybe_goal_response is not None:
-            return maybe_goal_response
-
-        fb = feedback.feedback
-        choice = fb.feedback_choice
-
-        if choice == fb.FEEDBACK_ARM_CARTESIAN_FEEDBACK_SET:
-            if (
-                fb.arm_cartesian_feedback.status.value == fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_CANCELLED
-                or fb.arm_cartesian_feedback.status.value == fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_STALLED
-            ):
-                return GoalResponse.FAILED
-            if fb.arm_cartesian_feedback.status.value != fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_COMPLETE:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_ARM_JOINT_MOVE_FEEDBACK_SET:
-            if fb.arm_joint_move_feedback.status.value == fb.arm_joint_move_feedback.status.STATUS_STALLED:
-                return GoalResponse.FAILED
-            if fb.arm_joint_move_feedback.status.value != fb.arm_joint_move_feedback.status.STATUS_COMPLETE:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_NAMED_ARM_POSITION_FEEDBACK_SET:
-            if (
-                fb.named_arm_position_feedback.status.value
-                == fb.named_arm_position_feedback.status.STATUS_STALLED_HOLDING_ITEM
-            ):
-                return GoalResponse.FAILED
-            if fb.named_arm_position_feedback.status.value != fb.named_arm_position_feedback.status.STATUS_COMPLETE:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_ARM_VELOCITY_FEEDBACK_SET:
-            self.get_logger().warn("WARNING: ArmVelocityCommand provides no feedback")
-        elif choice == fb.FEEDBACK_ARM_GAZE_FEEDBACK_SET:
-            if fb.arm_gaze_feedback.status.value == fb.arm_gaze_feedback.status.STATUS_TOOL_TRAJECTORY_STALLED:
-                return GoalResponse.FAILED
-            if fb.arm_gaze_feedback.status.value != fb.arm_gaze_feedback.status.STATUS_TRAJECTORY_COMPLETE:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_ARM_STOP_FEEDBACK_SET:
-            self.get_logger().warn("WARNING: Stop command provides no feedback")
-        elif choice == fb.FEEDBACK_ARM_DRAG_FEEDBACK_SET:
-            if fb.arm_drag_feedback.status.value == fb.arm_drag_feedback.status.STATUS_DRAGGING:
-                return GoalResponse.IN_PROGRESS
-            else:
-                return GoalResponse.FAILED
-        elif choice == fb.FEEDBACK_ARM_IMPEDANCE_FEEDBACK_SET:
-            if (
-                fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_CANCELLED
-                or fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_STALLED
-                or fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_UNKNOWN
-            ):
-                return GoalResponse.FAILED
-            if fb.arm_impedance_feedback.status.value != fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_COMPLETE:
-                return GoalResponse.IN_PROGRESS
-        else:
-            self.get_logger().error("ERROR: unknown arm command type")
-            return GoalResponse.IN_PROGRESS
-        return GoalResponse.SUCCESS
+        return self._log_classification(feedback_tables.classify_arm_feedback(feedback))
 
     def _process_synchronized_mobility_command_feedback(self, feedback: MobilityCommandFeedback) -> GoalResponse:
-        maybe_goal_response = self._process_feedback_status(feedback.status.value)
-        if maybe_goal_response is not None:
-            return maybe_goal_response
-
-        fb = feedback.feedback
-        choice = fb.feedback_choice
-
-        if choice == fb.FEEDBACK_SE2_TRAJECTORY_FEEDBACK_SET:
-            if fb.se2_trajectory_feedback.status.value != fb.se2_trajectory_feedback.status.STATUS_AT_GOAL:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_SE2_VELOCITY_FEEDBACK_SET:
-            self.get_logger().warn("WARNING: Planar velocity commands provide no feedback")
-        elif choice == fb.FEEDBACK_SIT_FEEDBACK_SET:
-            if fb.sit_feedback.status.value != fb.sit_feedback.status.STATUS_IS_SITTING:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_STAND_FEEDBACK_SET:
-            if fb.stand_feedback.status.value != fb.stand_feedback.status.STATUS_IS_STANDING:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_STANCE_FEEDBACK_SET:
-            if fb.stance_feedback.status.value == fb.stance_feedback.status.STATUS_TOO_FAR_AWAY:
-                return GoalResponse.FAILED
-            if fb.stance_feedback.status.value != fb.stance_feedback.status.STATUS_STANCED:
-                return GoalResponse.IN_PROGRESS
-        elif choice == fb.FEEDBACK_STOP_FEEDBACK_SET:
-            self.get_logger().warn("WARNING: Stop command provides no feedback")
-        elif choice == fb.FEEDBACK_FOLLOW_ARM_FEEDBACK_SET:
-            self.get_logger().warn("WARNING: FollowArmCommand provides no feedback")
-        elif choice == fb.FEEDBACK_NOT_SET:
-            # sync_feedback.mobility_command_feedback is set, but feedback_choice is actually not set.
-            # This may happen when a command finishes, which means we may return SUCCESS below.
-            self.get_logger().info("mobility command feedback indicates goal has reached")
-        else:
-            self.get_logger().error("ERROR: unknown mobility command type")
-            return GoalResponse.IN_PROGRESS
-        return GoalResponse.SUCCESS
+        return self._log_classification(feedback_tables.classify_mobility_feedback(feedback))
 
     def _process_synchronized_gripper_command_feedback(self, feedback: GripperCommandFeedback) -> GoalResponse:
-        maybe_goal_response = self._process_feedback_status(feedback.status.value)
-        if maybe_goal_response is not None:
-            return maybe_goal_response
-
-        if feedback.command.command_choice == feedback.command.COMMAND_CLAW_GRIPPER_FEEDBACK_SET:
-            if (
-                feedback.command.claw_gripper_feedback.status.value
-                == feedback.command.claw_gripper_feedback.status.STATUS_IN_PROGRESS
-            ):
-                return GoalResponse.IN_PROGRESS
-            if (
-                feedback.command.claw_gripper_feedback.status.value
-                == feedback.command.claw_gripper_feedback.status.STATUS_UNKNOWN
-            ):
-                self.get_logger().error("ERROR: claw grippper status unknown")
-                return GoalResponse.IN_PROGRESS
-            if (
-                feedback.command.claw_gripper_feedback.status.value
-                == feedback.command.claw_gripper_feedback.status.STATUS_AT_GOAL
-                or feedback.command.claw_gripper_feedback.status.value
-                == feedback.command.claw_gripper_feedback.status.STATUS_APPLYING_FORCE
-            ):
-                return GoalResponse.SUCCESS
-        else:
-            self.get_logger().error("ERROR: unknown gripper command type")
-            return GoalResponse.IN_PROGRESS
-        return GoalResponse.SUCCESS
+        return self._log_classification(feedback_tables.classify_gripper_feedback(feedback))
 
     def _robot_command_goal_complete(self, feedback: RobotCommandFeedback) -> GoalResponse:
         if feedback is None:
@@ -2186,28 +2471,6 @@ class SpotROS(Node):
             self.get_logger().error("ERROR: unknown robot command type")
             return GoalResponse.IN_PROGRESS
 
-    def _get_robot_command_feedback(self, goal_id: Optional[str]) -> RobotCommandFeedback:
-        feedback = RobotCommandFeedback()
-        if goal_id is None:
-            mobility_command_feedback = feedback.command.synchronized_feedback.mobility_command_feedback
-            feedback.command.command_choice = feedback.command.COMMAND_SYNCHRONIZED_FEEDBACK_SET
-            mobility_command_feedback.status.value = mobility_command_feedback.status.STATUS_PROCESSING
-            mobility_command_feedback.feedback.feedback_choice = (
-                mobility_command_feedback.feedback.FEEDBACK_SE2_TRAJECTORY_FEEDBACK_SET
-            )
-            if self._wait_for_goal is not None and self._wait_for_goal.at_goal:
-                mobility_command_feedback.feedback.se2_trajectory_feedback.status.value = (
-                    mobility_command_feedback.feedback.se2_trajectory_feedback.status.STATUS_AT_GOAL
-                )
-            else:
-                mobility_command_feedback.feedback.se2_trajectory_feedback.status.value = (
-                    mobility_command_feedback.feedback.se2_trajectory_feedback.status.STATUS_GOING_TO_GOAL
-                )
-        else:
-            if self.spot_wrapper is not None:
-                convert(self.spot_wrapper.get_robot_command_feedback(goal_id).feedback, feedback)
-        return feedback
-
     def handle_robot_command_service(
         self, request: RobotCommandService.Request, response: RobotCommandService.Response
     ) -> RobotCommandService.Response:
@@ -2226,13 +2489,14 @@ class SpotROS(Node):
     def handle_robot_command_action(self, goal_handle: ServerGoalHandle) -> RobotCommandAction.Result:
         """
         Spot cannot process long trajectories. If we issue a command with long
-        trajectories for the arm or the body, the command will be batched,
-        assuming that there is only one long trajectory or more but all time
-        aligned.
+        trajectories for the arm, the body or the gripper, the command will be
+        batched, assuming that there is only one long trajectory or more but
+        all time aligned.
         To account for the network latency, a command must contain batched
         trajectory with some overlapping.
-        This is currently not possible for the gripper trajectory, due to some
-        limitation in the SDK.
+        Spot rejects arm joint and gripper trajectories with a reference time
+        in the past, so their batches are rebased to their first point and
+        sent ahead of it.
         """
         if self.spot_wrapper is None:
             return
@@ -2242,47 +2506,68 @@ class SpotROS(Node):
         convert(ros_command, proto_command)
 
         # Inspect the command and if there are long trajectories, batch them.
-        commands = robot_command_util.batch_command(
-            proto_command, self.trajectory_batch_size, self.trajectory_batch_overlapping_points
+        # Batches are built lazily, one ahead of the batch being executed.
+        commands = robot_command_util.iter_batch_command(
+            proto_command,
+            self.trajectory_batch_size,
+            self.trajectory_batch_overlapping_points,
+            self.trajectory_time_alignment_tolerance,
         )
-        num_of_commands = len(commands)
+        next_batch: Optional[robot_command_util.CommandBatch] = next(commands)
 
-        goal_id = None
-        self._wait_for_goal = None
         feedback: Optional[RobotCommandFeedback] = None
         feedback_msg: Optional[RobotCommandAction.Feedback] = None
+        # Feedback is requested asynchronously, and only converted and published when it changes
+        feedback_monitor: FeedbackMonitor[int, robot_command_pb2.RobotCommandFeedback] = FeedbackMonitor(
+            self.spot_wrapper._robot_command_client.robot_command_feedback_async,
+            lambda response: response.feedback,
+            self.robot_command_feedback_period,
+            self.deadline_scheduler,
+        )
+        feedback_version = 0
+
+        # Batches are scheduled from the reference time of the trajectories, or
+        # from now if the command has none.
+        reference_time = robot_command_util.get_reference_time(proto_command)
+        if reference_time is None:
+            reference_time = time.time()
+        time_to_send_command = time.time()
+        self.batch_dispatch.record_clock_sync(self._robot_clock_sync_round_trip())
 
-        start_time = time.time()
-        time_to_send_command = 0.0
-
-        index = 0
-        while (
-            rclpy.ok()
-            and goal_handle.is_active
-            and not goal_handle.is_cancel_requested
-            and self._robot_command_goal_complete(feedback) == GoalResponse.IN_PROGRESS
-        ):
-            # We keep looping and send batches at the expected times until the
-            # last batch succeeds. We always send the next batch before the
-            # previous one succeeds, so the only batch that can actuallly
-            # succeed is the last one.
-
-            time_since_start = time.time() - start_time
-            if time_since_start >= time_to_send_command:
-                success, err_msg, goal_id = self.spot_wrapper.robot_command(commands[index])
-                if not success:
-                    raise Exception(err_msg)
-                index += 1
-                if index < num_of_commands:
-                    time_to_send_command = robot_command_util.min_time_since_reference(commands[index])
-                else:
-                    time_to_send_command = float("inf")
-                self.get_logger().info("Robot now executing goal " + str(goal_id))
-
-            feedback = self._get_robot_command_feedback(goal_id)
-            feedback_msg = RobotCommandAction.Feedback(feedback=feedback)
-            goal_handle.publish_feedback(feedback_msg)
-            time.sleep(0.01)  # don't use rate here because we're already in a single thread
+        try:
+            while (
+                rclpy.ok()
+                and goal_handle.is_active
+                and not goal_handle.is_cancel_requested
+                and self._robot_command_goal_complete(feedback) == GoalResponse.IN_PROGRESS
+            ):
+                # We keep looping and send batches at the expected times until the
+                # last batch succeeds. We always send the next batch before the
+                # previous one succeeds, so the only batch that can actuallly
+                # succeed is the last one.
+
+                if next_batch is not None and time.time() >= time_to_send_command:
+                    self._send_command_batch(next_batch, feedback_monitor)
+                    previous_batch_end_time = next_batch.end_time
+                    next_batch = next(commands, None)
+                    if next_batch is not None:
+                        time_to_send_command = self._batch_send_time(
+                            next_batch, reference_time, previous_batch_end_time
+                        )
+                    else:
+                        time_to_send_command = float("inf")
+
+                # Sleep until the feedback changes, the next batch is due or it is time to check for cancellation
+                timeout = min(time_to_send_command - time.time(), self.robot_command_feedback_period)
+                new_feedback_version, feedback_proto = feedback_monitor.wait(feedback_version, max(0.0, timeout))
+                if new_feedback_version != feedback_version and feedback_proto is not None:
+                    feedback_version = new_feedback_version
+                    feedback = RobotCommandFeedback()
+                    convert(feedback_proto, feedback)
+                    feedback_msg = RobotCommandAction.Feedback(feedback=feedback)
+                    goal_handle.publish_feedback(feedback_msg)
+        finally:
+            feedback_monitor.stop()
 
         result = RobotCommandAction.Result()
         if feedback is not None:
@@ -2295,9 +2580,7 @@ class SpotROS(Node):
             result.success = False
             result.message = "Cancelled"
             goal_handle.canceled()
-            if self.spot_wrapper is not None:
-                _, stop_message = self.spot_wrapper.stop()
-                self.get_logger().info(f"Stop attempt due to cancellation: {stop_message}")
+            self._stop_after_cancellation(goal_handle)
         elif not goal_handle.is_active:
             result.success = False
             result.message = "Cancelled"
@@ -2308,60 +2591,286 @@ class SpotROS(Node):
         else:
             result.message = "Failed to complete command"
             goal_handle.abort()
-        self._wait_for_goal = None
         if not self.spot_wrapper:
             self.get_logger().info("Returning action result " + str(result))
         return result
 
+    def handle_stream_trajectory_action(self, goal_handle: ServerGoalHandle) -> StreamTrajectory.Result:
+        """
+        Execute trajectories whose points are streamed in chunks on the
+        trajectory_stream topic while the goal is active. Points are batched
+        like the trajectories of the robot command action. A batch is sent as
+        soon as it is full, or with the points received so far when the robot
+        is about to run out of points, so that the latency and the memory
+        used are bounded by the batch size.
+        The goal succeeds once the last chunk has been executed.
+        """
+        if self.spot_wrapper is None:
+            return
+
+        result = StreamTrajectory.Result()
+        stream_id = goal_handle.request.stream_id
+        proto_command = robot_command_pb2.RobotCommand()
+        convert(goal_handle.request.command, proto_command)
+        try:
+            stream = robot_command_util.TrajectoryStream(
+                proto_command,
+                self.trajectory_batch_size,
+                self.trajectory_batch_overlapping_points,
+                self.trajectory_time_alignment_tolerance,
+            )
+        except ValueError as e:
+            result.success = False
+            result.message = str(e)
+            goal_handle.abort()
+            return result
+        with self.trajectory_streams_lock:
+            self.trajectory_streams[stream_id] = stream
+            self.trajectory_stream_errors.pop(stream_id, None)
+
+        feedback: Optional[RobotCommandFeedback] = None
+        feedback_msg: Optional[StreamTrajectory.Feedback] = None
+        feedback_monitor: FeedbackMonitor[int, robot_command_pb2.RobotCommandFeedback] = FeedbackMonitor(
+            self.spot_wrapper._robot_command_client.robot_command_feedback_async,
+            lambda response: response.feedback,
+            self.robot_command_feedback_period,
+            self.deadline_scheduler,
+        )
+        feedback_version = 0
+
+        reference_time = robot_command_util.get_reference_time(proto_command)
+        if reference_time is None:
+            reference_time = time.time()
+        self.batch_dispatch.record_clock_sync(self._robot_clock_sync_round_trip())
+
+        next_batch: Optional[robot_command_util.CommandBatch] = None
+        previous_batch_end_time: Optional[float] = None
+        time_to_send_command = time.time()
+        error: Optional[str] = None
+        try:
+            while rclpy.ok() and goal_handle.is_active and not goal_handle.is_cancel_requested:
+                with self.trajectory_streams_lock:
+                    error = self.trajectory_stream_errors.get(stream_id)
+                if error is not None:
+                    break
+                # The robot may complete a batch before the next chunk is received, so the goal only completes once
+                # the last batch of the stream completes.
+                status = self._robot_command_goal_complete(feedback)
+                if status == GoalResponse.FAILED:
+                    break
+                if status == GoalResponse.SUCCESS and next_batch is None and stream.finished:
+                    if stream.pending_points == 0:
+                        break
+
+                if next_batch is None:
+                    # Send the points received so far if the robot is about to run out of points
+                    running_out = previous_batch_end_time is None or time.time() >= (
+                        self.batch_dispatch.send_time_before(reference_time + previous_batch_end_time)
+                    )
+                    next_batch = stream.take_batch(flush=running_out)
+                    if next_batch is not None and previous_batch_end_time is not None:
+                        time_to_send_command = self._batch_send_time(
+                            next_batch, reference_time, previous_batch_end_time
+                        )
+
+                if next_batch is not None and time.time() >= time_to_send_command:
+                    self._send_command_batch(next_batch, feedback_monitor)
+                    previous_batch_end_time = next_batch.end_time
+                    next_batch = None
+                    # The feedback of the previous batch does not tell whether the stream completed
+                    feedback = None
+
+                # Sleep until the feedback changes, the next batch is due or it is time to check for new points
+                timeout = self.robot_command_feedback_period
+                if next_batch is not None:
+                    timeout = min(time_to_send_command - time.time(), timeout)
+                new_feedback_version, feedback_proto = feedback_monitor.wait(feedback_version, max(0.0, timeout))
+                if new_feedback_version != feedback_version and feedback_proto is not None:
+                    feedback_version = new_feedback_version
+                    feedback = RobotCommandFeedback()
+                    convert(feedback_proto, feedback)
+                    feedback_msg = StreamTrajectory.Feedback(feedback=feedback, pending_points=stream.pending_points)
+                    goal_handle.publish_feedback(feedback_msg)
+        finally:
+            feedback_monitor.stop()
+            with self.trajectory_streams_lock:
+                self.trajectory_streams.pop(stream_id, None)
+                self.trajectory_stream_errors.pop(stream_id, None)
+
+        if feedback is not None:
+            goal_handle.publish_feedback(feedback_msg)
+            result.result = feedback
+
+        result.success = error is None and self._robot_command_goal_complete(feedback) == GoalResponse.SUCCESS
+
+        if goal_handle.is_cancel_requested:
+            result.success = False
+            result.message = "Cancelled"
+            goal_handle.canceled()
+            self._stop_after_cancellation(goal_handle)
+        elif not goal_handle.is_active:
+            result.success = False
+            result.message = "Cancelled"
+            # Don't abort because that's already happened
+        elif result.success:
+            result.message = "Successfully completed trajectory stream"
+            goal_handle.succeed()
+        else:
+            result.message = error if error is not None else "Failed to complete trajectory stream"
+            goal_handle.abort()
+        return result
+
+    def trajectory_chunk_callback(self, chunk: TrajectoryChunk) -> None:
+        """Callback for the chunks of streamed trajectories, which appends their points to the stream"""
+        with self.trajectory_streams_lock:
+            stream = self.trajectory_streams.get(chunk.stream_id)
+        if stream is None:
+            self.get_logger().warning(f"Received a chunk for trajectory stream {chunk.stream_id}, which is not active")
+            return
+        proto_command = robot_command_pb2.RobotCommand()
+        convert(chunk.command, proto_command)
+        try:
+            stream.append(proto_command, chunk.last)
+        except ValueError as e:
+            self.get_logger().error(f"Invalid chunk for trajectory stream {chunk.stream_id}: {e}")
+            with self.trajectory_streams_lock:
+                if self.trajectory_streams.get(chunk.stream_id) is stream:
+                    self.trajectory_stream_errors[chunk.stream_id] = str(e)
+
+    def _send_command_batch(
+        self,
+        batch: robot_command_util.CommandBatch,
+        feedback_monitor: FeedbackMonitor[int, robot_command_pb2.RobotCommandFeedback],
+    ) -> int:
+        """
+        Send a batch of trajectories, recording the round trip time of the robot command, and track its feedback.
+
+        Returns:
+            The id of the robot command.
+        """
+        send_start_time = time.monotonic()
+        success, err_msg, goal_id = self.spot_wrapper.robot_command(batch.command)
+        self.batch_dispatch.record_round_trip(time.monotonic() - send_start_time)
+        if not success:
+            raise Exception(err_msg)
+        feedback_monitor.track(goal_id)
+        self.get_logger().info("Robot now executing goal " + str(goal_id))
+        return goal_id
+
+    def _batch_send_time(
+        self, batch: robot_command_util.CommandBatch, reference_time: float, previous_batch_end_time: float
+    ) -> float:
+        """
+        Returns:
+            The local time in seconds at which the given batch should be sent, from the reference time of its
+            trajectories and the time since reference of the last point of the previous batch.
+        """
+        if batch.rebased:
+            return self.batch_dispatch.send_time_before(reference_time + batch.start_time)
+        return self.batch_dispatch.send_time(
+            reference_time + batch.start_time, reference_time + previous_batch_end_time
+        )
+
+    def _create_arbitrated_action_server(
+        self,
+        action_type: Any,
+        action_name: str,
+        execute_callback: Callable[[ServerGoalHandle], Any],
+        goal_resources: Callable[[Any], Resource],
+    ) -> ActionServer:
+        """
+        Create an action server whose goals acquire robot resources from the goal arbiter, and preempt the goals of
+        arbitrated actions holding some of them.
+
+        Args:
+            action_type: Type of the action.
+            action_name: Name of the action.
+            execute_callback: Callback executing a goal.
+            goal_resources: Callback returning the robot resources commanded by a goal request.
+
+        Returns:
+            The action server.
+        """
+
+        def handle_accepted(goal_handle: ServerGoalHandle) -> None:
+            for preempted in self.goal_arbiter.acquire(goal_handle, goal_resources(goal_handle.request)):
+                if preempted.is_active:
+                    self.get_logger().info(f"Preempting goal commanding resources needed by a {action_name} goal")
+                    preempted.abort()
+            goal_handle.execute()
+
+        def execute(goal_handle: ServerGoalHandle) -> Any:
+            try:
+                return execute_callback(goal_handle)
+            finally:
+                self.goal_arbiter.release(goal_handle)
+
+        return ActionServer(
+            self,
+            action_type,
+            action_name,
+            execute,
+            handle_accepted_callback=handle_accepted,
+            cancel_callback=lambda _: CancelResponse.ACCEPT,
+            callback_group=self.arbitrated_goal_callback_group,
+        )
+
+    def _robot_command_goal_resources(self, request: Any) -> Resource:
+        """Robot resources commanded by the robot command of a goal request"""
+        proto_command = robot_command_pb2.RobotCommand()
+        convert(request.command, proto_command)
+        return robot_command_resources(proto_command)
+
+    def _stop_after_cancellation(self, goal_handle: ServerGoalHandle) -> None:
+        """
+        Stop the robot after a goal is cancelled. While goals on other resources are still executing, only the
+        resources of the cancelled goal are stopped: mobility and the arm get stop commands and the gripper holds in
+        place.
+        """
+        if self.spot_wrapper is None:
+            return
+        resources = self.goal_arbiter.resources_to_stop(goal_handle)
+        if resources == Resource.ALL:
+            _, stop_message = self.spot_wrapper.stop()
+            self.get_logger().info(f"Stop attempt due to cancellation: {stop_message}")
+            return
+        gripper_open_fraction: Optional[float] = None
+        robot_state = self.spot_wrapper.robot_state
+        if robot_state is not None and robot_state.HasField("manipulator_state"):
+            gripper_open_fraction = robot_state.manipulator_state.gripper_open_percentage / 100.0
+        stop_command = resource_stop_command(resources, gripper_open_fraction)
+        if stop_command is None:
+            self.get_logger().info("Not stopping after cancellation, the goal holds no resources to stop")
+            return
+        _, stop_message, _ = self.spot_wrapper.robot_command(stop_command)
+        self.get_logger().info(f"Stop attempt of the {resources} of the cancelled goal: {stop_message}")
+
+    def _robot_clock_sync_round_trip(self) -> Optional[float]:
+        """
+        Returns:
+            The round trip time in seconds of the best robot clock skew estimate used to convert the reference time of
+            robot commands to the robot clock, or None if the robot clock is not synchronized.
+        """
+        try:
+            round_trip = self.spot_wrapper._robot_command_client.timesync_endpoint.round_trip_time
+        except NoTimeSyncError:
+            return None
+        if round_trip is None:
+            return None
+        return duration_to_seconds(round_trip)
+
     def _manipulation_goal_complete(self, feedback: Optional[ManipulationApiFeedbackResponse]) -> GoalResponse:
         if feedback is None:
             # NOTE: it takes an iteration for the feedback to get set.
             return GoalResponse.IN_PROGRESS
 
-        if feedback.current_state.value == feedback.current_state.MANIP_STATE_UNKNOWN:
-            return GoalResponse.FAILED
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_DONE:
-            return GoalResponse.SUCCESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_SEARCHING_FOR_GRASP:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_MOVING_TO_GRASP:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASPING_OBJECT:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_PLACING_OBJECT:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_SUCCEEDED:
-            return GoalResponse.SUCCESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_FAILED:
-            return GoalResponse.FAILED
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_PLANNING_SUCCEEDED:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_PLANNING_NO_SOLUTION:
-            return GoalResponse.FAILED
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_FAILED_TO_RAYCAST_INTO_MAP:
-            return GoalResponse.FAILED
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_GRASP_PLANNING_WAITING_DATA_AT_EDGE:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_WALKING_TO_OBJECT:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_ATTEMPTING_RAYCASTING:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_MOVING_TO_PLACE:
-            return GoalResponse.IN_PROGRESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_PLACE_FAILED_TO_RAYCAST_INTO_MAP:
-            return GoalResponse.FAILED
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_PLACE_SUCCEEDED:
-            return GoalResponse.SUCCESS
-        elif feedback.current_state.value == feedback.current_state.MANIP_STATE_PLACE_FAILED:
-            return GoalResponse.FAILED
-        else:
-            raise Exception("Unknown manipulation state type")
+        return feedback_tables.classify_manipulation_feedback(feedback)
 
-    def _get_manipulation_command_feedback(self, goal_id: str) -> ManipulationApiFeedbackResponse:
-        feedback = ManipulationApiFeedbackResponse()
-        if self.spot_wrapper is not None:
-            convert(self.spot_wrapper.get_manipulation_command_feedback(goal_id), feedback)
-        return feedback
+    def _request_manipulation_feedback(self, goal_id: int) -> Any:
+        """Sends an asynchronous manipulation feedback request, and returns its future"""
+        client = self.spot_wrapper._robot.ensure_client(ManipulationApiClient.default_service_name)
+        request = manipulation_api_pb2.ManipulationApiFeedbackRequest(manipulation_cmd_id=goal_id)
+        return client.manipulation_api_feedback_command_async(request)
 
     def handle_manipulation_command(self, goal_handle: ServerGoalHandle) -> Manipulation.Result:
         # Most of the logic here copied from handle_robot_command
@@ -2370,9 +2879,10 @@ class SpotROS(Node):
         ros_command = goal_handle.request.command
         proto_command = manipulation_api_pb2.ManipulationApiRequest()
         convert(ros_command, proto_command)
-        self._wait_for_goal = None
+        # Mocked goals reach their goal after a while. Each goal has its own, as arbitrated goals run concurrently.
+        wait_for_goal: Optional[WaitForGoal] = None
         if not self.spot_wrapper:
-            self._wait_for_goal = WaitForGoal(self.get_clock(), 2.0)
+            wait_for_goal = WaitForGoal(self.deadline_scheduler, 2.0)
             goal_id: Optional[str] = None
         else:
             success, err_msg, goal_id = self.spot_wrapper.manipulation_command(proto_command)
@@ -2385,37 +2895,57 @@ class SpotROS(Node):
         # monitor whether the timeout_cb has already aborted the command
         feedback: Optional[ManipulationApiFeedbackResponse] = None
         feedback_msg: Optional[Manipulation.Feedback] = None
-        while (
-            rclpy.ok()
-            and not goal_handle.is_cancel_requested
-            and self._manipulation_goal_complete(feedback) == GoalResponse.IN_PROGRESS
-            and goal_handle.is_active
-        ):
-            try:
-                if goal_id is not None:
-                    feedback = self._get_manipulation_command_feedback(goal_id)
-            except InternalServerError as e:
-                self.get_logger().error(e)
-
-            feedback_msg = Manipulation.Feedback(feedback=feedback)
-            goal_handle.publish_feedback(feedback_msg)
-
-            time.sleep(0.1)  # don't use rate here because we're already in a single thread
+        # Feedback is requested asynchronously by the feedback scheduler, and only converted and published when it
+        # changes
+        feedback_monitor: FeedbackMonitor[int, manipulation_api_pb2.ManipulationApiFeedbackResponse] = FeedbackMonitor(
+            self._request_manipulation_feedback,
+            _manipulation_feedback_without_header,
+            self.manipulation_feedback_period,
+            self.deadline_scheduler,
+        )
+        if goal_id is not None:
+            feedback_monitor.track(goal_id)
+        feedback_version = 0
+        try:
+            while (
+                rclpy.ok()
+                and not goal_handle.is_cancel_requested
+                and self._manipulation_goal_complete(feedback) == GoalResponse.IN_PROGRESS
+                and goal_handle.is_active
+                and not (wait_for_goal is not None and wait_for_goal.at_goal)
+            ):
+                try:
+                    new_feedback_version, feedback_proto = feedback_monitor.wait(
+                        feedback_version, self.manipulation_feedback_period
+                    )
+                except InternalServerError as e:
+                    self.get_logger().error(e)
+                    continue
+                if new_feedback_version != feedback_version and feedback_proto is not None:
+                    feedback_version = new_feedback_version
+                    feedback = ManipulationApiFeedbackResponse()
+                    convert(feedback_proto, feedback)
+                    feedback_msg = Manipulation.Feedback(feedback=feedback)
+                    goal_handle.publish_feedback(feedback_msg)
+        finally:
+            feedback_monitor.stop()
+            if wait_for_goal is not None:
+                wait_for_goal.cancel()
 
         # publish a final feedback
         result = Manipulation.Result()
         if feedback is not None:
             goal_handle.publish_feedback(feedback_msg)
             result.result = feedback
-        result.success = self._manipulation_goal_complete(feedback) == GoalResponse.SUCCESS
+        result.success = self._manipulation_goal_complete(feedback) == GoalResponse.SUCCESS or (
+            wait_for_goal is not None and wait_for_goal.at_goal
+        )
 
         if goal_handle.is_cancel_requested:
             result.success = False
             result.message = "Cancelled"
             goal_handle.canceled()
-            if self.spot_wrapper is not None:
-                _, stop_message = self.spot_wrapper.stop()
-                self.get_logger().info(f"Stop attempt due to cancellation: {stop_message}")
+            self._stop_after_cancellation(goal_handle)
         elif not goal_handle.is_active:
             result.success = False
             result.message = "Cancelled"
@@ -2426,13 +2956,16 @@ class SpotROS(Node):
         else:
             result.message = "Failed to complete manipulation"
             goal_handle.abort()
-        self._wait_for_goal = None
         if not self.spot_wrapper:
             self.get_logger().info("Returning action result " + str(result))
         return result
 
     def handle_trajectory(self, goal_handle: ServerGoalHandle) -> Optional[Trajectory.Result]:
-        """ROS actionserver execution handler to handle receiving a request to move to a location"""
+        """
+        ROS actionserver execution handler to handle receiving a request to move to a location. When the goal
+        succeeds early within its tolerances, the trajectory command keeps running on the robot, which keeps moving
+        to the target until the command completes or another command replaces it.
+        """
         result: Optional[Trajectory.Result] = None
 
         if goal_handle.request.target_pose.header.frame_id != "body":
@@ -2457,58 +2990,80 @@ class SpotROS(Node):
             return result
 
         cmd_duration_secs = goal_handle.request.duration.sec * 1.0
-
-        self.spot_wrapper.trajectory_cmd(
-            goal_x=goal_handle.request.target_pose.pose.position.x,
-            goal_y=goal_handle.request.target_pose.pose.position.y,
-            goal_heading=math_helpers.Quat(
+        body_tform_goal = SE2Pose(
+            goal_handle.request.target_pose.pose.position.x,
+            goal_handle.request.target_pose.pose.position.y,
+            math_helpers.Quat(
                 w=goal_handle.request.target_pose.pose.orientation.w,
                 x=goal_handle.request.target_pose.pose.orientation.x,
                 y=goal_handle.request.target_pose.pose.orientation.y,
                 z=goal_handle.request.target_pose.pose.orientation.z,
             ).to_yaw(),
+        )
+        position_tolerance = goal_handle.request.position_tolerance
+        heading_tolerance = goal_handle.request.heading_tolerance
+
+        # The goal is kept in the odom frame, like the trajectory command does, to measure the remaining error as the
+        # robot moves. The robot state cached by the wrapper avoids delaying the command by a robot state request.
+        robot_state = self.spot_wrapper.robot_state
+        if robot_state is None:
+            goal_handle.abort()
+            result = Trajectory.Result()
+            result.success = False
+            result.message = "No robot state received yet, cannot locate the robot"
+            return result
+        odom_tform_goal = self._odom_tform_body(robot_state) * body_tform_goal
+        self.spot_wrapper.trajectory_cmd(
+            goal_x=body_tform_goal.x,
+            goal_y=body_tform_goal.y,
+            goal_heading=body_tform_goal.angle,
             cmd_duration=cmd_duration_secs,
             precise_position=goal_handle.request.precise_positioning,
         )
 
-        command_start_time = self.get_clock().now()
-
         # Abort the action server if cmd_duration is exceeded - the driver stops but does not provide
         # feedback to indicate this, so we monitor it ourselves
         # The trajectory command is non-blocking, but we need to keep this function up in order to
         # interrupt if a preempt is requested and to return success if/when the robot reaches the goal.
-        # Also check the is_active to
-        # monitor whether the timeout has already aborted the command
-
-        #
-        # Pre-emp missing in port to ROS2 (ros1: self.trajectory_server.is_preempt_requested())
-        #
-
-        # rate = rclpy.Rate(10)
+        # Also check the is_active to monitor whether the timeout has already aborted the command
 
+        timed_out = threading.Event()
+        timeout_call = self.deadline_scheduler.call_later(cmd_duration_secs, timed_out.set)
         try:
+            within_tolerance = False
             while rclpy.ok() and not self.spot_wrapper.at_goal and goal_handle.is_active:
                 feedback = Trajectory.Feedback()
-                if self.spot_wrapper.near_goal:
+                distance, heading_error = robot_command_util.se2_goal_error(
+                    self._odom_tform_body(self.spot_wrapper.robot_state), odom_tform_goal
+                )
+                feedback.distance_to_goal = distance
+                feedback.heading_error = heading_error
+                within_tolerance = (
+                    position_tolerance > 0.0
+                    and distance <= position_tolerance
+                    and (heading_tolerance <= 0.0 or abs(heading_error) <= heading_tolerance)
+                )
+                if within_tolerance:
+                    feedback.feedback = "Within goal tolerance, trajectory command still running"
+                elif self.spot_wrapper.near_goal:
                     if self.spot_wrapper.last_trajectory_command_precise:
                         feedback.feedback = "Near goal, performing final adjustments"
                     else:
                         feedback.feedback = "Near goal"
                 else:
                     feedback.feedback = "Moving to goal"
-
-                # rate.sleep()
                 goal_handle.publish_feedback(feedback)
-                time.sleep(0.1)
-
-                # check for timeout
-                com_dur = self.get_clock().now() - command_start_time
+                if within_tolerance:
+                    break
 
-                if com_dur.nanoseconds / 1e9 > cmd_duration_secs:
+                # Sleep until the next poll, or wake up as soon as the command times out
+                if timed_out.wait(self.trajectory_poll_period):
                     # timeout, quit with failure
                     self.get_logger().error("TIMEOUT")
                     feedback = Trajectory.Feedback()
                     feedback.feedback = "Failed to reach goal, timed out"
+                    feedback.distance_to_goal = distance
+                    feedback.heading_error = heading_error
                     goal_handle.publish_feedback(feedback)
                     goal_handle.abort()
 
@@ -2518,23 +3073,20 @@ class SpotROS(Node):
 
             # If still active after exiting the loop, the command did not time out
             if goal_handle.is_active:
-                #            if self.trajectory_server.is_preempt_requested():
-                #                self.trajectory_server.publish_feedback(TrajectoryFeedback("Preempted"))
-                #                self.trajectory_server.set_preempted()
-                #                self.spot_wrapper.stop()
-                #                result.success = False
-                #                result.message = 'preempt'
-
                 feedback = Trajectory.Feedback()
-                if self.spot_wrapper.at_goal:
-                    # self.get_logger().error("SUCCESS")
+                feedback.distance_to_goal, feedback.heading_error = robot_command_util.se2_goal_error(
+                    self._odom_tform_body(self.spot_wrapper.robot_state), odom_tform_goal
+                )
+                if self.spot_wrapper.at_goal or within_tolerance:
                     feedback.feedback = "Reached goal"
+                    result.message = ""
+                    if not self.spot_wrapper.at_goal:
+                        feedback.feedback = "Reached goal tolerance, trajectory command still running"
+                        result.message = "Within goal tolerance, trajectory command still running"
                     goal_handle.publish_feedback(feedback)
                     result.success = True
-                    result.message = ""
                     goal_handle.succeed()
                 else:
-                    # self.get_logger().error("FAIL")
                     feedback.feedback = "Failed to reach goal"
                     goal_handle.publish_feedback(feedback)
                     result.success = False
@@ -2546,15 +3098,42 @@ class SpotROS(Node):
             if result is not None:
                 result.success = False
             result.message = f"Exception: {type(e)} - {e}"
+        finally:
+            timeout_call.cancel()
         # self.get_logger().error(f"RETURN FROM HANDLE: {result}")
         return result
 
+    @staticmethod
+    def _odom_tform_body(robot_state: robot_state_pb2.RobotState) -> SE2Pose:
+        """Pose of the body projected on the ground plane of the odom frame"""
+        return get_odom_tform_body(robot_state.kinematic_state.transforms_snapshot).get_closest_se2_transform()
+
     def cmd_velocity_callback(self, data: Twist) -> None:
         """Callback for cmd_vel command"""
         if not self.spot_wrapper:
             self.get_logger().info(f"Mock mode, received command vel {data}")
             return
-        self.spot_wrapper.velocity_cmd(data.linear.x, data.linear.y, data.angular.z, self.cmd_duration)
+        self.cmd_vel_sender.submit((data, self.stop_generation))
+
+    def _send_velocity_command(self, command: Tuple[Twist, int]) -> Future:
+        """
+        Sends a velocity command lasting cmd_duration from the cmd_vel worker, returning the future of its
+        acknowledgement. The command goes through SpotWrapper.velocity_cmd, which keeps track of the end of the last
+        velocity command for is_moving. Twists received before a stop are dropped once the worker picks them up.
+        """
+        data, generation = command
+
+        def velocity_cmd() -> None:
+            if generation != self.stop_generation:
+                self.get_logger().debug("Dropping a velocity command received before a stop")
+                return
+            success, message = self.spot_wrapper.velocity_cmd(
+                data.linear.x, data.linear.y, data.angular.z, self.cmd_duration
+            )
+            if not success:
+                raise RuntimeError(message)
+
+        return self.cmd_vel_worker.submit(velocity_cmd)
 
     def body_pose_callback(self, data: Pose) -> None:
         """Callback for cmd_vel command"""
@@ -2572,9 +3151,28 @@ class SpotROS(Node):
         traj = trajectory_pb2.SE3Trajectory(points=[point])
         body_control = spot_command_pb2.BodyControlParams(base_offset_rt_footprint=traj)
 
-        mobility_params = self.spot_wrapper.get_mobility_params()
-        mobility_params.body_control.CopyFrom(body_control)
-        self.spot_wrapper.set_mobility_params(mobility_params)
+        self._update_mobility_params(lambda mobility_params: mobility_params.body_control.CopyFrom(body_control))
+
+    def _update_mobility_params(self, modify: Callable[[spot_command_pb2.MobilityParams], None]) -> None:
+        """Modifies the mobility params, sets them to the wrapper and publishes them if they changed"""
+        if self.mobility_params_cache.update(modify, self.spot_wrapper.set_mobility_params):
+            self.mobility_params_pub.publish(self._mobility_params_msg(self.mobility_params_cache.get()))
+
+    @staticmethod
+    def _mobility_params_msg(mobility_params: spot_command_pb2.MobilityParams) -> MobilityParams:
+        mobility_params_msg = MobilityParams()
+        if mobility_params.body_control.base_offset_rt_footprint.points:
+            pose = mobility_params.body_control.base_offset_rt_footprint.points[0].pose
+            mobility_params_msg.body_control.position.x = pose.position.x
+            mobility_params_msg.body_control.position.y = pose.position.y
+            mobility_params_msg.body_control.position.z = pose.position.z
+            mobility_params_msg.body_control.orientation.x = pose.rotation.x
+            mobility_params_msg.body_control.orientation.y = pose.rotation.y
+            mobility_params_msg.body_control.orientation.z = pose.rotation.z
+            mobility_params_msg.body_control.orientation.w = pose.rotation.w
+        mobility_params_msg.locomotion_hint = mobility_params.locomotion_hint
+        mobility_params_msg.stair_hint = mobility_params.stair_hint
+        return mobility_params_msg
 
     def handle_graph_nav_get_localization_pose(
         self,
@@ -2740,33 +3338,16 @@ class SpotROS(Node):
         convert(proto_response, response.response)
         return response
 
-    def handle_execute_dance_feedback(self) -> None:
-        """Thread function to send execute dance feedback"""
-        if self.spot_wrapper is None:
-            return
-
-        while rclpy.ok() and self.run_dance_feedback:
-            res, msg, status = self.spot_wrapper.get_choreography_status()
-            if res:
-                feedback = ExecuteDance.Feedback()
-                feedback.is_dancing = status == ChoreographyStatusResponse.Status.STATUS_DANCING
-                if self.execute_dance_handle is not None:
-                    self.execute_dance_handle.publish_feedback(feedback)
-
-                if status == ChoreographyStatusResponse.Status.STATUS_COMPLETED_SEQUENCE:
-                    break
-
-            time.sleep(0.01)
+    def _publish_dance_feedback(self, execute_dance_handle: ServerGoalHandle, status: int) -> None:
+        feedback = ExecuteDance.Feedback()
+        feedback.is_dancing = status == ChoreographyStatusResponse.Status.STATUS_DANCING
+        execute_dance_handle.publish_feedback(feedback)
 
     def handle_execute_dance(self, execute_dance_handle: ServerGoalHandle) -> ExecuteDance.Result:
         """ROS service handler for uploading and executing dance."""
 
         self.execute_dance_handle = execute_dance_handle
 
-        feedback_thread = threading.Thread(target=self.handle_execute_dance_feedback, args=())
-        self.run_dance_feedback = True
-        feedback_thread.start()
-
         if self.spot_wrapper is None:
             error_msg = "Spot wrapper is None"
             self.get_logger().error(error_msg)
@@ -2775,6 +3356,22 @@ class SpotROS(Node):
             result.message = error_msg
             return result
 
+        # The choreography status is published whenever it changes while the dance is uploaded and executed. Status
+        # requests are blocking, so they are sent from the shared status request worker.
+        feedback_monitor: FeedbackMonitor[ServerGoalHandle, int] = FeedbackMonitor(
+            lambda _: self.status_request_worker.submit(self.spot_wrapper.get_choreography_status),
+            lambda response: response[2] if response[0] else None,
+            self.DANCE_FEEDBACK_PERIOD,
+            self.deadline_scheduler,
+            partial(self._publish_dance_feedback, execute_dance_handle),
+        )
+        feedback_monitor.track(execute_dance_handle)
+        try:
+            return self._execute_dance(execute_dance_handle)
+        finally:
+            feedback_monitor.stop()
+
+    def _execute_dance(self, execute_dance_handle: ServerGoalHandle) -> ExecuteDance.Result:
         start_slice = 0
         if execute_dance_handle.request.start_slice:
             start_slice = execute_dance_handle.request.start_slice
@@ -2802,37 +3399,19 @@ class SpotROS(Node):
             result.message = error_msg
             return result
 
-        self.run_dance_feedback = False
-        feedback_thread.join()
-
         result = ExecuteDance.Result()
         result.success = res
         result.message = msg
         return result
 
-    def handle_navigate_to_feedback(self) -> None:
-        """Thread function to send navigate_to feedback"""
-        if self.spot_wrapper is None:
-            return
-
-        while rclpy.ok() and self.run_navigate_to:
-            localization_state = self.spot_wrapper._graph_nav_client.get_localization_state()
-            if localization_state.localization.waypoint_id:
-                feedback = NavigateTo.Feedback()
-                feedback.waypoint_id = localization_state.localization.waypoint_id
-                if self.goal_handle is not None:
-                    self.goal_handle.publish_feedback(feedback)
-            time.sleep(0.1)
-            # rclpy.Rate(10).sleep()
+    def _publish_navigate_to_feedback(self, goal_handle: ServerGoalHandle, waypoint_id: str) -> None:
+        feedback = NavigateTo.Feedback()
+        feedback.waypoint_id = waypoint_id
+        goal_handle.publish_feedback(feedback)
 
     def handle_navigate_to(self, goal_handle: ServerGoalHandle) -> NavigateTo.Result:
         """ROS service handler to run mission of the robot.  The robot will replay a mission"""
-        # create thread to periodically publish feedback
-
         self.goal_handle = goal_handle
-        feedback_thread = threading.Thread(target=self.handle_navigate_to_feedback, args=())
-        self.run_navigate_to = True
-        feedback_thread.start()
         if self.spot_wrapper is None:
             self.get_logger().error("Spot wrapper is None")
             response = NavigateTo.Result()
@@ -2841,15 +3420,25 @@ class SpotROS(Node):
             goal_handle.abort()
             return response
 
-        # run navigate_to
-        resp = self.spot_wrapper.spot_graph_nav._navigate_to(
-            upload_path=goal_handle.request.upload_path,
-            navigate_to=goal_handle.request.navigate_to,
-            initial_localization_fiducial=goal_handle.request.initial_localization_fiducial,
-            initial_localization_waypoint=goal_handle.request.initial_localization_waypoint,
+        # The waypoint the robot is localized at is published whenever it changes while the robot navigates
+        feedback_monitor: FeedbackMonitor[ServerGoalHandle, str] = FeedbackMonitor(
+            lambda _: self.spot_wrapper._graph_nav_client.get_localization_state_async(),
+            lambda response: response.localization.waypoint_id or None,
+            self.NAVIGATE_TO_FEEDBACK_PERIOD,
+            self.deadline_scheduler,
+            partial(self._publish_navigate_to_feedback, goal_handle),
         )
-        self.run_navigate_to = False
-        feedback_thread.join()
+        feedback_monitor.track(goal_handle)
+        # run navigate_to
+        try:
+            resp = self.spot_wrapper.spot_graph_nav._navigate_to(
+                upload_path=goal_handle.request.upload_path,
+                navigate_to=goal_handle.request.navigate_to,
+                initial_localization_fiducial=goal_handle.request.initial_localization_fiducial,
+                initial_localization_waypoint=goal_handle.request.initial_localization_waypoint,
+            )
+        finally:
+            feedback_monitor.stop()
 
         result = NavigateTo.Result()
         result.success = resp[0]
@@ -2919,75 +3508,53 @@ class SpotROS(Node):
 
         return response
 
-    def populate_camera_static_transforms(self, image_data: image_pb2.Image) -> None:
+    def populate_camera_static_transforms(self, image_data: image_pb2.ImageResponse) -> None:
         """Check data received from one of the image tasks and use the transform snapshot to extract the camera frame
         transforms. This is the transforms from body->frontleft->frontleft_fisheye, for example. These transforms
         never change, but they may be calibrated slightly differently for each robot, so we need to generate the
-        transforms at runtime.
+        transforms at runtime. Only the first image of each image source is inspected.
         Args:
         image_data: Image protobuf data from the wrapper
         """
-        # We exclude the odometry frames from static transforms since they are not static. We can ignore the body
-        # frame because it is a child of odom or vision depending on the preferred_odom_frame, and will be published
-        # by the non-static transform publishing that is done by the state callback
-        excluded_frames = [
-            self.tf_name_vision_odom.value,
-            self.tf_name_kinematic_odom.value,
-            self.frame_prefix + "body",
-        ]
-
-        excluded_frames = [f[f.rfind("/") + 1 :] for f in excluded_frames]
+        if image_data.source.name in self.camera_static_transform_sources:
+            return
 
-        # Special case handling for hand camera frames that reference the link "arm0.link_wr1" in their
-        # transform snapshots. This name only appears in hand camera transform snapshots and appears to
-        # be a bug in this particular image callback path.
-        #
-        # 1. We exclude publishing a static transform from arm0.link_wr1 -> body here because it depends
-        #    on the arm's position and a static transform would fix it to its initial position.
-        #
-        # 2. Below we rename the parent link "arm0.link_wr1" to "link_wr1" as it appears in robot state
-        #    which is used for publishing dynamic tfs elsewhere. Without this, the hand camera frame
-        #    positions would never properly update as no other pipelines reference "arm0.link_wr1".
-        #
-        # We save an RPC call to self.spot_wrapper.has_arm() and any extra complexity here as the link
-        # will not exist if the spot does not have an arm and the special case code will have no effect.
-        excluded_frames.append("arm0.link_wr1")
+        with self.camera_static_transforms_lock:
+            if image_data.source.name in self.camera_static_transform_sources:
+                return
 
-        for frame_name in image_data.shot.transforms_snapshot.child_to_parent_edge_map:
-            if frame_name in excluded_frames:
-                continue
+            new_transforms = False
+            for frame_name, transform in image_data.shot.transforms_snapshot.child_to_parent_edge_map.items():
+                if frame_name in self.camera_static_transform_excluded_frames:
+                    continue
 
-            transform = image_data.shot.transforms_snapshot.child_to_parent_edge_map.get(frame_name)
-            parent_frame = transform.parent_frame_name
+                parent_frame = transform.parent_frame_name
+                # special case handling of parent frame to sync with robot state naming, see __init__
+                if parent_frame == "arm0.link_wr1":
+                    parent_frame = "arm_link_wr1"
 
-            # special case handling of parent frame to sync with robot state naming, see above
-            if parent_frame == "arm0.link_wr1":
-                parent_frame = "arm_link_wr1"
+                key = (self.frame_prefix + parent_frame, self.frame_prefix + frame_name)
+                if key in self.camera_static_transforms:
+                    # We already extracted this transform
+                    continue
 
-            existing_transforms = [
-                (transform.header.frame_id, transform.child_frame_id) for transform in self.camera_static_transforms
-            ]
-            if (
-                self.frame_prefix + parent_frame,
-                self.frame_prefix + frame_name,
-            ) in existing_transforms:
-                # We already extracted this transform
-                continue
+                if self.spot_wrapper is not None:
+                    local_time = self.spot_wrapper.robotToLocalTime(image_data.shot.acquisition_time)
+                else:
+                    local_time = Timestamp()
+                tf_time = builtin_interfaces.msg.Time(sec=local_time.seconds, nanosec=local_time.nanos)
+                self.camera_static_transforms[key] = populate_transform_stamped(
+                    tf_time,
+                    parent_frame,
+                    frame_name,
+                    transform.parent_tform_child,
+                    self.frame_prefix,
+                )
+                new_transforms = True
 
-            if self.spot_wrapper is not None:
-                local_time = self.spot_wrapper.robotToLocalTime(image_data.shot.acquisition_time)
-            else:
-                local_time = Timestamp()
-            tf_time = builtin_interfaces.msg.Time(sec=local_time.seconds, nanosec=local_time.nanos)
-            static_tf = populate_transform_stamped(
-                tf_time,
-                parent_frame,
-                frame_name,
-                transform.parent_tform_child,
-                self.frame_prefix,
-            )
-            self.camera_static_transforms.append(static_tf)
-            self.camera_static_transform_broadcaster.sendTransform(self.camera_static_transforms)
+            self.camera_static_transform_sources.add(image_data.source.name)
+            if new_transforms:
+                self.camera_static_transform_broadcaster.sendTransform(list(self.camera_static_transforms.values()))
 
     def step(self) -> None:
         """Update spot sensors"""
@@ -3014,40 +3581,15 @@ class SpotROS(Node):
                 except AttributeError:
                     pass
             self.feedback_pub.publish(feedback_msg)
-            mobility_params_msg = MobilityParams()
-            if self.spot_wrapper is not None:
-                try:
-                    mobility_params = self.spot_wrapper.get_mobility_params()
-                    mobility_params_msg.body_control.position.x = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.position.x
-                    )
-                    mobility_params_msg.body_control.position.y = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.position.y
-                    )
-                    mobility_params_msg.body_control.position.z = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.position.z
-                    )
-                    mobility_params_msg.body_control.orientation.x = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.rotation.x
-                    )
-                    mobility_params_msg.body_control.orientation.y = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.rotation.y
-                    )
-                    mobility_params_msg.body_control.orientation.z = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.rotation.z
-                    )
-                    mobility_params_msg.body_control.orientation.w = (
-                        mobility_params.body_control.base_offset_rt_footprint.points[0].pose.rotation.w
-                    )
-                    mobility_params_msg.locomotion_hint = mobility_params.locomotion_hint
-                    mobility_params_msg.stair_hint = mobility_params.stair_hint
-                except Exception as e:
-                    self.get_logger().error("Error:{}".format(e))
-                    pass
-            self.mobility_params_pub.publish(mobility_params_msg)
 
     def destroy_node(self) -> None:
         self.get_logger().info("Shutting down ROS driver for Spot")
+        if self.image_pipeline is not None:
+            self.image_pipeline.shutdown()
+        self.stop_dispatcher.shutdown()
+        self.deadline_scheduler.shutdown()
+        self.status_request_worker.shutdown(wait=False)
+        self.cmd_vel_worker.shutdown(wait=False)
         if self.spot_wrapper is not None:
             self.spot_wrapper.sit()
         if self.spot_wrapper is not None:
@@ -0,0 +1,116 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Dispatching of stop and estop requests on a dedicated thread, ahead of any other request to the robot.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+
+class StopKind(IntEnum):
+    """Kinds of stop, by increasing priority"""
+
+    STOP = 0
+    ESTOP_GENTLE = 1
+    ESTOP_HARD = 2
+
+
+# Names of the kinds of stop, as the services dispatching them
+STOP_KIND_NAMES = {
+    StopKind.STOP: "stop",
+    StopKind.ESTOP_GENTLE: "estop/gentle",
+    StopKind.ESTOP_HARD: "estop/hard",
+}
+
+# Success and message of a stop
+StopResult = Tuple[bool, str]
+
+
+class StopDispatcher:
+    """
+    Runs stop requests on its own thread, so that they never wait for an executor thread or for a blocking call of
+    another service. Pending requests are dispatched by priority, e.g. a hard estop before a stop, and requests of a
+    kind that is already pending share its result.
+    """
+
+    def __init__(
+        self,
+        handlers: Mapping[StopKind, Callable[[], StopResult]],
+        latency_callback: Optional[Callable[[str, str, float], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            handlers: Callbacks stopping the robot, by kind of stop.
+            latency_callback: Callback receiving the name of the kind of stop, the stage, dispatch or complete, and the
+                latency in seconds of the stage since the request.
+            clock: Clock in seconds of the request times.
+        """
+        self._handlers = dict(handlers)
+        self._latency_callback = latency_callback
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._pending: Dict[StopKind, Tuple[Future, float]] = {}
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._run, name="stop_dispatcher", daemon=True)
+        self._thread.start()
+
+    def dispatch(self, kind: StopKind, request_time: Optional[float] = None) -> Future:
+        """
+        Args:
+            kind: Kind of stop.
+            request_time: Time of the request on the clock of the dispatcher, e.g. the stamp of a request message.
+                Defaults to now.
+
+        Returns:
+            A future holding the result of the stop.
+        """
+        if request_time is None:
+            request_time = self._clock()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Stop dispatcher is shut down")
+            pending = self._pending.get(kind)
+            if pending is not None:
+                future, pending_time = pending
+                self._pending[kind] = (future, min(pending_time, request_time))
+                return future
+            future = Future()
+            self._pending[kind] = (future, request_time)
+            self._condition.notify()
+        return future
+
+    def shutdown(self) -> None:
+        """Stops the dispatching thread once the stop being dispatched, if any, completes"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _record(self, kind: StopKind, stage: str, latency: float) -> None:
+        if self._latency_callback is not None:
+            self._latency_callback(STOP_KIND_NAMES[kind], stage, latency)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    for future, _ in self._pending.values():
+                        future.cancel()
+                    self._pending.clear()
+                    return
+                kind = max(self._pending)
+                future, request_time = self._pending.pop(kind)
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._record(kind, "dispatch", self._clock() - request_time)
+            try:
+                future.set_result(self._handlers[kind]())
+            except Exception as e:
+                future.set_exception(e)
+            self._record(kind, "complete", self._clock() - request_time)
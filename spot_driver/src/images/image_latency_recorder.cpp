@@ -0,0 +1,69 @@
+// Copyright (c) 2024 Boston Dynamics AI Institute LLC. All rights reserved.
+
+#include <spot_driver/images/image_latency_recorder.hpp>
+
+#include <algorithm>
+
+namespace {
+// Upper bounds of the histogram buckets, in seconds
+const std::vector<double> kDefaultBucketUpperBounds{0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0};
+}  // namespace
+
+namespace spot_ros2::images {
+
+LatencyHistogram::LatencyHistogram(std::vector<double> upper_bounds)
+    : upper_bounds_{std::move(upper_bounds)}, counts_(upper_bounds_.size() + 1, 0) {}
+
+void LatencyHistogram::record(const double latency) {
+  const auto bucket = std::lower_bound(upper_bounds_.cbegin(), upper_bounds_.cend(), latency) - upper_bounds_.cbegin();
+  ++counts_.at(bucket);
+  ++count_;
+  total_ += latency;
+  max_ = std::max(max_, latency);
+}
+
+spot_msgs::msg::LatencyHistogram LatencyHistogram::toMsg(const std::string& source, const std::string& stage) const {
+  spot_msgs::msg::LatencyHistogram msg;
+  msg.source = source;
+  msg.stage = stage;
+  msg.upper_bounds = upper_bounds_;
+  msg.counts = counts_;
+  msg.count = count_;
+  msg.mean = count_ > 0 ? total_ / static_cast<double>(count_) : 0.0;
+  msg.max = max_;
+  return msg;
+}
+
+void ImageLatencyRecorder::record(const std::string& source, const std::string& stage, const double latency) {
+  std::lock_guard<std::mutex> lock{mutex_};
+  histograms_.try_emplace({source, stage}, kDefaultBucketUpperBounds).first->second.record(latency);
+}
+
+spot_msgs::msg::LatencyHistogramArray ImageLatencyRecorder::toMsg() const {
+  std::lock_guard<std::mutex> lock{mutex_};
+  return toMsgLocked();
+}
+
+spot_msgs::msg::LatencyHistogramArray ImageLatencyRecorder::takeMsg(const bool reset) {
+  std::lock_guard<std::mutex> lock{mutex_};
+  auto msg = toMsgLocked();
+  if (reset) {
+    histograms_.clear();
+  }
+  return msg;
+}
+
+spot_msgs::msg::LatencyHistogramArray ImageLatencyRecorder::toMsgLocked() const {
+  spot_msgs::msg::LatencyHistogramArray msg;
+  msg.histograms.reserve(histograms_.size());
+  for (const auto& [key, histogram] : histograms_) {
+    msg.histograms.push_back(histogram.toMsg(key.first, key.second));
+  }
+  return msg;
+}
+
+void ImageLatencyRecorder::reset() {
+  std::lock_guard<std::mutex> lock{mutex_};
+  histograms_.clear();
+}
+}  // namespace spot_ros2::images
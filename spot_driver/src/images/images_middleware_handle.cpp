@@ -13,6 +13,9 @@ constexpr auto kPublisherHistoryDepth = 10;
 
 constexpr auto kImageTopicSuffix = "image";
 constexpr auto kCameraInfoTopicSuffix = "camera_info";
+
+constexpr auto kLatencyTopicName = "image_latencies";
+constexpr auto kLatencyServiceName = "get_image_latencies";
 }  // namespace
 
 namespace spot_ros2::images {
@@ -67,4 +70,28 @@ tl::expected<void, std::string> ImagesMiddlewareHandle::publishImages(
   return {};
 }
 
+void ImagesMiddlewareHandle::createLatencyInterfaces(
+    const std::function<spot_msgs::msg::LatencyHistogramArray(bool reset)>& get_latencies) {
+  latency_publisher_ = node_->create_publisher<spot_msgs::msg::LatencyHistogramArray>(
+      kLatencyTopicName, rclcpp::QoS(rclcpp::KeepLast(1)));
+  latency_service_ = node_->create_service<spot_msgs::srv::GetImageLatencies>(
+      kLatencyServiceName,
+      [this, get_latencies](const std::shared_ptr<spot_msgs::srv::GetImageLatencies::Request> request,
+                            std::shared_ptr<spot_msgs::srv::GetImageLatencies::Response> response) {
+        response->latencies = get_latencies(request->reset);
+        response->latencies.header.stamp = node_->now();
+        response->success = true;
+        response->message = "Success";
+      });
+}
+
+void ImagesMiddlewareHandle::publishLatencies(const spot_msgs::msg::LatencyHistogramArray& latencies) {
+  if (!latency_publisher_) {
+    return;
+  }
+  auto msg = latencies;
+  msg.header.stamp = node_->now();
+  latency_publisher_->publish(msg);
+}
+
 }  // namespace spot_ros2::images
@@ -15,11 +15,13 @@
 #include <spot_driver/interfaces/rclcpp_wall_timer_interface.hpp>
 #include <spot_driver/types.hpp>
 
+#include <chrono>
 #include <memory>
 #include <optional>
 
 namespace {
 constexpr auto kImageCallbackPeriod = std::chrono::duration<double>{1.0 / 15.0};  // 15 Hz
+constexpr auto kLatencyPublishTicks = 15;                                          // Once per second at 15 Hz
 constexpr auto kDefaultDepthImageQuality = 100.0;
 }  // namespace
 
@@ -85,6 +87,7 @@ bool SpotImagePublisher::initialize() {
   const auto publish_depth_registered_images = parameters_->getPublishDepthRegisteredImages();
   const auto has_rgb_cameras = parameters_->getHasRGBCameras();
   const auto publish_raw_rgb_cameras = parameters_->getPublishRawRGBCameras();
+  const auto publish_image_latencies = parameters_->getPublishImageLatencies();
 
   // Generate the set of image sources based on which cameras the user has requested that we publish
   const auto sources =
@@ -96,6 +99,13 @@ bool SpotImagePublisher::initialize() {
   // Create a publisher for each image source
   middleware_handle_->createPublishers(sources);
 
+  if (publish_image_latencies) {
+    latency_recorder_ = std::make_unique<ImageLatencyRecorder>();
+    middleware_handle_->createLatencyInterfaces([this](bool reset) {
+      return latency_recorder_->takeMsg(reset);
+    });
+  }
+
   // Create a timer to request and publish images at a fixed rate
   timer_->setTimer(kImageCallbackPeriod, [this]() {
     timerCallback();
@@ -110,14 +120,45 @@ void SpotImagePublisher::timerCallback() {
     return;
   }
 
+  const auto request_start = std::chrono::steady_clock::now();
   const auto image_result = image_client_interface_->getImages(*image_request_message_);
   if (!image_result.has_value()) {
     logger_->logError(std::string{"Failed to get images: "}.append(image_result.error()));
     return;
   }
 
+  const auto receipt_time = std::chrono::system_clock::now();
+  const auto publish_start = std::chrono::steady_clock::now();
   middleware_handle_->publishImages(image_result.value().images_);
 
+  if (latency_recorder_) {
+    const auto publish_end = std::chrono::steady_clock::now();
+    recordLatencies(image_result.value().images_, receipt_time,
+                    std::chrono::duration<double>{publish_start - request_start}.count(),
+                    std::chrono::duration<double>{publish_end - publish_start}.count());
+  }
+
   tf_broadcaster_->updateStaticTransforms(image_result.value().transforms_);
 }
+
+void SpotImagePublisher::recordLatencies(const std::map<ImageSource, ImageWithCameraInfo>& images,
+                                         const std::chrono::system_clock::time_point& receipt_time,
+                                         const double request_duration, const double publish_duration) {
+  const auto receipt_seconds = std::chrono::duration<double>{receipt_time.time_since_epoch()}.count();
+  for (const auto& [image_source, image_data] : images) {
+    const auto source = toRosTopic(image_source);
+    // Image stamps hold the acquisition time converted to the local clock
+    const auto acquisition_seconds =
+        static_cast<double>(image_data.image.header.stamp.sec) + image_data.image.header.stamp.nanosec * 1e-9;
+    // Images are converted to ROS messages by the image client, so decoding is part of the request stage
+    latency_recorder_->record(source, "acquisition_to_receipt", receipt_seconds - acquisition_seconds);
+    latency_recorder_->record(source, "request", request_duration);
+    latency_recorder_->record(source, "publish", publish_duration);
+  }
+
+  if (++ticks_since_latencies_published_ >= kLatencyPublishTicks) {
+    ticks_since_latencies_published_ = 0;
+    middleware_handle_->publishLatencies(latency_recorder_->toMsg());
+  }
+}
 }  // namespace spot_ros2::images
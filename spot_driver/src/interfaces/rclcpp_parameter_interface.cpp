@@ -22,6 +22,7 @@ constexpr auto kParameterNamePublishRGBImages = "publish_rgb";
 constexpr auto kParameterNamePublishRawRGBCameras = "publish_raw_rgb_cameras";
 constexpr auto kParameterNamePublishDepthImages = "publish_depth";
 constexpr auto kParameterNamePublishDepthRegisteredImages = "publish_depth_registered";
+constexpr auto kParameterNamePublishImageLatencies = "publish_image_latencies";
 constexpr auto kParameterPreferredOdomFrame = "preferred_odom_frame";
 
 /**
@@ -175,6 +176,10 @@ bool RclcppParameterInterface::getPublishDepthRegisteredImages() const {
                                       kDefaultPublishDepthRegisteredImages);
 }
 
+bool RclcppParameterInterface::getPublishImageLatencies() const {
+  return declareAndGetParameter<bool>(node_, kParameterNamePublishImageLatencies, kDefaultPublishImageLatencies);
+}
+
 std::string RclcppParameterInterface::getPreferredOdomFrame() const {
   return declareAndGetParameter<std::string>(node_, kParameterPreferredOdomFrame, kDefaultPreferredOdomFrame);
 }
@@ -32,6 +32,8 @@ class FakeParameterInterface : public ParameterInterfaceBase {
 
   bool getPublishDepthRegisteredImages() const override { return publish_depth_registered_images; }
 
+  bool getPublishImageLatencies() const override { return publish_image_latencies; }
+
   std::string getPreferredOdomFrame() const override { return "odom"; }
 
   std::string getSpotName() const override { return spot_name; }
@@ -46,6 +48,7 @@ class FakeParameterInterface : public ParameterInterfaceBase {
   bool publish_rgb_images = ParameterInterfaceBase::kDefaultPublishRGBImages;
   bool publish_depth_images = ParameterInterfaceBase::kDefaultPublishDepthImages;
   bool publish_depth_registered_images = ParameterInterfaceBase::kDefaultPublishDepthRegisteredImages;
+  bool publish_image_latencies = ParameterInterfaceBase::kDefaultPublishImageLatencies;
   std::string spot_name;
 };
 }  // namespace spot_ros2::test
@@ -0,0 +1,50 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the scheduling of trajectory batches.
+"""
+
+import pytest
+
+from spot_driver.batch_dispatch import BatchDispatchScheduler
+
+
+def test_lead_time_is_the_safety_margin_without_measurements() -> None:
+    scheduler = BatchDispatchScheduler(safety_margin=0.1)
+    assert scheduler.lead_time == pytest.approx(0.1)
+    assert scheduler.send_time(start_time=10.0, need_time=12.0) == pytest.approx(11.9)
+
+
+def test_lead_time_adapts_to_round_trip_times() -> None:
+    scheduler = BatchDispatchScheduler(safety_margin=0.1)
+    scheduler.record_round_trip(0.2)
+    # Half of the round trip time plus four deviations of half of it
+    assert scheduler.lead_time == pytest.approx(0.1 + (0.2 + 4 * 0.1) / 2)
+
+    for _ in range(100):
+        scheduler.record_round_trip(0.02)
+    assert scheduler.lead_time == pytest.approx(0.1 + 0.01, abs=1e-3)
+
+    scheduler.record_round_trip(0.5)
+    assert scheduler.lead_time > 0.2
+
+
+def test_clock_uncertainty_increases_lead_time() -> None:
+    scheduler = BatchDispatchScheduler(safety_margin=0.1)
+    scheduler.record_clock_sync(0.04)
+    assert scheduler.lead_time == pytest.approx(0.12)
+    scheduler.record_clock_sync(None)
+    assert scheduler.lead_time == pytest.approx(0.1)
+
+
+def test_batches_do_not_reach_the_robot_before_their_first_point() -> None:
+    scheduler = BatchDispatchScheduler(safety_margin=1.0)
+    scheduler.record_round_trip(0.2)
+    # With a small overlap, the batch is sent when it reaches the robot at its first point at the earliest.
+    assert scheduler.send_time(start_time=10.0, need_time=10.5) == pytest.approx(9.9)
+
+
+def test_rebased_batches_reach_the_robot_before_their_deadline() -> None:
+    scheduler = BatchDispatchScheduler(safety_margin=0.1)
+    scheduler.record_round_trip(0.2)
+    assert scheduler.send_time_before(10.0) == pytest.approx(10.0 - scheduler.lead_time)
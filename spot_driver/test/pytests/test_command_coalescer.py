@@ -0,0 +1,104 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the sending of the latest of a stream of commands.
+"""
+
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from spot_driver.command_coalescer import CoalescingCommandSender
+from spot_driver.deadline_scheduler import DeadlineScheduler
+
+
+class FakeCommandService:
+    """Records command requests, which are acknowledged by calling ack."""
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[str, Future]] = []
+
+    def request(self, command: str) -> Future:
+        future: Future = Future()
+        self.requests.append((command, future))
+        return future
+
+    def ack(self) -> None:
+        self.requests[-1][1].set_result(None)
+
+
+def wait_until(condition, timeout: float = 1.0) -> bool:  # type: ignore[no-untyped-def]
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+def test_only_the_latest_command_is_sent_after_the_one_in_flight() -> None:
+    service = FakeCommandService()
+    latencies: List[float] = []
+    scheduler = DeadlineScheduler()
+    sender: CoalescingCommandSender[str] = CoalescingCommandSender(
+        service.request, 0.0, scheduler, latency_callback=latencies.append
+    )
+    try:
+        sender.submit("a")
+        sender.submit("b")
+        sender.submit("c")
+        assert [command for command, _ in service.requests] == ["a"]
+
+        service.ack()
+        assert [command for command, _ in service.requests] == ["a", "c"]
+        assert sender.coalesced_count == 1
+        assert len(latencies) == 1
+    finally:
+        scheduler.shutdown()
+
+
+def test_commands_are_rate_limited() -> None:
+    service = FakeCommandService()
+    scheduler = DeadlineScheduler()
+    sender: CoalescingCommandSender[str] = CoalescingCommandSender(service.request, 0.05, scheduler)
+    try:
+        sender.submit("a")
+        service.ack()
+        sender.submit("b")
+        assert len(service.requests) == 1
+        assert wait_until(lambda: len(service.requests) == 2)
+        assert service.requests[-1][0] == "b"
+    finally:
+        scheduler.shutdown()
+
+
+def test_failed_commands_do_not_block_the_next_ones() -> None:
+    service = FakeCommandService()
+    errors: List[Exception] = []
+    scheduler = DeadlineScheduler()
+    sender: CoalescingCommandSender[str] = CoalescingCommandSender(
+        service.request, 0.0, scheduler, error_callback=errors.append
+    )
+    try:
+        sender.submit("a")
+        sender.submit("b")
+        service.requests[-1][1].set_exception(RuntimeError("lease lost"))
+        assert len(errors) == 1
+        assert [command for command, _ in service.requests] == ["a", "b"]
+    finally:
+        scheduler.shutdown()
+
+
+def test_cleared_commands_are_not_sent() -> None:
+    service = FakeCommandService()
+    scheduler = DeadlineScheduler()
+    sender: CoalescingCommandSender[str] = CoalescingCommandSender(service.request, 0.05, scheduler)
+    try:
+        sender.submit("a")
+        sender.submit("b")
+        sender.clear()
+        service.ack()
+        sender.submit("c")
+        sender.clear()
+        time.sleep(0.1)
+        assert [command for command, _ in service.requests] == ["a"]
+    finally:
+        scheduler.shutdown()
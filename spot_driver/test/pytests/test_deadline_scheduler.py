@@ -0,0 +1,48 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the scheduling of callbacks at deadlines.
+"""
+
+import threading
+from typing import List
+
+from spot_driver.deadline_scheduler import DeadlineScheduler
+
+
+def test_callbacks_run_in_deadline_order() -> None:
+    scheduler = DeadlineScheduler()
+    calls: List[str] = []
+    done = threading.Event()
+    try:
+        scheduler.call_later(0.03, lambda: (calls.append("last"), done.set()))
+        scheduler.call_later(0.01, lambda: calls.append("first"))
+        scheduler.call_later(0.02, lambda: calls.append("second"))
+        assert done.wait(1.0)
+    finally:
+        scheduler.shutdown()
+    assert calls == ["first", "second", "last"]
+
+
+def test_cancelled_callbacks_do_not_run() -> None:
+    scheduler = DeadlineScheduler()
+    calls: List[str] = []
+    done = threading.Event()
+    try:
+        scheduler.call_later(0.01, lambda: calls.append("cancelled")).cancel()
+        scheduler.call_later(0.02, done.set)
+        assert done.wait(1.0)
+    finally:
+        scheduler.shutdown()
+    assert calls == []
+
+
+def test_failing_callbacks_do_not_stop_the_scheduler() -> None:
+    scheduler = DeadlineScheduler()
+    done = threading.Event()
+    try:
+        scheduler.call_later(0.0, lambda: 1 / 0)
+        scheduler.call_later(0.01, done.set)
+        assert done.wait(1.0)
+    finally:
+        scheduler.shutdown()
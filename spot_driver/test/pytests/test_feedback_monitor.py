@@ -0,0 +1,143 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the asynchronous command feedback monitor.
+"""
+
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+import pytest
+
+from spot_driver.deadline_scheduler import DeadlineScheduler
+from spot_driver.feedback_monitor import FeedbackMonitor
+
+
+class FakeFeedbackService:
+    """Records feedback requests, which are answered by calling respond."""
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[int, Future]] = []
+
+    def request(self, key: int) -> Future:
+        future: Future = Future()
+        self.requests.append((key, future))
+        return future
+
+    def respond(self, value: str) -> None:
+        self.requests[-1][1].set_result({"header": len(self.requests), "feedback": value})
+
+
+def test_waiting_sends_one_request_at_a_time() -> None:
+    service = FakeFeedbackService()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(service.request, lambda r: r["feedback"], period=0.0)
+    monitor.track(5)
+
+    assert monitor.wait(0, timeout=0.0) == (0, None)
+    assert monitor.wait(0, timeout=0.0) == (0, None)
+    assert [key for key, _ in service.requests] == [5]
+
+    service.respond("processing")
+    assert monitor.wait(0, timeout=0.0) == (1, "processing")
+    assert len(service.requests) == 1
+
+
+def test_version_only_changes_with_feedback() -> None:
+    service = FakeFeedbackService()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(service.request, lambda r: r["feedback"], period=0.0)
+    monitor.track(5)
+
+    monitor.wait(0, timeout=0.0)
+    service.respond("processing")
+    assert monitor.wait(0, timeout=0.0) == (1, "processing")
+
+    # Same feedback with a different header
+    monitor.wait(1, timeout=0.0)
+    service.respond("processing")
+    assert monitor.wait(1, timeout=0.0) == (1, "processing")
+
+    service.respond("done")
+    assert monitor.wait(1, timeout=0.0) == (2, "done")
+
+
+def test_requests_are_rate_limited() -> None:
+    service = FakeFeedbackService()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(service.request, lambda r: r["feedback"], period=10.0)
+    monitor.track(5)
+
+    monitor.wait(0, timeout=0.0)
+    service.respond("processing")
+    assert monitor.wait(1, timeout=0.05) == (1, "processing")
+    assert len(service.requests) == 1
+
+
+def test_responses_for_previous_command_are_ignored() -> None:
+    service = FakeFeedbackService()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(service.request, lambda r: r["feedback"], period=0.0)
+    monitor.track(5)
+    monitor.wait(0, timeout=0.0)
+
+    monitor.track(6)
+    service.respond("stale")
+    assert monitor.wait(0, timeout=0.0) == (0, None)
+    assert [key for key, _ in service.requests] == [5, 6]
+
+
+def test_request_errors_are_raised_by_wait() -> None:
+    service = FakeFeedbackService()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(service.request, lambda r: r["feedback"], period=0.0)
+    monitor.track(5)
+    monitor.wait(0, timeout=0.0)
+
+    service.requests[-1][1].set_exception(RuntimeError("robot unreachable"))
+    with pytest.raises(RuntimeError):
+        monitor.wait(0, timeout=0.0)
+
+
+def test_scheduled_monitor_requests_without_waiters() -> None:
+    service = FakeFeedbackService()
+    scheduler = DeadlineScheduler()
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(
+        service.request, lambda r: r["feedback"], period=0.0, scheduler=scheduler
+    )
+
+    def wait_for_requests(count: int) -> None:
+        deadline = time.monotonic() + 1.0
+        while len(service.requests) < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert len(service.requests) == count
+
+    try:
+        monitor.track(5)
+        wait_for_requests(1)
+        service.respond("done")
+        assert monitor.wait(0, timeout=1.0) == (1, "done")
+
+        # The next request is issued once the response arrives, and stopping ignores its response
+        wait_for_requests(2)
+        monitor.stop()
+        service.respond("stale")
+        time.sleep(0.05)
+        assert len(service.requests) == 2
+        assert monitor.wait(1, timeout=0.0) == (1, "done")
+    finally:
+        scheduler.shutdown()
+
+
+def test_changes_are_passed_to_the_callback() -> None:
+    service = FakeFeedbackService()
+    changes: List[str] = []
+    monitor: FeedbackMonitor[int, str] = FeedbackMonitor(
+        service.request, lambda r: r["feedback"], period=0.0, on_change=changes.append
+    )
+    monitor.track(5)
+
+    monitor.wait(0, timeout=0.0)
+    service.respond("processing")
+    monitor.wait(1, timeout=0.0)
+    service.respond("processing")
+    monitor.wait(1, timeout=0.0)
+    service.respond("done")
+
+    assert changes == ["processing", "done"]
@@ -0,0 +1,179 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the classification of command feedback into goal responses.
+"""
+
+import os
+import timeit
+
+import pytest
+from bosdyn_msgs.msg import (
+    ArmCommandFeedback,
+    FullBodyCommandFeedback,
+    GripperCommandFeedback,
+    ManipulationApiFeedbackResponse,
+    MobilityCommandFeedback,
+    RobotCommandFeedbackStatusStatus,
+)
+
+from spot_driver.feedback_tables import (
+    GoalResponse,
+    classify_arm_feedback,
+    classify_full_body_feedback,
+    classify_gripper_feedback,
+    classify_manipulation_feedback,
+    classify_mobility_feedback,
+)
+
+
+def make_arm_joint_move_feedback(status: int) -> ArmCommandFeedback:
+    feedback = ArmCommandFeedback()
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_PROCESSING
+    feedback.feedback.feedback_choice = feedback.feedback.FEEDBACK_ARM_JOINT_MOVE_FEEDBACK_SET
+    feedback.feedback.arm_joint_move_feedback.status.value = status
+    return feedback
+
+
+def test_command_status_takes_precedence() -> None:
+    feedback = make_arm_joint_move_feedback(
+        ArmCommandFeedback().feedback.arm_joint_move_feedback.status.STATUS_COMPLETE
+    )
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_COMMAND_TIMED_OUT
+    assert classify_arm_feedback(feedback) == (GoalResponse.FAILED, ("warn", "Command has timed out"))
+
+
+def test_feedback_is_classified_by_choice_and_status() -> None:
+    status = ArmCommandFeedback().feedback.arm_joint_move_feedback.status
+    assert classify_arm_feedback(make_arm_joint_move_feedback(status.STATUS_COMPLETE))[0] == GoalResponse.SUCCESS
+    assert classify_arm_feedback(make_arm_joint_move_feedback(status.STATUS_STALLED))[0] == GoalResponse.FAILED
+    assert classify_arm_feedback(make_arm_joint_move_feedback(status.STATUS_IN_PROGRESS))[0] == GoalResponse.IN_PROGRESS
+
+    feedback = FullBodyCommandFeedback()
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_PROCESSING
+    feedback.feedback.feedback_choice = feedback.feedback.FEEDBACK_CONSTRAINED_MANIPULATION_FEEDBACK_SET
+    feedback.feedback.constrained_manipulation_feedback.status.value = -128
+    assert classify_full_body_feedback(feedback) == (GoalResponse.FAILED, None)
+
+    feedback = GripperCommandFeedback()
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_PROCESSING
+    feedback.command.command_choice = feedback.command.COMMAND_CLAW_GRIPPER_FEEDBACK_SET
+    feedback.command.claw_gripper_feedback.status.value = feedback.command.claw_gripper_feedback.status.STATUS_AT_GOAL
+    assert classify_gripper_feedback(feedback) == (GoalResponse.SUCCESS, None)
+
+
+def test_feedback_without_status_is_logged() -> None:
+    feedback = MobilityCommandFeedback()
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_PROCESSING
+    feedback.feedback.feedback_choice = feedback.feedback.FEEDBACK_SE2_VELOCITY_FEEDBACK_SET
+    assert classify_mobility_feedback(feedback) == (
+        GoalResponse.SUCCESS,
+        ("warn", "WARNING: Planar velocity commands provide no feedback"),
+    )
+
+    feedback.feedback.feedback_choice = -128
+    assert classify_mobility_feedback(feedback) == (
+        GoalResponse.IN_PROGRESS,
+        ("error", "ERROR: unknown mobility command type"),
+    )
+
+
+def test_unknown_manipulation_state_raises() -> None:
+    feedback = ManipulationApiFeedbackResponse()
+    feedback.current_state.value = feedback.current_state.MANIP_STATE_PLACE_SUCCEEDED
+    assert classify_manipulation_feedback(feedback) == GoalResponse.SUCCESS
+
+    feedback.current_state.value = -128
+    with pytest.raises(ValueError):
+        classify_manipulation_feedback(feedback)
+
+
+# Benchmarks report timings instead of asserting on them, and only run when SPOT_DRIVER_BENCHMARKS is set
+benchmark = pytest.mark.skipif(not os.environ.get("SPOT_DRIVER_BENCHMARKS"), reason="SPOT_DRIVER_BENCHMARKS not set")
+
+
+def classify_arm_feedback_with_conditions(feedback: ArmCommandFeedback) -> GoalResponse:
+    """Classification of arm feedback by the chains of conditions the tables replaced, without their logs"""
+    status = feedback.status.value
+    if status == RobotCommandFeedbackStatusStatus.STATUS_UNKNOWN:
+        return GoalResponse.IN_PROGRESS
+    if status in (
+        RobotCommandFeedbackStatusStatus.STATUS_COMMAND_OVERRIDDEN,
+        RobotCommandFeedbackStatusStatus.STATUS_COMMAND_TIMED_OUT,
+        RobotCommandFeedbackStatusStatus.STATUS_ROBOT_FROZEN,
+        RobotCommandFeedbackStatusStatus.STATUS_INCOMPATIBLE_HARDWARE,
+    ):
+        return GoalResponse.FAILED
+
+    fb = feedback.feedback
+    choice = fb.feedback_choice
+    if choice == fb.FEEDBACK_ARM_CARTESIAN_FEEDBACK_SET:
+        if (
+            fb.arm_cartesian_feedback.status.value == fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_CANCELLED
+            or fb.arm_cartesian_feedback.status.value == fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_STALLED
+        ):
+            return GoalResponse.FAILED
+        if fb.arm_cartesian_feedback.status.value != fb.arm_cartesian_feedback.status.STATUS_TRAJECTORY_COMPLETE:
+            return GoalResponse.IN_PROGRESS
+    elif choice == fb.FEEDBACK_ARM_JOINT_MOVE_FEEDBACK_SET:
+        if fb.arm_joint_move_feedback.status.value == fb.arm_joint_move_feedback.status.STATUS_STALLED:
+            return GoalResponse.FAILED
+        if fb.arm_joint_move_feedback.status.value != fb.arm_joint_move_feedback.status.STATUS_COMPLETE:
+            return GoalResponse.IN_PROGRESS
+    elif choice == fb.FEEDBACK_NAMED_ARM_POSITION_FEEDBACK_SET:
+        if (
+            fb.named_arm_position_feedback.status.value
+            == fb.named_arm_position_feedback.status.STATUS_STALLED_HOLDING_ITEM
+        ):
+            return GoalResponse.FAILED
+        if fb.named_arm_position_feedback.status.value != fb.named_arm_position_feedback.status.STATUS_COMPLETE:
+            return GoalResponse.IN_PROGRESS
+    elif choice == fb.FEEDBACK_ARM_VELOCITY_FEEDBACK_SET:
+        pass
+    elif choice == fb.FEEDBACK_ARM_GAZE_FEEDBACK_SET:
+        if fb.arm_gaze_feedback.status.value == fb.arm_gaze_feedback.status.STATUS_TOOL_TRAJECTORY_STALLED:
+            return GoalResponse.FAILED
+        if fb.arm_gaze_feedback.status.value != fb.arm_gaze_feedback.status.STATUS_TRAJECTORY_COMPLETE:
+            return GoalResponse.IN_PROGRESS
+    elif choice == fb.FEEDBACK_ARM_STOP_FEEDBACK_SET:
+        pass
+    elif choice == fb.FEEDBACK_ARM_DRAG_FEEDBACK_SET:
+        if fb.arm_drag_feedback.status.value == fb.arm_drag_feedback.status.STATUS_DRAGGING:
+            return GoalResponse.IN_PROGRESS
+        return GoalResponse.FAILED
+    elif choice == fb.FEEDBACK_ARM_IMPEDANCE_FEEDBACK_SET:
+        if (
+            fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_CANCELLED
+            or fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_STALLED
+            or fb.arm_impedance_feedback.status.value == fb.arm_impedance_feedback.status.STATUS_UNKNOWN
+        ):
+            return GoalResponse.FAILED
+        if fb.arm_impedance_feedback.status.value != fb.arm_impedance_feedback.status.STATUS_TRAJECTORY_COMPLETE:
+            return GoalResponse.IN_PROGRESS
+    else:
+        return GoalResponse.IN_PROGRESS
+    return GoalResponse.SUCCESS
+
+
+@benchmark
+@pytest.mark.parametrize("choice", ["FEEDBACK_ARM_JOINT_MOVE_FEEDBACK_SET", "FEEDBACK_ARM_IMPEDANCE_FEEDBACK_SET"])
+def test_classification_benchmark(choice: str) -> None:
+    """
+    Reports the time to classify an arm feedback message with the tables and with the chains of conditions they
+    replaced, for an early and the last branch of the chains. Run with -s to see the report.
+    """
+    feedback = ArmCommandFeedback()
+    feedback.status.value = RobotCommandFeedbackStatusStatus.STATUS_PROCESSING
+    feedback.feedback.feedback_choice = getattr(feedback.feedback, choice)
+    joint_move_status = feedback.feedback.arm_joint_move_feedback.status
+    joint_move_status.value = joint_move_status.STATUS_COMPLETE
+    impedance_status = feedback.feedback.arm_impedance_feedback.status
+    impedance_status.value = impedance_status.STATUS_TRAJECTORY_COMPLETE
+    assert classify_arm_feedback(feedback)[0] == classify_arm_feedback_with_conditions(feedback)
+
+    number = 10000
+    tables = min(timeit.repeat(lambda: classify_arm_feedback(feedback), number=number, repeat=5)) / number
+    conditions = (
+        min(timeit.repeat(lambda: classify_arm_feedback_with_conditions(feedback), number=number, repeat=5)) / number
+    )
+    print(f"\n{choice}: {tables * 1e6:.2f} us per message with tables, {conditions * 1e6:.2f} us with conditions")
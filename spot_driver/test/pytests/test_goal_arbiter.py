@@ -0,0 +1,72 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the arbitration of action goals by robot resources.
+"""
+
+from bosdyn.api import robot_command_pb2
+from bosdyn.client.robot_command import RobotCommandBuilder
+
+from spot_driver.goal_arbiter import GoalArbiter, Resource, resource_stop_command, robot_command_resources
+
+
+def test_robot_command_resources() -> None:
+    assert robot_command_resources(RobotCommandBuilder.claw_gripper_open_command()) == Resource.GRIPPER
+    assert robot_command_resources(RobotCommandBuilder.arm_stow_command()) == Resource.ARM
+    assert robot_command_resources(RobotCommandBuilder.synchro_sit_command()) == Resource.MOBILITY
+    assert robot_command_resources(RobotCommandBuilder.selfright_command()) == Resource.ALL
+    assert robot_command_resources(robot_command_pb2.RobotCommand()) == Resource.ALL
+
+
+def test_goals_on_disjoint_resources_run_concurrently() -> None:
+    arbiter = GoalArbiter()
+    assert arbiter.acquire("walk", Resource.MOBILITY) == []
+    assert arbiter.acquire("grasp", Resource.GRIPPER) == []
+    assert arbiter.resources_to_stop("walk") == Resource.MOBILITY
+
+    assert arbiter.acquire("stow", Resource.ARM | Resource.GRIPPER) == ["grasp"]
+    assert arbiter.acquire("self_right", Resource.ALL) == ["walk", "stow"]
+    assert arbiter.resources_to_stop("self_right") == Resource.ALL
+
+
+def test_preempted_goals_do_not_release_resources_of_others() -> None:
+    arbiter = GoalArbiter()
+    arbiter.acquire("walk", Resource.MOBILITY)
+    arbiter.acquire("turn", Resource.MOBILITY)
+    arbiter.release("walk")
+    assert arbiter.acquire("sit", Resource.MOBILITY) == ["turn"]
+
+
+def test_cancelling_a_goal_while_another_runs_stops_its_resources() -> None:
+    arbiter = GoalArbiter()
+    arbiter.acquire("walk", Resource.MOBILITY)
+    arbiter.acquire("grasp", Resource.GRIPPER)
+
+    stop = resource_stop_command(arbiter.resources_to_stop("walk"))
+
+    # The walk is stopped by a mobility stop, never a stand, which leaves the gripper command executing
+    assert stop is not None
+    assert stop.synchronized_command.mobility_command.HasField("stop_request")
+    assert not stop.synchronized_command.mobility_command.HasField("stand_request")
+    assert not stop.synchronized_command.HasField("gripper_command")
+    assert robot_command_resources(stop) == Resource.MOBILITY
+
+
+def test_stop_commands_by_resources() -> None:
+    assert resource_stop_command(Resource.ALL) == RobotCommandBuilder.stop_command()
+    arm_stop = resource_stop_command(Resource.ARM | Resource.GRIPPER, gripper_open_fraction=0.5)
+    assert arm_stop is not None
+    assert arm_stop.synchronized_command.arm_command.HasField("arm_stop_command")
+    assert arm_stop.synchronized_command.gripper_command.HasField("claw_gripper_command")
+    # The gripper alone cannot be stopped without its current opening, and a preempted goal holds no resources
+    assert resource_stop_command(Resource.GRIPPER) is None
+    assert resource_stop_command(Resource.NONE) is None
+
+
+def test_preempted_goals_have_no_resources_to_stop() -> None:
+    arbiter = GoalArbiter()
+    arbiter.acquire("walk", Resource.MOBILITY)
+    arbiter.acquire("sit", Resource.MOBILITY)
+    arbiter.acquire("grasp", Resource.GRIPPER)
+
+    assert arbiter.resources_to_stop("walk") == Resource.NONE
@@ -0,0 +1,124 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the image decode pipeline.
+"""
+
+import threading
+import time
+from typing import Callable, List, Tuple
+from unittest.mock import MagicMock
+
+import pytest
+
+from spot_driver.image_pipeline import CameraRateScheduler, LatestFramePipeline
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_frames_with_same_key_are_processed_in_order_dropping_stale_ones() -> None:
+    """
+    While a worker is busy with a frame, newer frames for the same key replace each other and only the latest one is
+    processed once the worker is free.
+    """
+    release = threading.Event()
+    processed: List[Tuple[str, int]] = []
+
+    def handler(key: str, frame: int) -> None:
+        if frame == 1:
+            release.wait(timeout=2.0)
+        processed.append((key, frame))
+
+    pipeline: LatestFramePipeline[str, int] = LatestFramePipeline(handler, max_workers=2, logger=MagicMock())
+    try:
+        pipeline.submit("hand", 1)
+        # Wait until the first frame has been picked up by a worker.
+        assert wait_until(lambda: pipeline._pending == {})
+        pipeline.submit("hand", 2)
+        pipeline.submit("hand", 3)
+        release.set()
+
+        assert wait_until(lambda: len(processed) == 2)
+        assert processed == [("hand", 1), ("hand", 3)]
+        assert pipeline.dropped_frames == 1
+    finally:
+        pipeline.shutdown()
+
+
+def test_frames_with_different_keys_are_processed_concurrently() -> None:
+    """
+    A slow camera does not hold back the others.
+    """
+    release = threading.Event()
+    processed: List[str] = []
+
+    def handler(key: str, frame: int) -> None:
+        if key == "back":
+            release.wait(timeout=2.0)
+        processed.append(key)
+
+    pipeline: LatestFramePipeline[str, int] = LatestFramePipeline(handler, max_workers=2, logger=MagicMock())
+    try:
+        pipeline.submit("back", 0)
+        pipeline.submit("hand", 0)
+        assert wait_until(lambda: processed == ["hand"])
+        release.set()
+        assert wait_until(lambda: processed == ["hand", "back"])
+    finally:
+        pipeline.shutdown()
+
+
+def test_handler_exceptions_are_logged() -> None:
+    """
+    An exception raised while processing a frame is logged and does not stop the pipeline.
+    """
+    logger = MagicMock()
+    processed: List[int] = []
+
+    def handler(key: str, frame: int) -> None:
+        if frame == 0:
+            raise RuntimeError("corrupted frame")
+        processed.append(frame)
+
+    pipeline: LatestFramePipeline[str, int] = LatestFramePipeline(handler, max_workers=1, logger=logger)
+    try:
+        pipeline.submit("hand", 0)
+        assert wait_until(lambda: logger.error.called)
+        pipeline.submit("hand", 1)
+        assert wait_until(lambda: processed == [1])
+    finally:
+        pipeline.shutdown()
+
+
+def test_cameras_are_due_at_their_own_rate() -> None:
+    scheduler = CameraRateScheduler({"hand": 10.0, "back": 2.5})
+    assert scheduler.period == pytest.approx(0.1)
+
+    # Ticks with some jitter around the timer period
+    ticks = [0.0, 0.102, 0.198, 0.301, 0.4, 0.499, 0.603, 0.7, 0.801]
+    due = [scheduler.due(now) for now in ticks]
+
+    assert all("hand" in cameras for cameras in due)
+    assert [i for i, cameras in enumerate(due) if "back" in cameras] == [0, 4, 8]
+
+
+def test_late_camera_is_rescheduled_from_now() -> None:
+    scheduler = CameraRateScheduler({"hand": 10.0})
+
+    assert scheduler.due(0.0) == ["hand"]
+    # The timer stalled for a while, the missed ticks are not caught up
+    assert scheduler.due(1.0) == ["hand"]
+    assert scheduler.due(1.02) == []
+    assert scheduler.due(1.1) == ["hand"]
+
+
+def test_camera_rates_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        CameraRateScheduler({"hand": 0.0})
@@ -0,0 +1,62 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the latency histograms of the image pipeline.
+"""
+
+import pytest
+
+from spot_driver.latency_recorder import LatencyHistogram, LatencyRecorder
+
+
+def test_latencies_are_counted_in_their_bucket() -> None:
+    histogram = LatencyHistogram(upper_bounds=[0.01, 0.1])
+
+    for latency in [0.005, 0.01, 0.05, 0.2, 0.3]:
+        histogram.record(latency)
+
+    # Bounds are inclusive, latencies above the last bound go to the extra bucket
+    assert histogram.counts == [2, 1, 2]
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(0.113)
+    assert histogram.max == pytest.approx(0.3)
+
+
+def test_recorder_message_is_sorted_by_source_and_stage() -> None:
+    recorder = LatencyRecorder(upper_bounds=[0.01])
+    recorder.record("depth/hand", "publish", 0.002)
+    recorder.record("camera/hand", "publish", 0.02)
+    recorder.record("camera/hand", "decode", 0.005)
+    recorder.record("camera/hand", "decode", 0.007)
+
+    msg = recorder.to_msg()
+
+    assert [(h.source, h.stage) for h in msg.histograms] == [
+        ("camera/hand", "decode"),
+        ("camera/hand", "publish"),
+        ("depth/hand", "publish"),
+    ]
+    decode = msg.histograms[0]
+    assert list(decode.upper_bounds) == [0.01]
+    assert list(decode.counts) == [2, 0]
+    assert decode.count == 2
+    assert decode.mean == pytest.approx(0.006)
+
+
+def test_recorder_reset_clears_histograms() -> None:
+    recorder = LatencyRecorder()
+    recorder.record("camera/hand", "decode", 0.005)
+
+    recorder.reset()
+
+    assert len(recorder.to_msg().histograms) == 0
+
+
+def test_recorder_message_can_be_taken_with_a_reset() -> None:
+    recorder = LatencyRecorder()
+    recorder.record("camera/hand", "decode", 0.005)
+
+    msg = recorder.to_msg(reset=True)
+
+    assert [histogram.count for histogram in msg.histograms] == [1]
+    assert len(recorder.to_msg().histograms) == 0
@@ -0,0 +1,47 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the local copy of the mobility params.
+"""
+
+import pytest
+from bosdyn.api.spot.robot_command_pb2 import MobilityParams
+
+from spot_driver.mobility_params_cache import MobilityParamsCache
+
+
+def test_updates_store_new_snapshots() -> None:
+    cache = MobilityParamsCache(MobilityParams(stair_hint=True))
+    first = cache.get()
+
+    assert cache.update(lambda params: setattr(params, "locomotion_hint", 2))
+
+    params = cache.get()
+    assert params is not first
+    assert params.stair_hint and params.locomotion_hint == 2
+    # Readers holding the previous snapshot are not affected by the update
+    assert first.locomotion_hint == 0
+
+
+def test_failed_updates_leave_the_cache_unchanged() -> None:
+    cache = MobilityParamsCache()
+
+    def apply(params: MobilityParams) -> None:
+        raise RuntimeError("robot unreachable")
+
+    with pytest.raises(RuntimeError):
+        cache.update(lambda params: setattr(params, "stair_hint", True), apply)
+
+    assert cache.get() == MobilityParams()
+
+
+def test_unchanged_params_are_not_stored() -> None:
+    cache = MobilityParamsCache(MobilityParams(stair_hint=True))
+    first = cache.get()
+    applied = []
+
+    assert not cache.update(lambda params: setattr(params, "stair_hint", True), applied.append)
+
+    assert cache.get() is first
+    # The params are still applied, e.g. to the wrapper, which may not hold them yet
+    assert len(applied) == 1
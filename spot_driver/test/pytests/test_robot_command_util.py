@@ -6,7 +6,7 @@ Tests to check trajectory batching in robot commands.
 
 import math
 import time
-from typing import Callable, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import pytest
 from bosdyn.api import (
@@ -21,7 +21,17 @@ from bosdyn.api import (
 from bosdyn.client.math_helpers import Quat, SE2Pose, SE2Velocity, SE3Pose, SE3Velocity
 from bosdyn.util import seconds_to_duration, seconds_to_timestamp
 
-from spot_driver.robot_command_util import batch_command, get_batch_size, min_time_since_reference
+from spot_driver.robot_command_util import (
+    CommandBatch,
+    TrajectoryStream,
+    batch_command,
+    get_batch_size,
+    get_reference_time,
+    iter_batch_command,
+    min_time_since_reference,
+    se2_goal_error,
+    should_batch,
+)
 
 ContinuousTrajectory1D = Callable[[float], float]
 ContinuousTrajectory2D = Callable[[float], Tuple[SE2Pose, SE2Velocity]]
@@ -459,3 +469,175 @@ def test_batch_execution_time() -> None:
     assert min_time_since_reference(commands[2]) == pytest.approx(
         ramp_up_time + 2 * (batch_size - overlapping) * time_sample
     )
+
+
+def test_batches_are_generated_lazily() -> None:
+    """
+    Batches are generated one at a time, preserve the fields of the command
+    that are not trajectory points, and leave the command untouched.
+    """
+    hand_trajectory: trajectory_pb2.SE3Trajectory = arm_discrete_trajectory(
+        reference_time=time.time(), ramp_up_time=0, duration=5, dt=0.1, trajectory_function=arm_continuous_trajectory
+    )
+    command = build_test_command(hand_trajectory=hand_trajectory)
+    original_command = robot_command_pb2.RobotCommand()
+    original_command.CopyFrom(command)
+
+    batches = iter_batch_command(command=command, batch_size=20, overlapping=4)
+    first_batch = next(batches)
+    assert first_batch.start_time == pytest.approx(0.0)
+    assert first_batch.end_time == pytest.approx(1.9)
+    arm_cartesian_command = first_batch.command.synchronized_command.arm_command.arm_cartesian_command
+    assert arm_cartesian_command.root_frame_name == "body"
+    assert arm_cartesian_command.pose_trajectory_in_task.reference_time == hand_trajectory.reference_time
+    assert list(arm_cartesian_command.pose_trajectory_in_task.points) == list(hand_trajectory.points[0:20])
+
+    remaining_batches = list(batches)
+    assert len(remaining_batches) == 2
+    for batch, start in zip(remaining_batches, (16, 32)):
+        points = batch.command.synchronized_command.arm_command.arm_cartesian_command.pose_trajectory_in_task.points
+        assert list(points) == list(hand_trajectory.points[start : start + 20])
+        assert batch.start_time == pytest.approx(min_time_since_reference(batch.command))
+        assert batch.end_time == pytest.approx(
+            points[-1].time_since_reference.seconds + 1e-9 * points[-1].time_since_reference.nanos
+        )
+    assert get_reference_time(command) == pytest.approx(hand_trajectory.reference_time.ToNanoseconds() * 1e-9)
+    assert command == original_command
+
+
+def test_trajectories_aligned_within_tolerance() -> None:
+    """
+    Trajectories whose points are a few nanoseconds apart are only aligned
+    if the difference is within the tolerance.
+    """
+    hand_trajectory: trajectory_pb2.SE3Trajectory = arm_discrete_trajectory(
+        reference_time=time.time(), ramp_up_time=0, duration=5, dt=0.1, trajectory_function=arm_continuous_trajectory
+    )
+    mobility_trajectory: trajectory_pb2.SE2Trajectory = mobility_discrete_trajectory(
+        reference_time=time.time(),
+        ramp_up_time=0,
+        duration=5,
+        dt=0.1,
+        trajectory_function=mobility_continuous_trajectory,
+    )
+    mobility_trajectory.points[10].time_since_reference.nanos += 3
+
+    command = build_test_command(hand_trajectory=hand_trajectory, mobility_trajectory=mobility_trajectory)
+
+    assert not should_batch(command, batch_size=20)
+    assert not should_batch(command, batch_size=20, tolerance=2e-9)
+    assert should_batch(command, batch_size=20, tolerance=1e-6)
+    assert len(batch_command(command=command, batch_size=20, overlapping=4, tolerance=1e-6)) == 3
+
+
+def test_joint_and_gripper_batches_are_rebased() -> None:
+    """
+    The reference time of arm joint and gripper batches is moved to their
+    first point, without changing the time of any point.
+    """
+    reference_time = time.time()
+    gripper_trajectory: trajectory_pb2.ScalarTrajectory = gripper_discrete_trajectory(
+        reference_time=reference_time,
+        ramp_up_time=4,
+        duration=5,
+        dt=0.1,
+        trajectory_function=gripper_continuous_trajectory,
+    )
+    arm_joint_trajectory = arm_command_pb2.ArmJointTrajectory()
+    arm_joint_trajectory.reference_time.CopyFrom(gripper_trajectory.reference_time)
+    for gripper_point in gripper_trajectory.points:
+        point = arm_joint_trajectory.points.add()
+        point.position.sh0.value = gripper_point.point
+        point.time_since_reference.CopyFrom(gripper_point.time_since_reference)
+
+    command = build_test_command(gripper_trajectory=gripper_trajectory)
+    command.synchronized_command.arm_command.arm_joint_move_command.trajectory.CopyFrom(arm_joint_trajectory)
+
+    batches = list(iter_batch_command(command=command, batch_size=20, overlapping=4))
+    assert len(batches) == 3
+
+    reference_nsec = gripper_trajectory.reference_time.ToNanoseconds()
+    for batch, start in zip(batches, (0, 16, 32)):
+        assert batch.rebased
+        assert batch.start_time == pytest.approx(4 + start * 0.1)
+        synchronized_command = batch.command.synchronized_command
+        for trajectory, original_points in (
+            (synchronized_command.gripper_command.claw_gripper_command.trajectory, gripper_trajectory.points),
+            (synchronized_command.arm_command.arm_joint_move_command.trajectory, arm_joint_trajectory.points),
+        ):
+            start_nsec = original_points[start].time_since_reference.ToNanoseconds()
+            assert trajectory.reference_time.ToNanoseconds() == reference_nsec + start_nsec
+            assert trajectory.points[0].time_since_reference.ToNanoseconds() == 0
+            for point, original_point in zip(trajectory.points, original_points[start : start + 20]):
+                assert (
+                    trajectory.reference_time.ToNanoseconds() + point.time_since_reference.ToNanoseconds()
+                    == reference_nsec + original_point.time_since_reference.ToNanoseconds()
+                )
+        assert min_time_since_reference(batch.command) == 0.0
+
+
+def test_streamed_trajectories_are_batched() -> None:
+    """
+    Points streamed in chunks are sent in overlapping batches as soon as a
+    batch is full, or earlier when flushed.
+    """
+    hand_trajectory: trajectory_pb2.SE3Trajectory = arm_discrete_trajectory(
+        reference_time=time.time(), ramp_up_time=0, duration=5, dt=0.1, trajectory_function=arm_continuous_trajectory
+    )
+
+    def chunk(start: int, end: int) -> robot_command_pb2.RobotCommand:
+        chunk_trajectory = trajectory_pb2.SE3Trajectory()
+        chunk_trajectory.CopyFrom(hand_trajectory)
+        del chunk_trajectory.points[end:]
+        del chunk_trajectory.points[:start]
+        return build_test_command(hand_trajectory=chunk_trajectory)
+
+    def points(batch: CommandBatch) -> List[trajectory_pb2.SE3TrajectoryPoint]:
+        return list(batch.command.synchronized_command.arm_command.arm_cartesian_command.pose_trajectory_in_task.points)
+
+    stream = TrajectoryStream(chunk(0, 10), batch_size=20, overlapping=4)
+    assert stream.pending_points == 10
+    assert stream.take_batch() is None
+
+    stream.append(chunk(10, 30))
+    batch = stream.take_batch()
+    assert batch is not None
+    assert points(batch) == list(hand_trajectory.points[0:20])
+    assert batch.start_time == pytest.approx(0.0)
+    assert batch.end_time == pytest.approx(1.9)
+    assert stream.pending_points == 10
+
+    # Not enough points for a full batch, unless the robot is about to run out of points
+    assert stream.take_batch() is None
+    batch = stream.take_batch(flush=True)
+    assert batch is not None
+    assert points(batch) == list(hand_trajectory.points[16:30])
+    assert stream.pending_points == 0
+    assert stream.take_batch(flush=True) is None
+
+    with pytest.raises(ValueError):
+        stream.append(chunk(20, 40))
+
+    stream.append(chunk(30, 51), last=True)
+    assert stream.finished
+    batch = stream.take_batch()
+    assert batch is not None
+    assert points(batch) == list(hand_trajectory.points[26:46])
+    batch = stream.take_batch()
+    assert batch is not None
+    assert points(batch) == list(hand_trajectory.points[42:51])
+    assert stream.take_batch() is None
+
+    with pytest.raises(ValueError):
+        stream.append(chunk(51, 51))
+
+
+def test_se2_goal_error_is_expressed_in_the_body_frame() -> None:
+    odom_tform_body = SE2Pose(1.0, 2.0, math.pi / 2)
+    odom_tform_goal = SE2Pose(1.0, 3.0, -math.pi * 0.9)
+
+    distance, heading_error = se2_goal_error(odom_tform_body, odom_tform_goal)
+
+    assert distance == pytest.approx(1.0)
+    # The shortest rotation from the body to the goal heading is wrapped to [-pi, pi]
+    assert heading_error == pytest.approx(math.pi * 0.6)
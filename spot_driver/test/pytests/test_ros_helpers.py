@@ -0,0 +1,254 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the conversions of Spot images into ROS messages.
+"""
+
+# We disable Pylint warnings for all Protobuf files which contain objects with
+# dynamically added member attributes.
+# pylint: disable=no-member
+
+import array
+import os
+import timeit
+
+import cv2
+import numpy as np
+import pytest
+from bosdyn.api import image_pb2
+from builtin_interfaces.msg import Time
+from google.protobuf.timestamp_pb2 import Timestamp
+from sensor_msgs.msg import Image
+
+from spot_driver.ros_helpers import (
+    CameraInfoCache,
+    ImageMessagePool,
+    bosdyn_data_to_compressed_image_msg,
+    bosdyn_data_to_image_and_camera_info_msgs,
+    bosdyn_data_to_preview_image_msg,
+    raw_image_data_to_array,
+)
+
+
+def make_image_response(
+    source_name: str = "hand_depth", rows: int = 4, cols: int = 6, focal_length: float = 100.0
+) -> image_pb2.ImageResponse:
+    response = image_pb2.ImageResponse()
+    response.source.name = source_name
+    response.source.pinhole.intrinsics.focal_length.x = focal_length
+    response.source.pinhole.intrinsics.focal_length.y = focal_length + 1.0
+    response.source.pinhole.intrinsics.principal_point.x = cols / 2.0
+    response.source.pinhole.intrinsics.principal_point.y = rows / 2.0
+    response.shot.frame_name_image_sensor = "hand_depth_sensor"
+    response.shot.acquisition_time.seconds = 10
+    response.shot.image.rows = rows
+    response.shot.image.cols = cols
+    response.shot.image.format = image_pb2.Image.FORMAT_RAW
+    response.shot.image.pixel_format = image_pb2.Image.PIXEL_FORMAT_DEPTH_U16
+    response.shot.image.data = bytes(2 * rows * cols)
+    return response
+
+
+def test_camera_info_is_built_from_intrinsics() -> None:
+    _, camera_info = bosdyn_data_to_image_and_camera_info_msgs(make_image_response(), lambda t: t, "spot/")
+
+    assert camera_info.header.stamp.sec == 10
+    assert camera_info.header.frame_id == "spot/hand_depth_sensor"
+    assert camera_info.height == 4
+    assert camera_info.width == 6
+    assert camera_info.distortion_model == "plumb_bob"
+    assert list(camera_info.d) == [0.0] * 5
+    assert list(camera_info.k) == [100.0, 0.0, 3.0, 0.0, 101.0, 2.0, 0.0, 0.0, 1.0]
+    assert list(camera_info.r) == [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+    assert list(camera_info.p) == [100.0, 0.0, 3.0, 0.0, 0.0, 101.0, 2.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+
+
+def test_camera_info_cache_only_updates_header() -> None:
+    cache = CameraInfoCache()
+    response = make_image_response()
+
+    first = cache.get(response, Time(sec=1), "frame")
+    second = cache.get(response, Time(sec=2), "frame")
+
+    assert second is first
+    assert second.header.stamp.sec == 2
+
+
+def test_camera_info_cache_is_rebuilt_when_intrinsics_change() -> None:
+    cache = CameraInfoCache()
+
+    first = cache.get(make_image_response(focal_length=100.0), Time(sec=1), "frame")
+    second = cache.get(make_image_response(focal_length=200.0), Time(sec=2), "frame")
+    third = cache.get(make_image_response(rows=8, focal_length=200.0), Time(sec=3), "frame")
+
+    assert second is not first
+    assert second.k[0] == 200.0
+    assert third is not second
+    assert third.height == 8
+
+
+def test_camera_info_cache_is_keyed_by_image_source() -> None:
+    cache = CameraInfoCache()
+
+    hand = cache.get(make_image_response(source_name="hand_depth"), Time(sec=1), "hand")
+    back = cache.get(make_image_response(source_name="back_depth"), Time(sec=1), "back")
+
+    assert hand is not back
+    assert hand.header.frame_id == "hand"
+    assert back.header.frame_id == "back"
+
+
+def test_local_time_is_used_for_stamps() -> None:
+    def robot_to_local_time(timestamp: Timestamp) -> Timestamp:
+        return Timestamp(seconds=timestamp.seconds + 5, nanos=timestamp.nanos)
+
+    image, camera_info = bosdyn_data_to_image_and_camera_info_msgs(make_image_response(), robot_to_local_time, "")
+
+    assert image.header.stamp.sec == 15
+    assert camera_info.header.stamp.sec == 15
+
+
+def test_compressed_image_passes_jpeg_data_through() -> None:
+    response = make_image_response(source_name="frontleft_fisheye_image")
+    response.shot.image.format = image_pb2.Image.FORMAT_JPEG
+    response.shot.image.data = b"\xff\xd8 not decoded \xff\xd9"
+
+    image = bosdyn_data_to_compressed_image_msg(response, lambda t: t, "spot/")
+
+    assert image.format == "jpeg"
+    assert bytes(image.data) == response.shot.image.data
+    assert image.header.stamp.sec == 10
+    assert image.header.frame_id == "spot/hand_depth_sensor"
+
+
+def test_compressed_image_requires_jpeg_data() -> None:
+    with pytest.raises(ValueError):
+        bosdyn_data_to_compressed_image_msg(make_image_response(), lambda t: t, "")
+
+
+@pytest.mark.parametrize(
+    "pixel_format, rows, cols, bytes_per_pixel",
+    [
+        (image_pb2.Image.PIXEL_FORMAT_DEPTH_U16, 480, 640, 2),
+        (image_pb2.Image.PIXEL_FORMAT_RGB_U8, 1080, 1920, 3),
+    ],
+)
+def test_raw_image_data_is_copied_once(pixel_format: int, rows: int, cols: int, bytes_per_pixel: int) -> None:
+    response = make_image_response(rows=rows, cols=cols)
+    response.shot.image.pixel_format = pixel_format
+    response.shot.image.data = bytes(range(256)) * (rows * cols * bytes_per_pixel // 256)
+
+    image_data = raw_image_data_to_array(response.shot.image.data)
+    assert isinstance(image_data, array.array) and image_data.typecode == "B"
+    assert image_data.tobytes() == response.shot.image.data
+
+    image, _ = bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "")
+    assert image.step == bytes_per_pixel * cols
+    assert isinstance(image.data, array.array)
+    assert image.data.tobytes() == response.shot.image.data
+
+
+# Benchmarks report timings instead of asserting on them, and only run when SPOT_DRIVER_BENCHMARKS is set
+benchmark = pytest.mark.skipif(not os.environ.get("SPOT_DRIVER_BENCHMARKS"), reason="SPOT_DRIVER_BENCHMARKS not set")
+
+
+@benchmark
+@pytest.mark.parametrize(
+    "pixel_format, rows, cols, bytes_per_pixel",
+    [
+        (image_pb2.Image.PIXEL_FORMAT_DEPTH_U16, 480, 640, 2),
+        (image_pb2.Image.PIXEL_FORMAT_RGB_U8, 1080, 1920, 3),
+    ],
+)
+def test_raw_image_data_copy_benchmark(pixel_format: int, rows: int, cols: int, bytes_per_pixel: int) -> None:
+    """
+    Reports the time to fill an Image message with raw data, by assigning the protobuf bytes as done before and by
+    assigning them as an array. Run with -s to see the report.
+    """
+    response = make_image_response(rows=rows, cols=cols)
+    response.shot.image.pixel_format = pixel_format
+    response.shot.image.data = bytes(range(256)) * (rows * cols * bytes_per_pixel // 256)
+
+    def assign_bytes() -> None:
+        Image().data = response.shot.image.data
+
+    def assign_array() -> None:
+        Image().data = raw_image_data_to_array(response.shot.image.data)
+
+    before = min(timeit.repeat(assign_bytes, number=1, repeat=5))
+    after = min(timeit.repeat(assign_array, number=1, repeat=5))
+    print(f"\n{cols}x{rows} {bytes_per_pixel * 8} bit frame: {before * 1e3:.2f} ms before, {after * 1e3:.2f} ms after")
+
+
+def test_image_message_pool_reuses_returned_messages() -> None:
+    pool = ImageMessagePool(2)
+
+    with pool.borrow() as first:
+        with pool.borrow() as second:
+            assert second is not first
+            with pool.borrow() as third:
+                # All messages are borrowed, a new one is allocated
+                assert third is not first and third is not second
+    with pool.borrow() as fourth:
+        assert fourth is first
+
+
+def test_pooled_image_message_is_refilled_in_place() -> None:
+    image_msg = Image()
+    response = make_image_response()
+
+    response.shot.image.data = bytes([1]) * len(response.shot.image.data)
+    first, _ = bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "", image_msg)
+    data = first.data
+    response.shot.image.data = bytes([2]) * len(response.shot.image.data)
+    second, _ = bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "", image_msg)
+
+    assert first is image_msg and second is image_msg
+    assert second.data is data
+    assert second.data.tobytes() == response.shot.image.data
+
+
+def test_pooled_image_message_is_cleared_for_unknown_pixel_formats() -> None:
+    image_msg = Image()
+    response = make_image_response()
+    bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "", image_msg)
+
+    response.shot.image.pixel_format = image_pb2.Image.PIXEL_FORMAT_UNKNOWN
+    image, _ = bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "", image_msg)
+
+    assert image is image_msg
+    assert image.encoding == "" and image.step == 0 and len(image.data) == 0
+
+
+def test_unknown_image_formats_are_rejected() -> None:
+    response = make_image_response()
+    response.shot.image.format = image_pb2.Image.FORMAT_RLE
+    with pytest.raises(ValueError):
+        bosdyn_data_to_image_and_camera_info_msgs(response, lambda t: t, "", Image())
+
+
+@pytest.mark.parametrize(
+    "pixel_format, encoding",
+    [(image_pb2.Image.PIXEL_FORMAT_RGB_U8, "bgr8"), (image_pb2.Image.PIXEL_FORMAT_GREYSCALE_U8, "mono8")],
+)
+def test_preview_image_is_decoded_at_reduced_resolution(pixel_format: int, encoding: str) -> None:
+    response = make_image_response(rows=48, cols=64)
+    response.shot.image.format = image_pb2.Image.FORMAT_JPEG
+    response.shot.image.pixel_format = pixel_format
+    _, jpeg = cv2.imencode(".jpg", np.zeros((48, 64, 3), dtype=np.uint8))
+    response.shot.image.data = jpeg.tobytes()
+
+    image = bosdyn_data_to_preview_image_msg(response, lambda t: t, "spot/", 4)
+
+    assert (image.width, image.height) == (16, 12)
+    assert image.encoding == encoding
+    assert image.header.stamp.sec == 10
+    assert image.header.frame_id == "spot/hand_depth_sensor"
+
+
+def test_preview_image_requires_valid_scale() -> None:
+    response = make_image_response()
+    response.shot.image.format = image_pb2.Image.FORMAT_JPEG
+
+    with pytest.raises(ValueError):
+        bosdyn_data_to_preview_image_msg(response, lambda t: t, "", 3)
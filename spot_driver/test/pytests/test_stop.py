@@ -8,12 +8,18 @@ Test for the Stop command.
 # dynamically added member attributes.
 # pylint: disable=no-member
 
+import threading
+from concurrent.futures import Future
+from typing import Any
+
 import pytest
 from bdai_ros2_wrappers.futures import wait_for_future
 from bdai_ros2_wrappers.scope import ROSAwareScope
 from bosdyn.api.robot_command_pb2 import RobotCommandResponse
+from geometry_msgs.msg import Twist
 from std_srvs.srv import Trigger
 
+from spot_driver.spot_ros2 import SpotROS
 from spot_wrapper.testing.fixtures import SpotFixture
 
 
@@ -76,3 +82,99 @@ def test_stop_failed(ros: ROSAwareScope, simple_spot: SpotFixture) -> None:
     assert wait_for_future(future, timeout_sec=2.0)
     response = future.result()
     assert not response.success
+
+
+@pytest.mark.usefixtures("spot_node")
+def test_stop_while_motion_service_is_blocked(ros: ROSAwareScope, simple_spot: SpotFixture) -> None:
+    """
+    Test that a stop reaches the robot while a motion service, here "sit", is blocked waiting for the robot and holds
+    the motion callback group.
+
+    Args:
+        ros: A ROS2 scope that can be used to create clients.
+        simple_spot: a programmable fake Spot robot running on a local
+            GRPC server.
+    """
+
+    # Send a sit request and leave its robot command unanswered.
+    sit_client = ros.node.create_client(Trigger, "sit")
+    sit_future = sit_client.call_async(Trigger.Request())
+    sit_call = simple_spot.api.RobotCommand.serve(timeout=2.0)
+    assert sit_call is not None
+
+    # Send a stop request while sit is blocked.
+    stop_client = ros.node.create_client(Trigger, "stop")
+    stop_future = stop_client.call_async(Trigger.Request())
+
+    # The stop command reaches the robot before sit completes.
+    stop_call = simple_spot.api.RobotCommand.serve(timeout=0.5)
+    assert stop_call is not None
+    assert not sit_future.done()
+    response = RobotCommandResponse()
+    response.status = RobotCommandResponse.Status.STATUS_OK
+    stop_call.returns(response)
+    assert wait_for_future(stop_future, timeout_sec=2.0)
+    assert stop_future.result().success
+
+    # Unblock sit.
+    response = RobotCommandResponse()
+    response.status = RobotCommandResponse.Status.STATUS_OK
+    sit_call.returns(response)
+    assert wait_for_future(sit_future, timeout_sec=2.0)
+    assert sit_future.result().success
+
+
+def test_stop_drops_velocity_commands_waiting_for_the_worker(
+    ros: ROSAwareScope, spot_node: SpotROS, simple_spot: SpotFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a velocity command handed to the blocked cmd_vel worker before a stop is dropped instead of being sent
+    after the stop once the worker is unblocked.
+
+    Args:
+        ros: A ROS2 scope that can be used to create clients.
+        spot_node: The Spot driver node under test.
+        simple_spot: a programmable fake Spot robot running on a local
+            GRPC server.
+        monkeypatch: Fixture used to observe the submissions to the cmd_vel worker.
+    """
+
+    # Block the cmd_vel worker and observe the velocity commands submitted to it.
+    release = threading.Event()
+    spot_node.cmd_vel_worker.submit(release.wait)
+    submitted = threading.Event()
+    submit = spot_node.cmd_vel_worker.submit
+
+    def submit_and_notify(*args: Any, **kwargs: Any) -> Future:
+        future = submit(*args, **kwargs)
+        submitted.set()
+        return future
+
+    monkeypatch.setattr(spot_node.cmd_vel_worker, "submit", submit_and_notify)
+
+    try:
+        # Publish a twist until it reaches the worker queue.
+        publisher = ros.node.create_publisher(Twist, "cmd_vel", 1)
+        twist = Twist()
+        twist.linear.x = 0.5
+        for _ in range(20):
+            publisher.publish(twist)
+            if submitted.wait(timeout=0.1):
+                break
+        assert submitted.is_set()
+
+        # Stop the robot while the twist waits for the worker.
+        stop_client = ros.node.create_client(Trigger, "stop")
+        stop_future = stop_client.call_async(Trigger.Request())
+        stop_call = simple_spot.api.RobotCommand.serve(timeout=2.0)
+        assert stop_call is not None
+        response = RobotCommandResponse()
+        response.status = RobotCommandResponse.Status.STATUS_OK
+        stop_call.returns(response)
+        assert wait_for_future(stop_future, timeout_sec=2.0)
+        assert stop_future.result().success
+    finally:
+        release.set()
+
+    # The twist is not sent after the stop.
+    assert simple_spot.api.RobotCommand.serve(timeout=0.5) is None
@@ -0,0 +1,72 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Tests for the dispatching of stops on a dedicated thread.
+"""
+
+import threading
+from typing import List, Tuple
+
+from spot_driver.stop_dispatcher import StopDispatcher, StopKind
+
+
+def test_stops_run_on_the_dispatcher_thread_and_record_latencies() -> None:
+    latencies: List[Tuple[str, str, float]] = []
+    handler_threads: List[str] = []
+
+    def stop() -> Tuple[bool, str]:
+        handler_threads.append(threading.current_thread().name)
+        return True, "Stopped"
+
+    dispatcher = StopDispatcher({StopKind.STOP: stop}, lambda *args: latencies.append(args))
+    try:
+        assert dispatcher.dispatch(StopKind.STOP).result(timeout=1.0) == (True, "Stopped")
+    finally:
+        dispatcher.shutdown()
+
+    assert handler_threads == ["stop_dispatcher"]
+    assert [(name, stage) for name, stage, _ in latencies] == [("stop", "dispatch"), ("stop", "complete")]
+
+
+def test_pending_stops_are_dispatched_by_priority() -> None:
+    dispatched: List[StopKind] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def stop() -> Tuple[bool, str]:
+        started.set()
+        release.wait(1.0)
+        dispatched.append(StopKind.STOP)
+        return True, "Stopped"
+
+    def estop_hard() -> Tuple[bool, str]:
+        dispatched.append(StopKind.ESTOP_HARD)
+        return True, "Estopped"
+
+    dispatcher = StopDispatcher(
+        {StopKind.STOP: stop, StopKind.ESTOP_GENTLE: lambda: (True, "Gentle"), StopKind.ESTOP_HARD: estop_hard}
+    )
+    try:
+        first = dispatcher.dispatch(StopKind.STOP)
+        started.wait(1.0)
+        second = dispatcher.dispatch(StopKind.STOP)
+        hard = dispatcher.dispatch(StopKind.ESTOP_HARD)
+        release.set()
+        assert first.result(timeout=1.0) == (True, "Stopped")
+        assert hard.result(timeout=1.0) == (True, "Estopped")
+        assert second.result(timeout=1.0) == (True, "Stopped")
+    finally:
+        dispatcher.shutdown()
+
+    assert dispatched == [StopKind.STOP, StopKind.ESTOP_HARD, StopKind.STOP]
+
+
+def test_handler_errors_are_raised_by_the_result() -> None:
+    def stop() -> Tuple[bool, str]:
+        raise RuntimeError("robot unreachable")
+
+    dispatcher = StopDispatcher({StopKind.STOP: stop})
+    try:
+        assert isinstance(dispatcher.dispatch(StopKind.STOP).exception(timeout=1.0), RuntimeError)
+    finally:
+        dispatcher.shutdown()
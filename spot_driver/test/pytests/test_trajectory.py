@@ -0,0 +1,46 @@
+# Copyright (c) 2024 Boston Dynamics AI Institute LLC. See LICENSE file for more info.
+
+"""
+Test for the Trajectory action.
+"""
+
+import pytest
+from bdai_ros2_wrappers.futures import wait_for_future
+from bdai_ros2_wrappers.scope import ROSAwareScope
+from rclpy.action import ActionClient
+
+from spot_driver.spot_ros2 import SpotROS
+from spot_msgs.action import Trajectory  # type: ignore
+from spot_wrapper.wrapper import SpotWrapper
+
+
+def test_trajectory_without_robot_state(
+    ros: ROSAwareScope, spot_node: SpotROS, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a trajectory goal is aborted with a message, instead of failing without a result, when no robot state
+    has been received yet.
+
+    Args:
+        ros: A ROS2 scope that can be used to create clients.
+        spot_node: The Spot driver node.
+        monkeypatch: Fixture hiding the robot state of the wrapper.
+    """
+    monkeypatch.setattr(SpotWrapper, "robot_state", property(lambda _: None))
+
+    # Send a ROS goal.
+    action_client = ActionClient(ros.node, Trajectory, "trajectory")
+    goal = Trajectory.Goal()
+    goal.target_pose.header.frame_id = "body"
+    goal.target_pose.pose.orientation.w = 1.0
+    goal.duration.sec = 1
+    future = action_client.send_goal_async(goal)
+    assert wait_for_future(future, timeout_sec=2.0)
+    goal_handle = future.result()
+
+    # Query and wait for the action result.
+    result_future = goal_handle.get_result_async()
+    assert wait_for_future(result_future, timeout_sec=2.0)
+    action_result = result_future.result()
+    assert not action_result.result.success
+    assert action_result.result.message == "No robot state received yet, cannot locate the robot"
@@ -0,0 +1,81 @@
+// Copyright (c) 2024 Boston Dynamics AI Institute LLC. All rights reserved.
+
+#include <gmock/gmock.h>
+
+#include <spot_driver/images/image_latency_recorder.hpp>
+
+namespace {
+using ::testing::DoubleEq;
+using ::testing::ElementsAre;
+using ::testing::IsEmpty;
+using ::testing::SizeIs;
+using ::testing::StrEq;
+}  // namespace
+
+namespace spot_ros2::images::test {
+TEST(LatencyHistogram, CountsLatenciesInTheirBucket) {
+  // GIVEN a histogram with two buckets and an overflow bucket
+  LatencyHistogram histogram{{0.01, 0.1}};
+
+  // WHEN latencies are recorded
+  for (const auto latency : {0.005, 0.01, 0.05, 0.2, 0.3}) {
+    histogram.record(latency);
+  }
+
+  // THEN bounds are inclusive, latencies above the last bound are counted in the overflow bucket
+  const auto msg = histogram.toMsg("camera/hand", "request");
+  EXPECT_THAT(msg.source, StrEq("camera/hand"));
+  EXPECT_THAT(msg.stage, StrEq("request"));
+  EXPECT_THAT(msg.upper_bounds, ElementsAre(0.01, 0.1));
+  EXPECT_THAT(msg.counts, ElementsAre(2, 1, 2));
+  EXPECT_EQ(msg.count, 5U);
+  EXPECT_THAT(msg.mean, DoubleEq(0.113));
+  EXPECT_THAT(msg.max, DoubleEq(0.3));
+}
+
+TEST(ImageLatencyRecorder, HistogramsAreSortedBySourceAndStage) {
+  // GIVEN latencies recorded for multiple sources and stages
+  ImageLatencyRecorder recorder;
+  recorder.record("depth/hand", "publish", 0.002);
+  recorder.record("camera/hand", "publish", 0.02);
+  recorder.record("camera/hand", "request", 0.005);
+  recorder.record("camera/hand", "request", 0.007);
+
+  // WHEN the recorder is converted to a message
+  const auto msg = recorder.toMsg();
+
+  // THEN there is one histogram per source and stage, sorted by source and stage
+  ASSERT_THAT(msg.histograms, SizeIs(3));
+  EXPECT_THAT(msg.histograms.at(0).source, StrEq("camera/hand"));
+  EXPECT_THAT(msg.histograms.at(0).stage, StrEq("publish"));
+  EXPECT_THAT(msg.histograms.at(1).stage, StrEq("request"));
+  EXPECT_EQ(msg.histograms.at(1).count, 2U);
+  EXPECT_THAT(msg.histograms.at(2).source, StrEq("depth/hand"));
+}
+
+TEST(ImageLatencyRecorder, ResetClearsHistograms) {
+  // GIVEN a recorder with a latency recorded
+  ImageLatencyRecorder recorder;
+  recorder.record("camera/hand", "request", 0.005);
+
+  // WHEN the recorder is reset
+  recorder.reset();
+
+  // THEN there are no histograms left
+  EXPECT_THAT(recorder.toMsg().histograms, IsEmpty());
+}
+
+TEST(ImageLatencyRecorder, TakeMsgReturnsHistogramsBeforeReset) {
+  // GIVEN a recorder with a latency recorded
+  ImageLatencyRecorder recorder;
+  recorder.record("camera/hand", "request", 0.005);
+
+  // WHEN the histograms are taken with a reset
+  const auto msg = recorder.takeMsg(true);
+
+  // THEN the message holds the latency and there are no histograms left
+  ASSERT_THAT(msg.histograms, SizeIs(1));
+  EXPECT_EQ(msg.histograms.at(0).count, 1U);
+  EXPECT_THAT(recorder.toMsg().histograms, IsEmpty());
+}
+}  // namespace spot_ros2::images::test
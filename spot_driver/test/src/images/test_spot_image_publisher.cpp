@@ -31,6 +31,9 @@ class MockMiddlewareHandle : public images::SpotImagePublisher::MiddlewareHandle
   MOCK_METHOD(void, createPublishers, (const std::set<ImageSource>& image_sources), (override));
   MOCK_METHOD((tl::expected<void, std::string>), publishImages, ((const std::map<ImageSource, ImageWithCameraInfo>&)),
               (override));
+  MOCK_METHOD(void, createLatencyInterfaces,
+              ((const std::function<spot_msgs::msg::LatencyHistogramArray(bool reset)>&)), (override));
+  MOCK_METHOD(void, publishLatencies, (const spot_msgs::msg::LatencyHistogramArray& latencies), (override));
 };
 
 class TestInitSpotImagePublisher : public ::testing::Test {
@@ -91,6 +94,24 @@ TEST_F(TestInitSpotImagePublisher, InitSucceeds) {
   EXPECT_THAT(image_publisher->initialize(), testing::IsTrue());
 }
 
+TEST_F(TestInitSpotImagePublisher, InitCreatesLatencyInterfacesWhenEnabled) {
+  // GIVEN image latencies are enabled
+  fake_parameter_interface_ptr->publish_image_latencies = true;
+
+  // THEN expect createPublishers and createLatencyInterfaces to be invoked
+  EXPECT_CALL(*middleware_handle, createPublishers).Times(1);
+  EXPECT_CALL(*middleware_handle, createLatencyInterfaces).Times(1);
+  EXPECT_CALL(*mock_timer_interface_ptr, setTimer).Times(1);
+
+  // GIVEN an image publisher
+  constexpr auto kHasArm{true};
+  createImagePublisher(kHasArm);
+
+  // WHEN the SpotImagePublisher is initialized
+  // THEN initialization succeeds
+  EXPECT_THAT(image_publisher->initialize(), testing::IsTrue());
+}
+
 TEST_F(TestRunSpotImagePublisher, PublishCallbackTriggersWithArm) {
   // GIVEN we request all possible image types
   fake_parameter_interface_ptr->publish_rgb_images = true;
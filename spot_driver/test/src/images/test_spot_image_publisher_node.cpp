@@ -31,6 +31,9 @@ class MockMiddlewareHandle : public images::SpotImagePublisher::MiddlewareHandle
   MOCK_METHOD(void, createPublishers, (const std::set<ImageSource>& image_sources), (override));
   MOCK_METHOD((tl::expected<void, std::string>), publishImages, ((const std::map<ImageSource, ImageWithCameraInfo>&)),
               (override));
+  MOCK_METHOD(void, createLatencyInterfaces,
+              ((const std::function<spot_msgs::msg::LatencyHistogramArray(bool reset)>&)), (override));
+  MOCK_METHOD(void, publishLatencies, (const spot_msgs::msg::LatencyHistogramArray& latencies), (override));
 };
 
 class SpotImagePubNodeTestFixture : public ::testing::Test {
@@ -19,9 +19,9 @@ Discrete trajectory points are generated by sampling at a frequency of 20 Hz.
 Notably, both trajectories incorporate an initial 4-second ramp-up phase,
 observable as the robot gradually assumes the starting posture.
 
-It is important to acknowledge that, due to constraints within the Software
-Development Kit (SDK), it is currently unfeasible to batch and dispatch
-gripper or arm joint trajectories.
+Gripper and arm joint trajectories can be batched as well. Since the robot
+rejects them when their reference time is in the past, the driver moves the
+reference time of each of their batches to the first point of the batch.
 
 Prior to initiating this example, it is imperative to configure the requisite
 global variables and disengage the robot from its docking station using the
@@ -606,15 +606,14 @@ class SpotRunner:
         #     trajectory_function=arm_impedance_continuous_trajectory,
         # )
 
-        # Unfortunately, we cannot send at the moment gripper or arm joint
-        # trajectories with a reference time that falls before the robot time
-        # because of a limitation in the SDK.
+        # The robot rejects gripper or arm joint trajectories with a reference
+        # time that falls before the robot time, so the driver rebases each of
+        # their batches on its first point.
 
         arm_joint_trajectory = None
 
-        # As stated above, batching does not work with joint trajectories,
-        # but you can uncomment the following lines if you want to experiment.
-        # Spot will likely throw an error when the second batch is issued.
+        # Uncomment the following lines if you want to try joint trajectories.
+        # This will automatically override the cartesian trajectory.
 
         # arm_joint_trajectory = self._arm_joint_discrete_trajectory(
         #     reference_time=start_time,
@@ -626,9 +625,7 @@ class SpotRunner:
 
         gripper_trajectory = None
 
-        # As stated above, batching does not work with grip trajectories,
-        # but you can uncomment the following lines if you want to experiment.
-        # Spot will likely throw an error when the second batch is issued.
+        # Uncomment the following lines if you want to try gripper trajectories.
 
         # gripper_trajectory = self._gripper_discrete_trajectory(
         #     reference_time=start_time,